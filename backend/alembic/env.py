@@ -9,12 +9,10 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 
-# Import your models' metadata
-# from app.db.base import Base
-# target_metadata = Base.metadata
+# Importing app.db.base registers every model on the metadata
+from app.db.base import Base
 
-# For now, use None until models are created
-target_metadata = None
+target_metadata = Base.metadata
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -33,6 +31,18 @@ if os.environ.get("DATABASE_URL"):
     config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """
+    Leave tables without a model out of autogenerate.
+
+    The monthly chat_messages partitions (created by the backend) and the tables
+    of 001_init.sql that have no model yet would otherwise be dropped.
+    """
+    if type_ == "table" and reflected and compare_to is None:
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -48,6 +58,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -58,7 +69,11 @@ def run_migrations_offline() -> None:
 
 def do_run_migrations(connection: Connection) -> None:
     """Run migrations with connection."""
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,53 @@
+"""Composite (session_id, created_at) index on chat_messages
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction, and keeps chat writable meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_messages_session_created_at",
+            "chat_messages",
+            ["session_id", "created_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Every lookup by session_id is served by the composite index now
+        op.drop_index(
+            "idx_messages_session_id",
+            table_name="chat_messages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_messages_session_id",
+            "chat_messages",
+            ["session_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "idx_messages_session_created_at",
+            table_name="chat_messages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
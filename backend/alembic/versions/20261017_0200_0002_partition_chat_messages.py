@@ -0,0 +1,130 @@
+"""Partition chat_messages by month on created_at
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 02:00:00.000000
+
+Rebuilds chat_messages as a table partitioned by range on created_at, with
+one partition per month from the oldest message through three months ahead,
+and copies the existing rows over. The copy rewrites the whole table: run it
+in a maintenance window. New partitions are created ahead of time by the
+backend (app.services.message_archive).
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "id, session_id, user_id, content, sender, sentiment_score, sentiment_label, "
+    "health_signals, tokens_used, created_at, metadata"
+)
+
+INDEXES = (
+    "CREATE INDEX idx_messages_session_created_at ON chat_messages(session_id, created_at)",
+    "CREATE INDEX idx_messages_user_id ON chat_messages(user_id)",
+    "CREATE INDEX idx_messages_created_at ON chat_messages(created_at DESC)",
+    "CREATE INDEX idx_messages_sender ON chat_messages(sender)",
+    "CREATE INDEX idx_messages_sentiment ON chat_messages(sentiment_score)",
+    "CREATE INDEX idx_messages_content_search ON chat_messages "
+    "USING gin(to_tsvector('english', content))",
+)
+
+INDEX_NAMES = (
+    "idx_messages_session_created_at",
+    "idx_messages_session_id",
+    "idx_messages_user_id",
+    "idx_messages_created_at",
+    "idx_messages_sender",
+    "idx_messages_sentiment",
+    "idx_messages_content_search",
+)
+
+
+def _create_table(partitioned: bool) -> None:
+    primary_key = "id, created_at" if partitioned else "id"
+    partition_by = "PARTITION BY RANGE (created_at)" if partitioned else ""
+    op.execute(
+        f"""
+        CREATE TABLE chat_messages (
+            id UUID NOT NULL DEFAULT uuid_generate_v4(),
+            session_id UUID NOT NULL REFERENCES conversation_sessions(id) ON DELETE CASCADE,
+            user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            content TEXT NOT NULL,
+            sender VARCHAR(10) NOT NULL CHECK (sender IN ('user', 'ai')),
+            sentiment_score DECIMAL(3, 2),
+            sentiment_label VARCHAR(20),
+            health_signals JSONB DEFAULT '[]',
+            tokens_used INTEGER,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+            metadata JSONB DEFAULT '{{}}',
+            PRIMARY KEY ({primary_key})
+        ) {partition_by}
+        """
+    )
+
+
+def _swap_out_old_table() -> None:
+    """Move the current table aside so the new one can take its names."""
+    op.execute("DROP TRIGGER IF EXISTS trigger_increment_message_count ON chat_messages")
+    for name in INDEX_NAMES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("ALTER TABLE chat_messages RENAME TO chat_messages_old")
+    op.execute("ALTER INDEX chat_messages_pkey RENAME TO chat_messages_old_pkey")
+
+
+def _finish_new_table() -> None:
+    # The trigger is created after the copy so message counts are not bumped again
+    op.execute(f"INSERT INTO chat_messages ({COLUMNS}) SELECT {COLUMNS} FROM chat_messages_old")
+    op.execute("DROP TABLE chat_messages_old")
+    for statement in INDEXES:
+        op.execute(statement)
+    op.execute(
+        "CREATE TRIGGER trigger_increment_message_count AFTER INSERT ON chat_messages "
+        "FOR EACH ROW EXECUTE FUNCTION increment_session_message_count()"
+    )
+
+
+def upgrade() -> None:
+    _swap_out_old_table()
+    _create_table(partitioned=True)
+
+    # One partition per month, from the oldest message through three months ahead
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            part_month DATE := date_trunc('month', COALESCE(
+                (SELECT min(created_at) FROM chat_messages_old), NOW()
+            ) AT TIME ZONE 'UTC')::date;
+            last_month DATE := (date_trunc('month', NOW() AT TIME ZONE 'UTC') + INTERVAL '3 months')::date;
+        BEGIN
+            WHILE part_month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF chat_messages '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'chat_messages_p' || to_char(part_month, 'YYYY_MM'),
+                    part_month::text || ' 00:00:00+00',
+                    (part_month + INTERVAL '1 month')::date::text || ' 00:00:00+00'
+                );
+                part_month := (part_month + INTERVAL '1 month')::date;
+            END LOOP;
+        END $$;
+        """
+    )
+
+    _finish_new_table()
+
+
+def downgrade() -> None:
+    # Detached (archived) partitions are not brought back
+    _swap_out_old_table()
+    _create_table(partitioned=False)
+    _finish_new_table()
@@ -0,0 +1,208 @@
+"""Fit indexes to the queries the endpoints run
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 03:00:00.000000
+
+Adds composite indexes for the keyset-paginated reads:
+- (user_id, started_at, id) on conversation_sessions for the session list;
+- (session_id, created_at, id) on chat_messages for the context window,
+  summary folds and message pagination.
+
+It drops the indexes no query uses, which only slow down writes, and the
+ones duplicating a UNIQUE constraint. It also makes the JSONB columns NOT
+NULL, as the models declare them. Indexes are built CONCURRENTLY.
+chat_messages is partitioned, so its indexes are built on each partition
+and then attached. The NOT NULL columns are proven by a CHECK constraint
+validated without blocking writes, so SET NOT NULL only needs a brief lock.
+
+"""
+from typing import List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Indexes no endpoint query uses, or that duplicate the index of a UNIQUE constraint
+UNUSED_INDEXES = {
+    "idx_users_email": "CREATE INDEX idx_users_email ON users(email)",
+    "idx_users_role": "CREATE INDEX idx_users_role ON users(role)",
+    "idx_users_is_active": "CREATE INDEX idx_users_is_active ON users(is_active)",
+    "idx_user_profiles_user_id": (
+        "CREATE INDEX idx_user_profiles_user_id ON user_profiles(user_id)"
+    ),
+    "idx_sessions_user_id": "CREATE INDEX idx_sessions_user_id ON conversation_sessions(user_id)",
+    "idx_sessions_started_at": (
+        "CREATE INDEX idx_sessions_started_at ON conversation_sessions(started_at DESC)"
+    ),
+    "idx_sessions_is_active": (
+        "CREATE INDEX idx_sessions_is_active ON conversation_sessions(is_active)"
+    ),
+}
+
+# Indexes of the partitioned chat_messages table; DROP INDEX CONCURRENTLY is not
+# supported on them, but dropping takes only a brief lock
+UNUSED_MESSAGE_INDEXES = {
+    "idx_messages_session_created_at": (
+        "CREATE INDEX idx_messages_session_created_at ON chat_messages(session_id, created_at)"
+    ),
+    "idx_messages_created_at": (
+        "CREATE INDEX idx_messages_created_at ON chat_messages(created_at DESC)"
+    ),
+    "idx_messages_sender": "CREATE INDEX idx_messages_sender ON chat_messages(sender)",
+    "idx_messages_sentiment": (
+        "CREATE INDEX idx_messages_sentiment ON chat_messages(sentiment_score)"
+    ),
+    "idx_messages_content_search": (
+        "CREATE INDEX idx_messages_content_search ON chat_messages "
+        "USING gin(to_tsvector('english', content))"
+    ),
+}
+
+NOT_NULL_JSONB = (
+    ("user_profiles", "preferences", "'{}'"),
+    ("conversation_sessions", "metadata", "'{}'"),
+    ("chat_messages", "health_signals", "'[]'"),
+    ("chat_messages", "metadata", "'{}'"),
+)
+
+
+def _create_partitioned_index(name: str, suffix: str, columns: str) -> None:
+    """
+    Build an index of chat_messages without blocking writes.
+
+    CREATE INDEX CONCURRENTLY is not supported on a partitioned table. The
+    index is created invalid ON ONLY the parent table. Each partition's index
+    is then built concurrently and attached. The parent index becomes valid
+    once every partition has one, and partitions created later get it
+    automatically.
+    """
+    op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY chat_messages ({columns})")
+    partitions = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = 'chat_messages'
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM pg_inherits attached
+                      JOIN pg_index ON pg_index.indexrelid = attached.inhrelid
+                      WHERE attached.inhparent = CAST(:index AS regclass)
+                        AND pg_index.indrelid = child.oid
+                  )
+                """
+            ),
+            {"index": name},
+        )
+        .scalars()
+        .all()
+    )
+    for partition in partitions:
+        partition_index = f"{partition}_{suffix}"
+        op.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} "
+            f"ON {partition} ({columns})"
+        )
+        op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+
+
+def _leaf_tables(table: str) -> List[str]:
+    """The partitions of a partitioned table, or the table itself."""
+    partitions = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT CAST(inhrelid AS regclass)::text FROM pg_inherits "
+                "WHERE inhparent = CAST(:table AS regclass)"
+            ),
+            {"table": table},
+        )
+        .scalars()
+        .all()
+    )
+    return partitions or [table]
+
+
+def _set_not_null(table: str, column: str, default: str) -> None:
+    """
+    SET NOT NULL without holding an ACCESS EXCLUSIVE lock for a full scan.
+
+    Run outside a transaction, so each step releases its locks. A NOT VALID
+    CHECK (brief lock) keeps new NULLs out while existing ones are filled
+    in. VALIDATE then scans under a lock that lets writes through, and SET
+    NOT NULL trusts the valid CHECK instead of scanning again (PostgreSQL 12+).
+    For chat_messages this is done on each partition; SET NOT NULL on the
+    parent then covers them all.
+    """
+    leaves = _leaf_tables(table)
+    for leaf in leaves:
+        # Dropped first, in case an earlier run stopped halfway
+        op.execute(
+            f"ALTER TABLE {leaf} DROP CONSTRAINT IF EXISTS {leaf}_{column}_not_null, "
+            f"ADD CONSTRAINT {leaf}_{column}_not_null CHECK ({column} IS NOT NULL) NOT VALID"
+        )
+    op.execute(f"UPDATE {table} SET {column} = {default} WHERE {column} IS NULL")
+    for leaf in leaves:
+        op.execute(f"ALTER TABLE {leaf} VALIDATE CONSTRAINT {leaf}_{column}_not_null")
+    op.alter_column(table, column, nullable=False)
+    for leaf in leaves:
+        op.execute(f"ALTER TABLE {leaf} DROP CONSTRAINT IF EXISTS {leaf}_{column}_not_null")
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction, and keeps chat writable meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_sessions_user_started_at",
+            "conversation_sessions",
+            ["user_id", "started_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        _create_partitioned_index(
+            "idx_messages_session_keyset", "session_keyset_idx", "session_id, created_at, id"
+        )
+
+        for name in UNUSED_INDEXES:
+            op.drop_index(name, postgresql_concurrently=True, if_exists=True)
+
+    for name in UNUSED_MESSAGE_INDEXES:
+        op.drop_index(name, table_name="chat_messages", if_exists=True)
+
+    with op.get_context().autocommit_block():
+        for table, column, default in NOT_NULL_JSONB:
+            _set_not_null(table, column, default)
+
+
+def downgrade() -> None:
+    for table, column, _ in NOT_NULL_JSONB:
+        op.alter_column(table, column, nullable=True)
+
+    for statement in UNUSED_MESSAGE_INDEXES.values():
+        op.execute(statement.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1))
+
+    with op.get_context().autocommit_block():
+        for statement in UNUSED_INDEXES.values():
+            op.execute(
+                statement.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY IF NOT EXISTS", 1)
+            )
+
+        op.drop_index(
+            "idx_sessions_user_started_at",
+            table_name="conversation_sessions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_index("idx_messages_session_keyset", table_name="chat_messages", if_exists=True)
@@ -9,8 +9,11 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import verify_token
-from app.db.session import AsyncSessionLocal
+from app.db.replica import replica_router
+from app.db.session import AsyncSessionLocal, ReplicaSessionLocal
 from app.models.user import User
+from app.services.principal_cache import Principal, principal_cache
+from app.services.token_revocation import token_revocation
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
@@ -29,26 +32,43 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def _load_principal(db: AsyncSession, user_id: UUID) -> Optional[Principal]:
+    """Look up the principal of a user, from the principal cache when possible."""
+    principal = await principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(
+        select(User.id, User.email, User.role, User.is_active).where(User.id == user_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+
+    principal = Principal(**row._mapping)
+    await principal_cache.set(principal)
+    return principal
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db),
-) -> User:
+) -> Principal:
     """Get current authenticated user."""
     token = credentials.credentials
 
     # Verify token and get user ID
     user_id = verify_token(token, token_type="access")
 
-    if not user_id:
+    if not user_id or await token_revocation.is_token_revoked(token):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Get user from database
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    # Get user, usually without touching the database
+    user = await _load_principal(db, user_id)
 
     if not user:
         raise HTTPException(
@@ -62,12 +82,32 @@ async def get_current_user(
             detail="Inactive user",
         )
 
+    # Attribute this request's commits to the user (read-your-writes window)
+    db.info["user_id"] = user.id
+
     return user
 
 
+async def get_read_db(
+    current_user: Principal = Depends(get_current_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for read-only endpoints.
+
+    Serves reads from the replica when DATABASE_REPLICA_URL is set, except for
+    users who wrote within READ_YOUR_WRITES_SECONDS, who read from the primary.
+    Without a replica this is a plain primary session.
+    """
+    use_replica = ReplicaSessionLocal is not None and await replica_router.use_replica(
+        current_user.id
+    )
+    async with (ReplicaSessionLocal if use_replica else AsyncSessionLocal)() as session:
+        yield session
+
+
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """Get current active user (additional check)."""
     if not current_user.is_active:
         raise HTTPException(
@@ -78,8 +118,8 @@ async def get_current_active_user(
 
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """Get current admin user."""
     if current_user.role != "admin":
         raise HTTPException(
@@ -92,17 +132,16 @@ async def get_current_admin_user(
 async def get_optional_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: AsyncSession = Depends(get_db),
-) -> Optional[User]:
+) -> Optional[Principal]:
     """Get current user if authenticated, None otherwise."""
     if not credentials:
         return None
 
     user_id = verify_token(credentials.credentials, token_type="access")
 
-    if not user_id:
+    if not user_id or await token_revocation.is_token_revoked(credentials.credentials):
         return None
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await _load_principal(db, user_id)
 
     return user if user and user.is_active else None
@@ -1,5 +1,5 @@
 """API v1 routers."""
 
-from app.api.v1 import auth, chat
+from app.api.v1 import admin, auth, chat
 
-__all__ = ["auth", "chat"]
+__all__ = ["admin", "auth", "chat"]
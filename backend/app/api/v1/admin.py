@@ -0,0 +1,180 @@
+"""Admin-only operational endpoints."""
+
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_admin_user, get_db
+from app.core.config import settings
+from app.core.logging import logging_stats
+from app.core.security import token_cache
+from app.db.monitoring import db_monitor, replica_monitor
+from app.db.replica import replica_router
+from app.db.session import replica_engine
+from app.middleware.rate_limit import rate_limiter
+from app.schemas.user import UserImportReport
+from app.services.claude import claude_service
+from app.services.context_cache import context_cache
+from app.services.idempotency import idempotency_store
+from app.services.message_archive import message_archiver
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import Principal, principal_cache
+from app.services.profiler import request_profiler
+from app.services.readiness import readiness_probe
+from app.services.summarizer import conversation_summarizer
+from app.services.token_revocation import token_revocation
+from app.services.user_import import IMPORT_FORMATS, ImportFileError, import_users
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_stats(
+    current_user: Principal = Depends(get_current_admin_user),
+):
+    """Get runtime statistics for the hot paths."""
+    return {
+        "database": {
+            "primary": db_monitor.stats(),
+            "replica": replica_monitor.stats() if replica_engine is not None else None,
+            "read_routing": replica_router.stats(),
+        },
+        "claude": {
+            "governor": claude_service.governor.stats(),
+            "prompt_cache": claude_service.prompt_cache_stats(),
+        },
+        "context_cache": context_cache.stats(),
+        "summarizer": conversation_summarizer.stats(),
+        "idempotency": idempotency_store.stats(),
+        "principal_cache": principal_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "token_revocation": token_revocation.stats(),
+        "password_hasher": password_hasher.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "message_archive": message_archiver.stats(),
+        "readiness": readiness_probe.stats(),
+        "logging": logging_stats(),
+        "profiler": request_profiler.stats(),
+    }
+
+
+@router.post(
+    "/users/import",
+    response_model=UserImportReport,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_users_file(
+    request: Request,
+    current_user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create many users at once from a CSV or NDJSON file.
+
+    Each row holds the registration fields (email, full_name, password) and
+    optionally profile fields. Rows that are invalid, repeated in the file or
+    already registered are skipped and reported; the rest are created.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    file_format = IMPORT_FORMATS.get(content_type)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type must be one of: {', '.join(IMPORT_FORMATS)}",
+        )
+
+    content = await request.body()
+    if len(content) > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Import file too large",
+        )
+
+    try:
+        return await import_users(db, content, file_format)
+    except ImportFileError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/archive/messages")
+async def list_message_archives(
+    current_user: Principal = Depends(get_current_admin_user),
+):
+    """List the months of chat messages moved to the cold archive."""
+    return [
+        {"month": f"{archive.month:%Y-%m}", "rows": archive.rows, "size_bytes": archive.size_bytes}
+        for archive in await message_archiver.list_archives()
+    ]
+
+
+@router.get("/archive/messages/{month}")
+async def export_archived_messages(
+    month: str,
+    user_id: Optional[UUID] = Query(None, description="Only messages of this user"),
+    session_id: Optional[UUID] = Query(None, description="Only messages of this session"),
+    current_user: Principal = Depends(get_current_admin_user),
+):
+    """Export the archived chat messages of one month (YYYY-MM) as NDJSON, oldest first."""
+    try:
+        archive_month = datetime.strptime(month, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Month must be formatted as YYYY-MM",
+        )
+
+    if not message_archiver.has_archive(archive_month):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No archive for this month",
+        )
+
+    async def lines():
+        async for message in message_archiver.read_archive(archive_month, user_id, session_id):
+            yield json.dumps(message) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="chat_messages_{month}.ndjson"'},
+    )
+
+
+@router.get("/profiles")
+async def list_request_profiles(
+    current_user: Principal = Depends(get_current_admin_user),
+):
+    """List the kept request profiles of this worker, most recent first."""
+    return [profile.summary() for profile in request_profiler.profiles()]
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(
+    profile_id: int,
+    current_user: Principal = Depends(get_current_admin_user),
+):
+    """Get a request profile as folded stacks, ready for a flame graph viewer."""
+    profile = request_profiler.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found",
+        )
+
+    return PlainTextResponse(
+        profile.folded(),
+        headers={"Content-Disposition": f'inline; filename="profile_{profile_id}.folded"'},
+    )
@@ -1,16 +1,17 @@
 """Authentication endpoints."""
 
 from datetime import datetime
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, get_read_db, security
 from app.core.logging import get_logger
 from app.core.security import (
-    verify_password,
-    get_password_hash,
     create_access_token,
     create_refresh_token,
     verify_token,
@@ -23,12 +24,26 @@ from app.schemas.user import (
     UserWithProfile,
     Token,
     RefreshTokenRequest,
+    LogoutRequest,
 )
+from app.services.governor import GovernorOverloaded
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import Principal
+from app.services.token_revocation import RevocationUnavailable, token_revocation
 
 router = APIRouter()
 logger = get_logger(__name__)
 
 
+def _hashing_overloaded(exc: GovernorOverloaded) -> HTTPException:
+    """Map a shed password-hashing request to a 503."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins right now, please try again shortly",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @router.post("/register", response_model=UserWithProfile, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserRegister,
@@ -46,7 +61,11 @@ async def register(
         )
 
     # Create user
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await password_hasher.hash(user_data.password, key=user_data.email)
+    except GovernorOverloaded as e:
+        raise _hashing_overloaded(e)
+
     new_user = User(
         email=user_data.email,
         full_name=user_data.full_name,
@@ -67,7 +86,7 @@ async def register(
     await db.refresh(new_user)
     await db.refresh(user_profile)
 
-    logger.info(f"New user registered: {new_user.email}")
+    logger.info("New user registered: %s", new_user.email)
 
     return new_user
 
@@ -83,7 +102,16 @@ async def login(
     user = result.scalar_one_or_none()
 
     # Verify user and password
-    if not user or not verify_password(credentials.password, user.password_hash):
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await password_hasher.verify(
+                credentials.password, user.password_hash, key=credentials.email
+            )
+        except GovernorOverloaded as e:
+            raise _hashing_overloaded(e)
+
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -96,15 +124,17 @@ async def login(
             detail="Inactive user account",
         )
 
-    # Update last login
+    # Update last login, upgrading the hash if BCRYPT_ROUNDS changed
     user.last_login_at = datetime.utcnow()
+    if new_hash:
+        user.password_hash = new_hash
     await db.commit()
 
     # Create tokens
     access_token = create_access_token(user.id)
     refresh_token = create_refresh_token(user.id)
 
-    logger.info(f"User logged in: {user.email}")
+    logger.info("User logged in: %s", user.email)
 
     return Token(
         access_token=access_token,
@@ -129,6 +159,23 @@ async def refresh_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Rotate: each refresh token can be exchanged once
+    try:
+        claimed = await token_revocation.revoke_token(token_data.refresh_token, claim=True)
+    except RevocationUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Cannot refresh tokens right now, please try again shortly",
+            headers={"Retry-After": "5"},
+        )
+    if not claimed:
+        logger.warning(f"Revoked refresh token presented for user: {user_id}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     # Get user
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
@@ -143,7 +190,7 @@ async def refresh_token(
     access_token = create_access_token(user.id)
     new_refresh_token = create_refresh_token(user.id)
 
-    logger.info(f"Token refreshed for user: {user.email}")
+    logger.info("Token refreshed for user: %s", user.email)
 
     return Token(
         access_token=access_token,
@@ -154,13 +201,13 @@ async def refresh_token(
 
 @router.get("/me", response_model=UserWithProfile)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get current user information."""
     # Eagerly load profile
     result = await db.execute(
-        select(User).where(User.id == current_user.id)
+        select(User).options(selectinload(User.profile)).where(User.id == current_user.id)
     )
     user = result.scalar_one()
 
@@ -169,9 +216,17 @@ async def get_current_user_info(
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(get_current_user),
+    logout_data: Optional[LogoutRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: Principal = Depends(get_current_user),
 ):
-    """Logout user (client should discard tokens)."""
-    logger.info(f"User logged out: {current_user.email}")
+    """Logout user, revoking the access token and, if given, the refresh token."""
+    await token_revocation.revoke_token(credentials.credentials)
+
+    if logout_data and logout_data.refresh_token:
+        if verify_token(logout_data.refresh_token, token_type="refresh") == current_user.id:
+            await token_revocation.revoke_token(logout_data.refresh_token)
+
+    logger.info("User logged out: %s", current_user.email)
 
     return {"message": "Successfully logged out"}
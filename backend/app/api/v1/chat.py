@@ -1,16 +1,22 @@
 """Chat endpoints for conversations."""
 
-from typing import List, Optional
+import json
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select, desc
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import desc, func, select, true, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, get_read_db
+from app.core.config import settings
 from app.core.logging import get_logger
-from app.models.user import User
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.session import AsyncSessionLocal
 from app.models.conversation import ConversationSession, ChatMessage
 from app.schemas.conversation import (
     ChatMessageSend,
@@ -18,102 +24,199 @@ from app.schemas.conversation import (
     ConversationSessionResponse,
     ConversationSessionWithMessages,
     ConversationSessionList,
+    ConversationSessionSummary,
 )
 from app.services.claude import claude_service
+from app.services.context import ContextTurn, ContextWindow, build_context_window
+from app.services.context_cache import CachedContext, context_cache
+from app.services.conversation import persist_turn
+from app.services.governor import GovernorOverloaded
+from app.services.idempotency import (
+    IdempotencyInProgress,
+    IdempotencyKeyReused,
+    idempotency_store,
+    request_fingerprint,
+)
+from app.services.principal_cache import Principal
+from app.services.summarizer import conversation_summarizer, summary_text
 
 router = APIRouter()
 logger = get_logger(__name__)
 
+# Characters of the last message shown in the session list
+SESSION_PREVIEW_CHARS = 120
 
-@router.post("/send", response_model=ChatResponse)
-async def send_message(
-    message_data: ChatMessageSend,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
-    """Send a message and get AI response."""
-    # Get or create session
-    if message_data.session_id:
-        # Get existing session
+
+def _session_title(message: str) -> str:
+    """Derive a session title from its first message."""
+    return message[:50] + "..." if len(message) > 50 else message
+
+
+def _overloaded_error(exc: GovernorOverloaded) -> HTTPException:
+    """Map a shed Claude request to the configured 429/503 response."""
+    return HTTPException(
+        status_code=settings.CLAUDE_SHED_STATUS_CODE,
+        detail="The AI companion is busy right now, please try again shortly",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a single Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _load_conversation(db: AsyncSession, session_id: UUID, user: Principal) -> CachedContext:
+    """
+    Load the prompt context of an existing session, from the cache when possible.
+
+    Raises a 404 if the session does not exist or belongs to another user.
+    """
+    conversation = await context_cache.get(session_id)
+
+    if conversation is None:
         result = await db.execute(
-            select(ConversationSession)
+            select(ConversationSession.metadata_)
             .where(
-                ConversationSession.id == message_data.session_id,
-                ConversationSession.user_id == current_user.id,
+                ConversationSession.id == session_id,
+                ConversationSession.user_id == user.id,
             )
         )
-        session = result.scalar_one_or_none()
+        row = result.first()
 
-        if not session:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation session not found",
+        if row is not None:
+            conversation = CachedContext(
+                user_id=user.id,
+                window=await build_context_window(db, session_id),
+                summary=summary_text(row.metadata_),
             )
-    else:
-        # Create new session
-        session = ConversationSession(
-            user_id=current_user.id,
-            title=message_data.message[:50] + "..." if len(message_data.message) > 50 else message_data.message,
-            is_active=True,
-        )
-        db.add(session)
-        await db.flush()
-
-    # Save user message
-    user_message = ChatMessage(
-        session_id=session.id,
-        user_id=current_user.id,
-        content=message_data.message,
-        sender="user",
-    )
-    db.add(user_message)
-    await db.flush()
-
-    # Get conversation history for context
-    history_result = await db.execute(
-        select(ChatMessage)
-        .where(ChatMessage.session_id == session.id)
-        .order_by(ChatMessage.created_at)
-        .limit(20)  # Last 20 messages for context
-    )
-    history_messages = history_result.scalars().all()
 
-    # Format history for Claude (excluding the current message)
-    conversation_history = claude_service.format_conversation_history(
-        [(msg.sender, msg.content) for msg in history_messages[:-1]],
-        max_messages=10,
+    if conversation is None or conversation.user_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation session not found",
+        )
+
+    return conversation
+
+
+async def _remember_turn(
+    session_id: UUID,
+    conversation: CachedContext,
+    user_message: ChatMessage,
+    ai_message: ChatMessage,
+) -> None:
+    """
+    Append a completed turn to the cached context and fold evicted turns into the summary.
+
+    `conversation` is this request's own copy. If another request wrote the
+    session's context since it was loaded, the cache drops the entry rather
+    than overwrite that turn.
+    """
+    evicted = conversation.window.append(
+        [ContextTurn.from_message(user_message), ContextTurn.from_message(ai_message)]
     )
+    await context_cache.set(session_id, conversation)
+    conversation_summarizer.track(session_id, conversation.window, evicted)
+
+
+@router.post("/send", response_model=ChatResponse)
+async def send_message(
+    message_data: ChatMessageSend,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Send a message and get AI response.
+
+    With an `Idempotency-Key` header, retries of the same request return the
+    original response instead of generating and storing a second reply.
+    """
+    if not idempotency_key:
+        return await _send_message(message_data, current_user, db)
+
+    async def produce() -> str:
+        return (await _send_message(message_data, current_user, db)).model_dump_json()
+
+    try:
+        raw, replayed = await idempotency_store.run(
+            f"{current_user.id}:{idempotency_key}",
+            request_fingerprint(message_data.model_dump_json()),
+            produce,
+        )
+    except IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key reused with a different request body",
+        )
+    except IdempotencyInProgress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed",
+        )
+
+    if replayed:
+        response.headers["Idempotency-Replayed"] = "true"
+
+    return ChatResponse.model_validate_json(raw)
+
+
+async def _send_message(
+    message_data: ChatMessageSend,
+    current_user: Principal,
+    db: AsyncSession,
+) -> ChatResponse:
+    """Generate the AI reply to a message and store the turn."""
+    received_at = datetime.utcnow()
+
+    # Nothing is written until the reply exists, then the turn is stored in one go
+    if message_data.session_id:
+        session_id = message_data.session_id
+        new_session_title = None
+        conversation = await _load_conversation(db, session_id, current_user)
+    else:
+        session_id = uuid.uuid4()
+        new_session_title = _session_title(message_data.message)
+        conversation = CachedContext(user_id=current_user.id, window=ContextWindow())
 
     try:
         # Generate AI response
-        ai_response_text, tokens_used = await claude_service.generate_response(
+        ai_response_text, tokens_used, usage = await claude_service.generate_response(
             user_message=message_data.message,
-            conversation_history=conversation_history,
+            conversation_history=conversation.window.to_messages(),
+            user_id=current_user.id,
+            conversation_summary=conversation.summary,
         )
 
-        # Save AI message
-        ai_message = ChatMessage(
-            session_id=session.id,
+        user_message, ai_message = await persist_turn(
+            db,
+            session_id=session_id,
             user_id=current_user.id,
-            content=ai_response_text,
-            sender="ai",
+            user_content=message_data.message,
+            ai_content=ai_response_text,
             tokens_used=tokens_used,
+            received_at=received_at,
+            ai_metadata={"usage": usage},
+            new_session_title=new_session_title,
         )
-        db.add(ai_message)
 
-        await db.commit()
-        await db.refresh(user_message)
-        await db.refresh(ai_message)
-        await db.refresh(session)
+        # Keep the cached context in step with the conversation
+        await _remember_turn(session_id, conversation, user_message, ai_message)
 
-        logger.info(f"Message sent in session {session.id} - tokens used: {tokens_used}")
+        logger.info("Message sent in session %s - tokens used: %s", session_id, tokens_used)
 
         return ChatResponse(
-            session_id=session.id,
+            session_id=session_id,
             user_message=user_message,
             ai_message=ai_message,
         )
 
+    except GovernorOverloaded as e:
+        await db.rollback()
+        raise _overloaded_error(e)
+
     except Exception as e:
         await db.rollback()
         logger.error(f"Error generating AI response: {str(e)}")
@@ -123,50 +226,241 @@ async def send_message(
         )
 
 
+@router.post("/send/stream")
+async def send_message_stream(
+    message_data: ChatMessageSend,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Send a message and stream the AI response as Server-Sent Events.
+
+    Emits a `session` event, one `delta` event per chunk of generated text, then a
+    `done` event carrying the persisted messages and time-to-first-token. Nothing
+    is persisted if generation fails; an `error` event is emitted instead.
+    """
+    received_at = datetime.utcnow()
+
+    # Shed up front while we can still answer with a proper status code
+    if claude_service.governor.is_saturated():
+        raise _overloaded_error(GovernorOverloaded("queue full"))
+
+    if message_data.session_id:
+        session_id = message_data.session_id
+        is_new_session = False
+        conversation = await _load_conversation(db, session_id, current_user)
+    else:
+        session_id = uuid.uuid4()
+        is_new_session = True
+        conversation = CachedContext(user_id=current_user.id, window=ContextWindow())
+
+    async def event_stream() -> AsyncIterator[str]:
+        yield _sse_event("session", {"session_id": session_id})
+
+        try:
+            async for event in claude_service.stream_response(
+                user_message=message_data.message,
+                conversation_history=conversation.window.to_messages(),
+                user_id=current_user.id,
+                conversation_summary=conversation.summary,
+            ):
+                if event["type"] == "delta":
+                    yield _sse_event("delta", {"text": event["text"]})
+                else:
+                    completion = event
+
+            # Persist the whole turn only once the reply is complete
+            async with AsyncSessionLocal(info={"user_id": current_user.id}) as write_db:
+                user_message, ai_message = await persist_turn(
+                    write_db,
+                    session_id=session_id,
+                    user_id=current_user.id,
+                    user_content=message_data.message,
+                    ai_content=completion["text"],
+                    tokens_used=completion["tokens_used"],
+                    received_at=received_at,
+                    ai_metadata={
+                        "usage": completion["usage"],
+                        "ttft_ms": completion["ttft_ms"],
+                        "total_ms": completion["total_ms"],
+                    },
+                    new_session_title=(
+                        _session_title(message_data.message) if is_new_session else None
+                    ),
+                )
+
+            await _remember_turn(session_id, conversation, user_message, ai_message)
+
+            logger.info(
+                "Message streamed in session %s - tokens used: %s, ttft: %sms",
+                session_id,
+                completion["tokens_used"],
+                completion["ttft_ms"],
+            )
+
+            response = ChatResponse(
+                session_id=session_id,
+                user_message=user_message,
+                ai_message=ai_message,
+            )
+            yield _sse_event(
+                "done",
+                {**response.model_dump(mode="json"), "ttft_ms": completion["ttft_ms"]},
+            )
+
+        except GovernorOverloaded:
+            yield _sse_event(
+                "error",
+                {
+                    "detail": "The AI companion is busy right now, please try again shortly",
+                    "status_code": settings.CLAUDE_SHED_STATUS_CODE,
+                },
+            )
+
+        except Exception as e:
+            logger.error(f"Error streaming AI response: {str(e)}")
+            yield _sse_event("error", {"detail": f"Failed to generate AI response: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # Keeps GZipMiddleware from buffering the stream
+            "Content-Encoding": "identity",
+        },
+    )
+
+
 @router.get("/sessions", response_model=ConversationSessionList)
 async def get_sessions(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-    page: int = Query(1, ge=1),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
+    page: Optional[int] = Query(None, ge=1, deprecated=True),
     page_size: int = Query(20, ge=1, le=100),
 ):
-    """Get user's conversation sessions."""
-    # Get total count
-    count_result = await db.execute(
-        select(ConversationSession)
-        .where(ConversationSession.user_id == current_user.id)
+    """
+    Get user's conversation sessions, newest first.
+
+    Sessions are keyset-paginated on (started_at, id): pass the `next_cursor` of
+    a page as `cursor` to get the next one. The last-message preview comes from a
+    lateral join and the total from a COUNT subquery, so each page is a single
+    query however many sessions the user has. `page` keeps the old OFFSET
+    pagination working for existing clients.
+    """
+    owned = ConversationSession.user_id == current_user.id
+
+    counted = aliased(ConversationSession)
+    total = (
+        select(func.count())
+        .select_from(counted)
+        .where(counted.user_id == current_user.id)
+        .scalar_subquery()
     )
-    total = len(count_result.scalars().all())
 
-    # Get paginated sessions
-    offset = (page - 1) * page_size
-    result = await db.execute(
-        select(ConversationSession)
-        .where(ConversationSession.user_id == current_user.id)
-        .order_by(desc(ConversationSession.started_at))
-        .limit(page_size)
-        .offset(offset)
+    last_message = (
+        select(
+            func.substr(ChatMessage.content, 1, SESSION_PREVIEW_CHARS).label("preview"),
+            ChatMessage.created_at,
+        )
+        .where(ChatMessage.session_id == ConversationSession.id)
+        .order_by(desc(ChatMessage.created_at), desc(ChatMessage.id))
+        .limit(1)
+        .lateral("last_message")
+    )
+
+    query = (
+        select(
+            ConversationSession,
+            last_message.c.preview,
+            last_message.c.created_at,
+            total.label("total"),
+        )
+        .outerjoin(last_message, true())
+        .where(owned)
+        .order_by(desc(ConversationSession.started_at), desc(ConversationSession.id))
+        .limit(page_size + 1)  # One extra row tells us whether another page exists
     )
-    sessions = result.scalars().all()
+
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+        query = query.where(
+            tuple_(ConversationSession.started_at, ConversationSession.id) < tuple_(*position)
+        )
+    elif page:
+        query = query.offset((page - 1) * page_size)
+
+    rows = (await db.execute(query)).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    sessions = [
+        ConversationSessionSummary.model_validate(session).model_copy(
+            update={"last_message_preview": preview, "last_message_at": last_message_at}
+        )
+        for session, preview, last_message_at, _ in rows
+    ]
+
+    if rows:
+        total_count = rows[0].total
+    else:
+        total_count = await db.scalar(select(total))
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(sessions[-1].started_at, sessions[-1].id)
 
     return ConversationSessionList(
         sessions=sessions,
-        total=total,
-        page=page,
+        total=total_count,
+        page=page if not cursor else None,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
 @router.get("/sessions/{session_id}", response_model=ConversationSessionWithMessages)
 async def get_session(
     session_id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    before: Optional[str] = Query(None, description="`older_cursor` of a previous window"),
+    after: Optional[str] = Query(None, description="`newer_cursor` of a previous window"),
+    page_size: int = Query(50, ge=1, le=200),
 ):
-    """Get a conversation session with messages."""
+    """
+    Get a conversation session with a window of its messages.
+
+    Without cursors the window holds the `page_size` most recent messages. Pass
+    `before` to page back through older messages or `after` to fetch newer ones;
+    messages are keyset-paginated on (created_at, id) and always returned
+    oldest first. `newer_cursor` is set whenever there is a position to poll
+    from, even on the latest window, so clients can ask for new messages.
+    """
+    if before and after:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either before or after, not both",
+        )
+
+    try:
+        position = decode_cursor(before or after) if before or after else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
     result = await db.execute(
         select(ConversationSession)
-        .options(selectinload(ConversationSession.messages))
         .where(
             ConversationSession.id == session_id,
             ConversationSession.user_id == current_user.id,
@@ -180,13 +474,49 @@ async def get_session(
             detail="Conversation session not found",
         )
 
-    return session
+    keyset = tuple_(ChatMessage.created_at, ChatMessage.id)
+    query = select(ChatMessage).where(ChatMessage.session_id == session_id)
+
+    if after:
+        query = query.where(keyset > tuple_(*position)).order_by(
+            ChatMessage.created_at, ChatMessage.id
+        )
+    else:
+        query = query.order_by(desc(ChatMessage.created_at), desc(ChatMessage.id))
+        if before:
+            query = query.where(keyset < tuple_(*position))
+
+    # One extra row tells us whether the window can be extended further
+    messages = list((await db.scalars(query.limit(page_size + 1))).all())
+    has_more = len(messages) > page_size
+    messages = messages[:page_size]
+    if not after:
+        messages.reverse()
+
+    has_older = has_more if not after else True
+
+    # Polling from the end of the window; an empty `after` page stays where it was
+    if messages:
+        newer_cursor = encode_cursor(messages[-1].created_at, messages[-1].id)
+    else:
+        newer_cursor = after
+
+    return ConversationSessionWithMessages(
+        **ConversationSessionResponse.model_validate(session).model_dump(),
+        messages=messages,
+        older_cursor=(
+            encode_cursor(messages[0].created_at, messages[0].id)
+            if messages and has_older
+            else None
+        ),
+        newer_cursor=newer_cursor,
+    )
 
 
 @router.delete("/sessions/{session_id}")
 async def delete_session(
     session_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a conversation session."""
@@ -207,7 +537,8 @@ async def delete_session(
 
     await db.delete(session)
     await db.commit()
+    await context_cache.invalidate(session_id)
 
-    logger.info(f"Session deleted: {session_id}")
+    logger.info("Session deleted: %s", session_id)
 
     return {"message": "Session deleted successfully"}
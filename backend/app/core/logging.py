@@ -1,31 +1,167 @@
-"""Logging configuration."""
+"""Logging configuration.
 
+Handlers never write on the calling thread. Records go through a bounded
+queue to a listener thread that formats and writes them, so a slow stdout
+(e.g. a log collector applying backpressure) cannot stall the event loop.
+When the queue is full, records are dropped and counted instead of waiting.
+"""
+
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
 import sys
-from typing import Any, Dict
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
 
 from app.core.config import settings
+from app.core.metrics import LOG_RECORDS_DROPPED
+
+# Id of the request being handled (app.middleware.request_id), attached to every record
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes of every LogRecord; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+_sampling_filter: Optional["SamplingFilter"] = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Tag records with the id of the request being handled."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of the records below WARNING of chosen loggers.
+
+    `rates` maps logger names to the fraction kept, e.g. {"app.services.context_cache": 0.1};
+    a rate applies to the logger and its children. Warnings and errors are always kept.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.rates or record.levelno >= logging.WARNING:
+            return True
+
+        rate = self._rate(record.name)
+        if rate is None or random.random() < rate:
+            return True
+
+        self.sampled_out += 1
+        LOG_RECORDS_DROPPED.labels("sampled").inc()
+        return False
+
+    def _rate(self, name: str) -> Optional[float]:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return None
+
+
+class DroppingQueueHandler(QueueHandler):
+    """A QueueHandler that drops (and counts) records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.labels("queue_full").inc()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the arguments here, so later changes to them do not leak into
+        # the record; formatting (JSON, tracebacks) is left to the listener thread
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Wait for room rather than fail when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the request id and any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        entry.update(
+            (key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
 
 
 def setup_logging() -> None:
     """Setup application logging configuration."""
+    global _listener, _queue_handler, _sampling_filter
+
     log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
 
     # Create formatter
-    formatter = logging.Formatter(
-        fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    if settings.LOG_FORMAT == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
 
     # Setup root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
 
-    # Console handler
+    # Console handler, run by the listener thread
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+
+    if _listener is not None:
+        stop_logging()
+
+    # The only handler on the root logger. Its filters run on the calling thread,
+    # where the request id is known; the listener thread only formats and writes
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _sampling_filter = SamplingFilter(settings.LOG_SAMPLE_RATES)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _queue_handler.setLevel(log_level)
+    _queue_handler.addFilter(_sampling_filter)
+    _queue_handler.addFilter(RequestIdFilter())
+    root_logger.addHandler(_queue_handler)
+
+    _listener = _Listener(log_queue, console_handler, respect_handler_level=True)
+    _listener.start()
 
     # Set levels for noisy libraries
     logging.getLogger("uvicorn").setLevel(logging.WARNING)
@@ -34,6 +170,32 @@ def setup_logging() -> None:
     logging.getLogger("httpcore").setLevel(logging.WARNING)
 
 
+def stop_logging() -> None:
+    """Write out the queued records and stop the listener thread."""
+    global _listener, _queue_handler
+
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+def logging_stats() -> Dict[str, Any]:
+    """Queue depth and records dropped by the logging pipeline."""
+    log_queue = _queue_handler.queue if _queue_handler is not None else None
+    return {
+        "queued": log_queue.qsize() if log_queue is not None else 0,
+        "queue_size": settings.LOG_QUEUE_SIZE,
+        "dropped": _queue_handler.dropped if _queue_handler is not None else 0,
+        "sampled_out": _sampling_filter.sampled_out if _sampling_filter is not None else 0,
+    }
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance."""
     return logging.getLogger(name)
@@ -0,0 +1,165 @@
+"""Prometheus metrics.
+
+With several worker processes (uvicorn --workers, gunicorn), set
+PROMETHEUS_MULTIPROC_DIR in the environment to an empty directory before the
+server starts. Each worker then writes its samples there, and /metrics,
+whichever worker serves it, reports the sum over all of them. The variable
+is read when prometheus_client is imported, so it cannot come from .env.
+"""
+
+import asyncio
+import os
+import time
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.core.config import settings
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# Buckets (seconds) for in-process work and for calls to Claude, which take seconds
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 60.0)
+
+# HTTP (app.middleware.metrics); `route` is the path template, e.g. /api/v1/chat/sessions/{session_id}
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to the end of its response",
+    ["method", "route"],
+    buckets=FAST_BUCKETS + (30.0, 60.0),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+
+# Claude (app.services.claude); operation is generate, stream or summarize
+CLAUDE_QUEUE_WAIT = Histogram(
+    "claude_queue_wait_seconds",
+    "Time waiting for a concurrency governor slot before calling Claude",
+    ["operation"],
+    buckets=FAST_BUCKETS + (30.0,),
+)
+CLAUDE_REQUEST_DURATION = Histogram(
+    "claude_request_duration_seconds",
+    "Duration of Claude API calls, excluding the governor queue",
+    ["operation"],
+    buckets=SLOW_BUCKETS,
+)
+CLAUDE_TIME_TO_FIRST_TOKEN = Histogram(
+    "claude_time_to_first_token_seconds",
+    "Time from starting a streamed Claude call to its first text delta",
+    buckets=SLOW_BUCKETS,
+)
+CLAUDE_TOKENS = Counter(
+    "claude_tokens_total",
+    "Claude tokens used, by type (input, output, cache_read_input, cache_creation_input)",
+    ["type"],
+)
+CLAUDE_ERRORS = Counter("claude_errors_total", "Failed Claude API calls", ["operation"])
+
+# Database (app.db.monitoring); database is primary or replica
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duration of SQL statements",
+    ["database"],
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time taken to get a connection from the pool, including opening a new one",
+    ["database"],
+    buckets=FAST_BUCKETS + (30.0,),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total", "Pool checkouts that timed out", ["database"]
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Pooled connections by state (checked_out, idle, overflow)",
+    ["database", "state"],
+    multiprocess_mode="livesum",
+)
+
+# Caches; result is local_hit, redis_hit or miss (the hit ratio is hits / all)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups", ["cache", "result"])
+
+# Logging (app.core.logging); reason is queue_full or sampled
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total", "Log records dropped instead of written", ["reason"]
+)
+
+# Event loop
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop runs a timer, i.e. time spent blocked",
+    buckets=FAST_BUCKETS,
+)
+
+
+def render() -> Tuple[bytes, str]:
+    """The current metrics in the Prometheus text format, and their content type."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the shared directory (on shutdown)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class EventLoopLagMonitor:
+    """
+    Measures event loop lag by sleeping for `interval_seconds` and timing the
+    overshoot. Lag means the loop was blocked by synchronous work (or just
+    saturated), which delays every request this worker is handling.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start sampling."""
+        if self._task is None and self.interval_seconds > 0:
+            self._task = asyncio.create_task(self._sample())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sample(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval_seconds)
+            EVENT_LOOP_LAG.observe(max(0.0, time.perf_counter() - started - self.interval_seconds))
+
+
+# Global event loop lag monitor
+event_loop_monitor = EventLoopLagMonitor(interval_seconds=settings.METRICS_EVENT_LOOP_INTERVAL_SECONDS)
@@ -1,25 +1,40 @@
 """Security utilities for authentication."""
 
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
-from uuid import UUID
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID, uuid4
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash."""
+    """Verify a password against a hash (blocking; use password_hasher in handlers)."""
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a rehash if the stored hash uses outdated settings."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
-    """Generate password hash."""
+    """Generate password hash (blocking; use password_hasher in handlers)."""
     return pwd_context.hash(password)
 
 
@@ -36,6 +51,7 @@ def create_access_token(user_id: UUID, expires_delta: Optional[timedelta] = None
         "sub": str(user_id),
         "exp": expire,
         "type": "access",
+        "jti": uuid4().hex,  # Lets the token be revoked individually
     }
 
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
@@ -50,20 +66,101 @@ def create_refresh_token(user_id: UUID) -> str:
         "sub": str(user_id),
         "exp": expire,
         "type": "refresh",
+        "jti": uuid4().hex,
     }
 
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified JWT claims, keyed by a digest of the token.
+
+    Clients reuse the same access token for every request until it expires, so
+    the signature check and JSON parsing only need to happen once per token.
+    Entries are dropped at the token's `exp`; tokens that fail verification are
+    never cached.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the cached claims of a token that has not expired yet."""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            CACHE_REQUESTS.labels("token", "miss").inc()
+            return None
+
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            CACHE_REQUESTS.labels("token", "miss").inc()
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        CACHE_REQUESTS.labels("token", "local_hit").inc()
+        return claims
+
+    def set(self, token: str, claims: Dict[str, Any]) -> None:
+        """Remember the claims of a verified token until it expires."""
+        if self.max_entries <= 0 or not isinstance(claims.get("exp"), (int, float)):
+            return
+
+        key = self._key(token)
+        self._entries[key] = (float(claims["exp"]), claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+# Verified access/refresh token claims
+token_cache = VerifiedTokenCache(max_entries=settings.JWT_CACHE_MAX_ENTRIES)
+
+
 def decode_token(token: str) -> dict:
     """Decode and verify JWT token."""
+    claims = token_cache.get(token)
+    if claims is not None:
+        return dict(claims)
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return {}
 
+    token_cache.set(token, payload)
+    return dict(payload)
+
 
 def verify_token(token: str, token_type: str = "access") -> Optional[UUID]:
     """Verify token and return user ID if valid."""
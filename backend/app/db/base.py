@@ -1,8 +1,6 @@
 """Database base configuration."""
 
-from sqlalchemy.ext.declarative import declarative_base
-
-Base = declarative_base()
+from app.db.base_class import Base  # noqa: F401
 
 # Import all models here for Alembic to detect them
 from app.models.user import User, UserProfile, Device  # noqa: F401, E402
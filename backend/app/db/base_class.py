@@ -0,0 +1,5 @@
+"""Declarative base class shared by all models."""
+
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
@@ -0,0 +1,148 @@
+"""Connection pool gauges and slow-query logging."""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import (
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_CONNECTIONS,
+    DB_QUERY_DURATION,
+)
+
+logger = get_logger(__name__)
+
+# Logged statements are cut to this length; parameters are never logged
+SLOW_QUERY_LOG_CHARS = 500
+
+
+class DatabaseMonitor:
+    """
+    Live pool gauges, checkout wait times and a slow-query log for an engine.
+
+    Checkout wait is the time a session spends getting a connection from the
+    pool, including opening a new one. It stays near zero until the pool is
+    exhausted, so together with the checked-out and overflow gauges it shows
+    whether pool_size/max_overflow fit the load. Statements slower than
+    `slow_query_ms` are logged without their parameters, which may hold
+    personal data. Everything is also exported to Prometheus, labelled with
+    the monitor's `name`.
+    """
+
+    def __init__(self, name: str, slow_query_ms: int):
+        self.name = name
+        self.slow_query_ms = slow_query_ms
+        self._engine: Optional[AsyncEngine] = None
+
+        # Metrics
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.queries = 0
+        self.slow_queries = 0
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """Start timing the statements run through `engine`."""
+        self._engine = engine
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+        event.listen(sync_engine, "checkout", self._update_pool_gauges)
+        event.listen(sync_engine, "checkin", self._after_checkin)
+
+    def pool_class(self, use_pool: bool) -> Type[Pool]:
+        """A pool class (queue pool or NullPool) that reports checkout waits here."""
+        monitor = self
+        base = AsyncAdaptedQueuePool if use_pool else NullPool
+
+        class MonitoredPool(base):
+            def _do_get(self):
+                started = time.perf_counter()
+                try:
+                    connection = super()._do_get()
+                except exc.TimeoutError:
+                    monitor.record_checkout(time.perf_counter() - started, timed_out=True)
+                    raise
+                monitor.record_checkout(time.perf_counter() - started)
+                return connection
+
+        MonitoredPool.__name__ = f"Monitored{base.__name__}"
+        return MonitoredPool
+
+    def record_checkout(self, seconds: float, timed_out: bool = False) -> None:
+        if timed_out:
+            self.checkout_timeouts += 1
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(self.name).inc()
+            return
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        DB_POOL_CHECKOUT_WAIT.labels(self.name).observe(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current pool gauges and cumulative wait and query counters."""
+        pool = self._engine.pool if self._engine is not None else None
+        gauges: Dict[str, Any] = {"pool": type(pool).__name__ if pool is not None else None}
+        if isinstance(pool, QueuePool):
+            gauges.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(0, pool.overflow()),  # Negative until the pool has filled
+            )
+
+        return {
+            **gauges,
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "wait_ms_avg": self.wait_seconds_total / self.checkouts * 1000 if self.checkouts else 0.0,
+            "wait_ms_max": self.wait_seconds_max * 1000,
+            "queries": self.queries,
+            "slow_queries": self.slow_queries,
+            "slow_query_ms": self.slow_query_ms,
+        }
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed_ms = (time.perf_counter() - conn.info["query_started_at"].pop()) * 1000
+        self.queries += 1
+        DB_QUERY_DURATION.labels(self.name).observe(elapsed_ms / 1000)
+        if self.slow_query_ms and elapsed_ms >= self.slow_query_ms:
+            self.slow_queries += 1
+            statement = " ".join(statement.split())[:SLOW_QUERY_LOG_CHARS]
+            logger.warning(f"Slow query ({elapsed_ms:.0f} ms): {statement}")
+
+    def _handle_error(self, context) -> None:
+        started = context.connection.info.get("query_started_at") if context.connection else None
+        if started:
+            started.pop()
+
+    def _after_checkin(self, *args: Any) -> None:
+        # The pool counts the connection as returned only after this event
+        try:
+            asyncio.get_running_loop().call_soon(self._update_pool_gauges)
+        except RuntimeError:
+            self._update_pool_gauges()
+
+    def _update_pool_gauges(self, *args: Any) -> None:
+        pool = self._engine.pool if self._engine is not None else None
+        if isinstance(pool, QueuePool):
+            DB_POOL_CONNECTIONS.labels(self.name, "checked_out").set(pool.checkedout())
+            DB_POOL_CONNECTIONS.labels(self.name, "idle").set(pool.checkedin())
+            DB_POOL_CONNECTIONS.labels(self.name, "overflow").set(max(0, pool.overflow()))
+
+
+# Global monitors for the application engines
+db_monitor = DatabaseMonitor(name="primary", slow_query_ms=settings.DB_SLOW_QUERY_MS)
+replica_monitor = DatabaseMonitor(name="replica", slow_query_ms=settings.DB_SLOW_QUERY_MS)
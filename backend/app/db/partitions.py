@@ -0,0 +1,101 @@
+"""Monthly range partitions of chat_messages."""
+
+import re
+from datetime import date, datetime
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+PARTITIONED_TABLE = "chat_messages"
+
+_PARTITION_NAME = re.compile(rf"^{PARTITIONED_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(value: Union[date, datetime]) -> date:
+    """First day of the month containing `value`."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    """The first of the month `count` months after (or before) `month`."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Name of the partition holding `month`, e.g. chat_messages_p2026_10."""
+    return f"{PARTITIONED_TABLE}_p{month:%Y_%m}"
+
+
+def parse_partition_name(name: str) -> Optional[date]:
+    """Month held by a partition, or None if the name is not a monthly partition."""
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+async def list_partitions(conn: AsyncConnection) -> List[Tuple[str, date]]:
+    """Attached monthly partitions as (name, month), oldest first."""
+    result = await conn.execute(
+        text(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :table
+            """
+        ),
+        {"table": PARTITIONED_TABLE},
+    )
+    partitions = [(name, parse_partition_name(name)) for name in result.scalars()]
+    return sorted((name, month) for name, month in partitions if month is not None)
+
+
+async def list_detached_partitions(conn: AsyncConnection) -> List[Tuple[str, date]]:
+    """Monthly partitions detached (but not yet dropped) as (name, month), oldest first."""
+    result = await conn.execute(
+        text(
+            """
+            SELECT relname
+            FROM pg_class
+            WHERE relkind = 'r'
+              AND relnamespace = current_schema()::regnamespace
+              AND relname LIKE :pattern
+              AND NOT relispartition
+            """
+        ),
+        {"pattern": f"{PARTITIONED_TABLE}_p%"},
+    )
+    partitions = [(name, parse_partition_name(name)) for name in result.scalars()]
+    return sorted((name, month) for name, month in partitions if month is not None)
+
+
+async def ensure_partitions(conn: AsyncConnection, first: date, last: date) -> List[str]:
+    """
+    Create the missing monthly partitions from `first` through `last`.
+
+    Returns:
+        Names of the partitions created
+    """
+    existing = {month for _, month in await list_partitions(conn)}
+    created = []
+
+    month = month_start(first)
+    while month <= last:
+        if month not in existing:
+            name = partition_name(month)
+            # Bounds are generated dates, never user input; DDL takes no bind parameters
+            await conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARTITIONED_TABLE} "
+                    f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                    f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+                )
+            )
+            created.append(name)
+        month = add_months(month, 1)
+
+    return created
@@ -0,0 +1,98 @@
+"""Database engine profiles."""
+
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+from app.core.config import Settings
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    """Connection pool and driver settings for one kind of process."""
+
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float  # Seconds to wait for a free connection
+    pool_recycle: int  # Seconds before a connection is replaced; -1 never
+    pool_pre_ping: bool  # Test connections on checkout (one extra round trip)
+    statement_cache_size: int  # asyncpg prepared statements per connection; 0 disables
+    use_pool: bool = True  # False opens a connection per checkout (NullPool)
+
+
+PROFILES: Dict[str, EngineProfile] = {
+    # API workers: many short concurrent requests
+    "web": EngineProfile(
+        pool_size=10,
+        max_overflow=20,
+        pool_timeout=10.0,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        statement_cache_size=100,
+    ),
+    # Scripts and background jobs: few long-running connections
+    "worker": EngineProfile(
+        pool_size=2,
+        max_overflow=3,
+        pool_timeout=60.0,
+        pool_recycle=3600,
+        pool_pre_ping=True,
+        statement_cache_size=100,
+    ),
+    # Behind PgBouncer in transaction mode: pooling and prepared statements
+    # are the bouncer's job, and server connections are not pinned to us
+    "pgbouncer": EngineProfile(
+        pool_size=0,
+        max_overflow=0,
+        pool_timeout=10.0,
+        pool_recycle=-1,
+        pool_pre_ping=False,
+        statement_cache_size=0,
+        use_pool=False,
+    ),
+}
+
+
+def resolve_profile(settings: Settings) -> EngineProfile:
+    """
+    The profile named by DB_ENGINE_PROFILE with any DB_* overrides applied.
+
+    Raises:
+        ValueError: If the profile name is unknown
+    """
+    try:
+        profile = PROFILES[settings.DB_ENGINE_PROFILE]
+    except KeyError:
+        raise ValueError(
+            f"Unknown DB_ENGINE_PROFILE {settings.DB_ENGINE_PROFILE!r}; "
+            f"expected one of: {', '.join(PROFILES)}"
+        )
+
+    overrides: Dict[str, Optional[Any]] = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    return replace(profile, **{name: value for name, value in overrides.items() if value is not None})
+
+
+def engine_options(profile: EngineProfile) -> Dict[str, Any]:
+    """Keyword arguments for `create_async_engine` (apart from the pool class)."""
+    options: Dict[str, Any] = {
+        "pool_pre_ping": profile.pool_pre_ping,
+        "connect_args": {
+            # SQLAlchemy's own cache of prepared statements, and asyncpg's
+            "prepared_statement_cache_size": profile.statement_cache_size,
+            "statement_cache_size": profile.statement_cache_size,
+        },
+    }
+    if profile.use_pool:
+        options.update(
+            pool_size=profile.pool_size,
+            max_overflow=profile.max_overflow,
+            pool_timeout=profile.pool_timeout,
+            pool_recycle=profile.pool_recycle,
+        )
+    return options
@@ -0,0 +1,51 @@
+"""Redis client configuration."""
+
+import asyncio
+from typing import Callable, Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Get the shared async Redis client (connections are opened lazily)."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        )
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the shared Redis connection pool."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def run_subscriber(channel: str, handler: Callable[[str], None]) -> None:
+    """Deliver messages published on `channel` to `handler` until cancelled, reconnecting on errors."""
+    while True:
+        pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(channel)
+            while True:
+                message = await pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    handler(message["data"])
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Redis subscriber for {channel} disconnected: {str(e)}")
+            await asyncio.sleep(1.0)
+        finally:
+            await pubsub.aclose()
@@ -0,0 +1,133 @@
+"""Routing of reads between the primary and the read replica."""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+import redis.asyncio as redis
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.redis import get_redis
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "seva:recent-write:"
+MAX_LOCAL_ENTRIES = 10000  # Expired windows are pruned beyond this
+
+
+class ReplicaRouter:
+    """
+    Decides whether a user's reads may go to the replica.
+
+    Replicas lag the primary, so a user who has just written is sent to the
+    primary for `window_seconds` after the commit and sees their own writes.
+    Commits are attributed to the user in `session.info["user_id"]` (set by
+    get_current_user) and recorded locally and in Redis, so the window holds
+    whichever worker serves the next read. If Redis cannot be asked, reads go
+    to the primary.
+    """
+
+    def __init__(self, window_seconds: float, enabled: bool):
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+
+        self._local: Dict[UUID, float] = {}  # user id -> end of window (monotonic)
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Metrics
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.redis_errors = 0
+
+    def mark_write(self, user_id: UUID) -> None:
+        """Start the read-your-writes window of a user (from a sync hook)."""
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+        self._local[user_id] = now + self.window_seconds
+        if len(self._local) > MAX_LOCAL_ENTRIES:
+            self._local = {uid: until for uid, until in self._local.items() if until > now}
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Committed from a script; nothing reads through the router
+
+        task = loop.create_task(self._publish_write(user_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def use_replica(self, user_id: UUID) -> bool:
+        """Whether the user's next read may be served by the replica."""
+        if not self.enabled:
+            return False
+
+        recent = self._local.get(user_id, 0.0) > time.monotonic()
+        if not recent:
+            try:
+                recent = bool(await get_redis().exists(KEY_PREFIX + str(user_id)))
+            except (redis.RedisError, OSError) as e:
+                self.redis_errors += 1
+                logger.warning(f"Replica router Redis check failed: {str(e)}")
+                recent = True
+
+        if recent:
+            self.primary_reads += 1
+        else:
+            self.replica_reads += 1
+        return not recent
+
+    def stats(self) -> Dict[str, Any]:
+        """Read routing counters."""
+        return {
+            "enabled": self.enabled,
+            "window_seconds": self.window_seconds,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "redis_errors": self.redis_errors,
+        }
+
+    async def _publish_write(self, user_id: UUID) -> None:
+        try:
+            await get_redis().set(
+                KEY_PREFIX + str(user_id), 1, px=int(self.window_seconds * 1000)
+            )
+        except (redis.RedisError, OSError) as e:
+            self.redis_errors += 1
+            logger.warning(f"Replica router Redis mark failed: {str(e)}")
+
+
+# Global replica router instance; inactive without a replica
+replica_router = ReplicaRouter(
+    window_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    enabled=bool(settings.DATABASE_REPLICA_URL),
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flushed_write(session: Session, flush_context: Any) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_statement_write(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _start_read_your_writes(session: Session) -> None:
+    """Keep the committing user's reads on the primary for a while."""
+    user_id: Optional[UUID] = session.info.get("user_id")
+    if session.info.pop("wrote", False) and user_id is not None:
+        replica_router.mark_write(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session: Session) -> None:
+    session.info.pop("wrote", None)
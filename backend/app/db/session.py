@@ -1,18 +1,39 @@
 """Database session configuration."""
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.monitoring import DatabaseMonitor, db_monitor, replica_monitor
+from app.db.profiles import engine_options, resolve_profile
+
+# Engine settings come from the configured profile (DB_ENGINE_PROFILE)
+engine_profile = resolve_profile(settings)
+
+
+def _create_engine(url: str, monitor: DatabaseMonitor) -> AsyncEngine:
+    """Create an async engine from the profile, reporting to `monitor`."""
+    new_engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        future=True,
+        poolclass=monitor.pool_class(engine_profile.use_pool),
+        **engine_options(engine_profile),
+    )
+    monitor.instrument(new_engine)
+    return new_engine
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+
+# Create async engine (primary: all writes, and reads that must be fresh)
+engine = _create_engine(settings.DATABASE_URL, db_monitor)
+
+# Optional read replica for read-only endpoints (see app.api.deps.get_read_db)
+replica_engine: Optional[AsyncEngine] = (
+    _create_engine(settings.DATABASE_REPLICA_URL, replica_monitor)
+    if settings.DATABASE_REPLICA_URL
+    else None
 )
 
 # Create async session factory
@@ -24,6 +45,18 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False,
 )
 
+ReplicaSessionLocal: Optional[sessionmaker] = (
+    sessionmaker(
+        replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+    if replica_engine is not None
+    else None
+)
+
 
 async def get_db() -> AsyncSession:
     """Dependency for getting async database sessions."""
@@ -6,10 +6,24 @@ from typing import AsyncGenerator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from app.core.config import settings
 from app.core.logging import setup_logging
+from app.core.metrics import event_loop_monitor, mark_process_dead, render
+from app.db.redis import close_redis
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.request_id import RequestIdMiddleware
+from app.services.claude import claude_service
+from app.services.context_cache import context_cache
+from app.services.message_archive import message_archiver
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.profiler import request_profiler
+from app.services.readiness import readiness_probe
+from app.services.token_revocation import token_revocation
 
 # Initialize logging
 setup_logging()
@@ -25,15 +39,29 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
 
     # TODO: Initialize database connection
     # TODO: Initialize Weaviate client
-    # TODO: Initialize Redis client
+    await context_cache.start()
+    await principal_cache.start()
+    await token_revocation.start()
+    await message_archiver.start()
+    await event_loop_monitor.start()
+    await request_profiler.start()
 
     yield
 
     # Shutdown
     print("👋 Shutting down Smart AI Backend...")
+    await claude_service.close()
+    password_hasher.close()
+    await context_cache.stop()
+    await principal_cache.stop()
+    await token_revocation.stop()
+    await message_archiver.stop()
+    await event_loop_monitor.stop()
+    await request_profiler.stop()
+    mark_process_dead()
     # TODO: Close database connections
     # TODO: Close Weaviate client
-    # TODO: Close Redis client
+    await close_redis()
 
 
 # Create FastAPI application
@@ -47,6 +75,10 @@ app = FastAPI(
 )
 
 
+# Rate limiting (added first so CORS headers still reach 429 responses)
+app.add_middleware(RateLimitMiddleware)
+
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -61,6 +93,20 @@ app.add_middleware(
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 
+# Request metrics (added last so it times everything above, rate-limited requests included)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+# Request profiling (not even added unless enabled)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+
+# Request ids (outermost, so every log record of a request carries its id)
+app.add_middleware(RequestIdMiddleware)
+
+
 # Health Check Endpoints
 @app.get("/health", tags=["Health"])
 async def health_check():
@@ -77,22 +123,27 @@ async def health_check():
 
 @app.get("/health/ready", tags=["Health"])
 async def readiness_check():
-    """Readiness check - verifies all dependencies are available."""
-    # TODO: Check database connection
-    # TODO: Check Weaviate connection
-    # TODO: Check Redis connection
+    """Readiness check - verifies all dependencies are available, with their latency."""
+    report = await readiness_probe.check()
 
     return JSONResponse(
-        status_code=200,
-        content={
-            "status": "ready",
-            "database": "connected",
-            "weaviate": "connected",
-            "redis": "connected",
-        },
+        status_code=200 if report.ready else 503,
+        content=report.to_dict(),
+        headers={"Cache-Control": "no-store"},
     )
 
 
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def metrics():
+    """Prometheus metrics of this process, or of all workers in multiprocess mode."""
+    # Sync so the multiprocess file reads run in the threadpool, off the event loop
+    if not settings.METRICS_ENABLED:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+
+    content, content_type = render()
+    return Response(content=content, headers={"Content-Type": content_type})
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint."""
@@ -105,10 +156,11 @@ async def root():
 
 
 # Include API routers
-from app.api.v1 import auth, chat
+from app.api.v1 import admin, auth, chat
 
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["Chat"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["Admin"])
 
 # TODO: Add more routers as they're implemented
 # from app.api.v1 import health, users, voice
@@ -0,0 +1,56 @@
+"""Per-route request metrics."""
+
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS, HTTP_REQUESTS_IN_PROGRESS
+
+# Label of requests matching no route, so unknown paths cannot blow up the series count
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_of(scope: Scope) -> str:
+    """Path template of the route a request goes to, e.g. /api/v1/chat/sessions/{session_id}."""
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path  # Path matches but not the method: a 405
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Count requests and time them, from receiving them to the end of the response body."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        # Resolved up front so the in-progress gauge carries the route too
+        route = route_of(scope)
+        status_code = 500  # Unless a response starts
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            in_progress.dec()
@@ -0,0 +1,35 @@
+"""Request profiling (app.services.profiler)."""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.profiler import request_profiler
+
+
+class ProfilingMiddleware:
+    """Profile the requests picked by the request profiler. Only added when profiling is enabled."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profiled = request_profiler.begin()
+        if profiled is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500  # Unless a response starts
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_profiler.end(profiled, scope["method"], scope["path"], status_code)
@@ -0,0 +1,266 @@
+"""Per-user rate limiting shared across workers."""
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional
+
+import redis.asyncio as redis
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.security import decode_token
+from app.db.redis import get_redis
+from app.middleware.metrics import route_of
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "seva:rl:"
+WINDOW_SECONDS = 60
+
+# Probes and docs are never limited
+EXEMPT_PATH_PREFIXES = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """A request budget per client for the requests it matches."""
+
+    name: str
+    limit: int  # Requests per WINDOW_SECONDS
+    methods: FrozenSet[str] = frozenset()  # Empty matches any method
+    paths: FrozenSet[str] = frozenset()  # Empty matches any path
+    per_route: bool = False  # A separate budget for each route template rather than one for all
+
+    @property
+    def rate(self) -> float:
+        """Tokens refilled per second."""
+        return self.limit / WINDOW_SECONDS
+
+    def matches(self, method: str, path: str) -> bool:
+        return (not self.methods or method in self.methods) and (
+            not self.paths or path.rstrip("/") in self.paths
+        )
+
+
+@dataclass
+class TokenBucket:
+    """Local view of one client's budget under one rule."""
+
+    tokens: float
+    updated_at: float
+    pending: int = 0  # Requests admitted since the last Redis sync
+    synced_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of one request against its rule."""
+
+    allowed: bool
+    rule: RateLimitRule
+    tokens: float
+
+    def headers(self) -> Dict[str, str]:
+        """RateLimit-* headers (IETF draft), plus Retry-After when rejected."""
+        rule = self.rule
+        headers = {
+            "RateLimit-Limit": str(rule.limit),
+            "RateLimit-Remaining": str(max(0, int(self.tokens))),
+            "RateLimit-Reset": str(math.ceil(max(0.0, rule.limit - self.tokens) / rule.rate)),
+            "RateLimit-Policy": f"{rule.limit};w={WINDOW_SECONDS}",
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil((1 - self.tokens) / rule.rate)))
+        return headers
+
+
+class RateLimiter:
+    """
+    Token buckets per (rule, client), kept in step across workers through Redis.
+
+    Each worker admits requests from a local token bucket, so rejecting a client
+    that is over budget never leaves the process. Admitted requests are pushed to
+    a Redis sliding-window counter (current plus weighted previous minute) every
+    few requests or every SYNC_INTERVAL. The global estimate that comes back caps
+    the local bucket, so the limit holds however many workers share the
+    client's traffic. Tight budgets sync on every request. If Redis is
+    unavailable, each worker enforces the limit on its own.
+    """
+
+    def __init__(
+        self,
+        rules: List[RateLimitRule],
+        sync_batch: int,
+        sync_interval: float,
+        max_buckets: int,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.rules = rules
+        self.sync_batch = sync_batch
+        self.sync_interval = sync_interval
+        self.max_buckets = max_buckets
+
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+        # Metrics
+        self.allowed_total: Dict[str, int] = {rule.name: 0 for rule in rules}
+        self.rejected_total: Dict[str, int] = {rule.name: 0 for rule in rules}
+        self.redis_errors = 0
+
+    def rule_for(self, method: str, path: str) -> Optional[RateLimitRule]:
+        """First rule matching the request, if any."""
+        return next((rule for rule in self.rules if rule.matches(method, path)), None)
+
+    async def hit(
+        self, identity: str, rule: RateLimitRule, route: Optional[str] = None
+    ) -> RateLimitDecision:
+        """Spend one request of `identity`'s budget under `rule`, on `route` for per-route rules."""
+        key = f"{rule.name}:{route}:{identity}" if rule.per_route else f"{rule.name}:{identity}"
+        now = time.monotonic()
+        bucket = self._refill(key, rule, now)
+
+        if bucket.tokens < 1:
+            return self._decide(False, rule, bucket)
+
+        bucket.tokens -= 1
+        bucket.pending += 1
+
+        batch = max(1, min(self.sync_batch, rule.limit // 10))
+        if bucket.pending >= batch or now - bucket.synced_at >= self.sync_interval:
+            estimate = await self._sync(key, bucket, now)
+            if estimate is not None:
+                bucket.tokens = min(bucket.tokens, max(0.0, rule.limit - estimate))
+                if estimate > rule.limit:
+                    return self._decide(False, rule, bucket)
+
+        return self._decide(True, rule, bucket)
+
+    def stats(self) -> Dict[str, Any]:
+        """Admission counters per rule."""
+        return {
+            "buckets": len(self._buckets),
+            "rules": {rule.name: rule.limit for rule in self.rules},
+            "allowed_total": dict(self.allowed_total),
+            "rejected_total": dict(self.rejected_total),
+            "redis_errors": self.redis_errors,
+        }
+
+    def _refill(self, key: str, rule: RateLimitRule, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(tokens=float(rule.limit), updated_at=now)
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket.tokens = min(rule.limit, bucket.tokens + (now - bucket.updated_at) * rule.rate)
+            bucket.updated_at = now
+        return bucket
+
+    async def _sync(self, key: str, bucket: TokenBucket, now: float) -> Optional[float]:
+        """Push pending requests to the shared window; return the global estimate."""
+        pending, bucket.pending, bucket.synced_at = bucket.pending, 0, now
+
+        wall = time.time()
+        window = int(wall // WINDOW_SECONDS)
+        elapsed = (wall % WINDOW_SECONDS) / WINDOW_SECONDS
+        current_key = f"{KEY_PREFIX}{key}:{window}"
+
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.incrby(current_key, pending)
+                pipe.expire(current_key, WINDOW_SECONDS * 2)
+                pipe.get(f"{KEY_PREFIX}{key}:{window - 1}")
+                current, _, previous = await pipe.execute()
+        except (redis.RedisError, OSError) as e:
+            self.redis_errors += 1
+            logger.warning(f"Rate limit Redis sync failed: {str(e)}")
+            return None
+
+        return int(previous or 0) * (1 - elapsed) + int(current)
+
+    def _decide(self, allowed: bool, rule: RateLimitRule, bucket: TokenBucket) -> RateLimitDecision:
+        counters = self.allowed_total if allowed else self.rejected_total
+        counters[rule.name] += 1
+        return RateLimitDecision(allowed=allowed, rule=rule, tokens=bucket.tokens)
+
+
+def _client_identity(scope: Scope) -> str:
+    """The authenticated user of a request, or its client address."""
+    for name, value in scope["headers"]:
+        if name == b"authorization" and value[:7].lower() == b"bearer ":
+            subject = decode_token(value[7:].decode("latin-1")).get("sub")
+            if subject:
+                return f"user:{subject}"
+            break
+
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """Reject requests over their rate limit with 429, and tag others with RateLimit-* headers."""
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.limiter.enabled
+            or scope["path"] == "/"
+            or scope["path"].startswith(EXEMPT_PATH_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.limiter.rule_for(scope["method"], scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        route = f"{scope['method']} {route_of(scope)}" if rule.per_route else None
+        decision = await self.limiter.hit(_client_identity(scope), rule, route)
+        headers = decision.headers()
+
+        if not decision.allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests, please slow down"},
+                headers=headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+# Global rate limiter instance; the first matching rule applies
+rate_limiter = RateLimiter(
+    rules=[
+        RateLimitRule(
+            name="chat_send",
+            limit=settings.RATE_LIMIT_CHAT_SEND_PER_MINUTE,
+            methods=frozenset({"POST"}),
+            paths=frozenset({"/api/v1/chat/send", "/api/v1/chat/send/stream"}),
+        ),
+        RateLimitRule(name="default", limit=settings.RATE_LIMIT_PER_MINUTE, per_route=True),
+    ],
+    sync_batch=settings.RATE_LIMIT_SYNC_BATCH,
+    sync_interval=settings.RATE_LIMIT_SYNC_INTERVAL_SECONDS,
+    max_buckets=settings.RATE_LIMIT_MAX_BUCKETS,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
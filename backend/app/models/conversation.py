@@ -5,17 +5,22 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String, Text, Integer, Numeric
+from sqlalchemy import Boolean, CheckConstraint, Column, DateTime, ForeignKey, Index, String, Text, Integer, Numeric, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
-from app.db.base import Base
+from app.db.base_class import Base
 
 
 class ConversationSession(Base):
     """Conversation session model."""
 
     __tablename__ = "conversation_sessions"
+    __table_args__ = (
+        # Serves the newest-first, keyset-paginated session list and its count;
+        # scanned backwards for ORDER BY started_at DESC, id DESC
+        Index("idx_sessions_user_started_at", "user_id", "started_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -24,7 +29,8 @@ class ConversationSession(Base):
     ended_at = Column(DateTime(timezone=True), nullable=True)
     message_count = Column(Integer, nullable=False, default=0)
     is_active = Column(Boolean, nullable=False, default=True)
-    metadata = Column(JSONB, nullable=False, default=dict)
+    # "metadata" is reserved by the declarative API, so map it under another name
+    metadata_ = Column("metadata", JSONB, nullable=False, default=dict, server_default=text("'{}'"))
 
     # Relationships
     user = relationship("User", back_populates="conversation_sessions")
@@ -38,6 +44,16 @@ class ChatMessage(Base):
     """Chat message model."""
 
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Serves the context window scan, summary folds and message pagination of
+        # a session, all keyset-paginated on (created_at, id)
+        Index("idx_messages_session_keyset", "session_id", "created_at", "id"),
+        # Serves the ON DELETE CASCADE from users
+        Index("idx_messages_user_id", "user_id"),
+        CheckConstraint("sender IN ('user', 'ai')", name="chat_messages_sender_check"),
+        # Monthly partitions (app.db.partitions); old ones are archived by MessageArchiver
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey("conversation_sessions.id", ondelete="CASCADE"), nullable=False)
@@ -46,10 +62,12 @@ class ChatMessage(Base):
     sender = Column(String(10), nullable=False)  # 'user' or 'ai'
     sentiment_score = Column(Numeric(3, 2), nullable=True)
     sentiment_label = Column(String(20), nullable=True)
-    health_signals = Column(JSONB, nullable=False, default=list)
+    health_signals = Column(JSONB, nullable=False, default=list, server_default=text("'[]'"))
     tokens_used = Column(Integer, nullable=True)
-    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
-    metadata = Column(JSONB, nullable=False, default=dict)
+    # Part of the primary key because it is the partition key
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=datetime.utcnow)
+    # "metadata" is reserved by the declarative API, so map it under another name
+    metadata_ = Column("metadata", JSONB, nullable=False, default=dict, server_default=text("'{}'"))
 
     # Relationships
     session = relationship("ConversationSession", back_populates="messages")
@@ -4,20 +4,23 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String, Date, Text
+from sqlalchemy import Boolean, CheckConstraint, Column, DateTime, ForeignKey, Index, String, Date, Text, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
-from app.db.base import Base
+from app.db.base_class import Base
 
 
 class User(Base):
     """User model for authentication and profile."""
 
     __tablename__ = "users"
+    __table_args__ = (
+        CheckConstraint("role IN ('user', 'caregiver', 'admin')", name="users_role_check"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    email = Column(String(255), unique=True, nullable=False, index=True)
+    email = Column(String(255), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     full_name = Column(String(255), nullable=False)
     role = Column(String(50), nullable=False, default="user")
@@ -52,7 +55,7 @@ class UserProfile(Base):
     medical_conditions = Column(Text, nullable=True)
     medications = Column(Text, nullable=True)
     allergies = Column(Text, nullable=True)
-    preferences = Column(JSONB, nullable=False, default=dict)
+    preferences = Column(JSONB, nullable=False, default=dict, server_default=text("'{}'"))
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -67,10 +70,16 @@ class Device(Base):
     """User device registration for push notifications."""
 
     __tablename__ = "devices"
+    __table_args__ = (
+        # Serves the ON DELETE CASCADE from users
+        Index("idx_devices_user_id", "user_id"),
+        Index("idx_devices_device_token", "device_token"),
+        CheckConstraint("device_type IN ('ios', 'android', 'web')", name="devices_device_type_check"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    device_token = Column(String(500), nullable=False, index=True)
+    device_token = Column(String(500), nullable=False)
     device_type = Column(String(50), nullable=False)  # ios, android, web
     device_name = Column(String(255), nullable=True)
     is_active = Column(Boolean, nullable=False, default=True)
@@ -5,7 +5,7 @@ from decimal import Decimal
 from typing import Optional, List
 from uuid import UUID
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict
 
 
 # Base schemas
@@ -53,7 +53,10 @@ class ConversationSessionResponse(ConversationSessionBase):
     ended_at: Optional[datetime] = None
     message_count: int
     is_active: bool
-    metadata: dict = Field(default_factory=dict)
+    metadata: dict = Field(
+        default_factory=dict,
+        validation_alias=AliasChoices("metadata_", "metadata"),
+    )
 
 
 class ChatMessageResponse(ChatMessageBase):
@@ -70,13 +73,18 @@ class ChatMessageResponse(ChatMessageBase):
     health_signals: List[dict] = Field(default_factory=list)
     tokens_used: Optional[int] = None
     created_at: datetime
-    metadata: dict = Field(default_factory=dict)
+    metadata: dict = Field(
+        default_factory=dict,
+        validation_alias=AliasChoices("metadata_", "metadata"),
+    )
 
 
 class ConversationSessionWithMessages(ConversationSessionResponse):
-    """Schema for conversation session with messages."""
+    """Schema for conversation session with a window of its messages, oldest first."""
 
     messages: List[ChatMessageResponse] = Field(default_factory=list)
+    older_cursor: Optional[str] = None  # Pass as `before` for older messages; None if none
+    newer_cursor: Optional[str] = None  # Pass as `after` for newer messages; None if the window is empty
 
 
 class ChatResponse(BaseModel):
@@ -87,10 +95,18 @@ class ChatResponse(BaseModel):
     ai_message: ChatMessageResponse
 
 
+class ConversationSessionSummary(ConversationSessionResponse):
+    """Schema for a conversation session in the session list."""
+
+    last_message_preview: Optional[str] = None
+    last_message_at: Optional[datetime] = None
+
+
 class ConversationSessionList(BaseModel):
     """Schema for paginated conversation sessions."""
 
-    sessions: List[ConversationSessionResponse]
+    sessions: List[ConversationSessionSummary]
     total: int
-    page: int
+    page: Optional[int] = None  # Only set for offset pagination
     page_size: int
+    next_cursor: Optional[str] = None  # None on the last page
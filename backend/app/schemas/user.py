@@ -1,7 +1,7 @@
 """User schemas for request/response validation."""
 
 from datetime import datetime, date
-from typing import Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
@@ -36,6 +36,12 @@ class UserRegister(UserBase):
     password: str = Field(..., min_length=8, max_length=100)
 
 
+class UserImportRow(UserRegister, UserProfileBase):
+    """One user in a bulk import file."""
+
+    pass
+
+
 class UserLogin(BaseModel):
     """Schema for user login."""
 
@@ -87,6 +93,25 @@ class UserWithProfile(UserResponse):
     profile: Optional[UserProfileResponse] = None
 
 
+class UserImportResult(BaseModel):
+    """Outcome of one row of a bulk import."""
+
+    row: int  # 1-based line (NDJSON) or record (CSV) number
+    email: Optional[str] = None
+    status: Literal["created", "invalid", "duplicate", "conflict"]
+    user_id: Optional[UUID] = None
+    errors: List[str] = Field(default_factory=list)
+
+
+class UserImportReport(BaseModel):
+    """Per-row report of a bulk import."""
+
+    total: int
+    created: int
+    failed: int
+    results: List[UserImportResult]
+
+
 # Token schemas
 class Token(BaseModel):
     """Schema for authentication token."""
@@ -102,9 +127,16 @@ class TokenPayload(BaseModel):
     sub: UUID
     exp: datetime
     type: str  # 'access' or 'refresh'
+    jti: Optional[str] = None  # Missing on tokens issued before revocation support
 
 
 class RefreshTokenRequest(BaseModel):
     """Schema for refresh token request."""
 
     refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    """Schema for logout request."""
+
+    refresh_token: Optional[str] = None  # Also revoked when given
@@ -1,24 +1,87 @@
 """Claude API service for AI conversations."""
 
-from typing import List, Dict, Optional
+import time
+from typing import Any, AsyncIterator, Hashable, List, Dict, Optional
 import anthropic
+import httpx
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import (
+    CLAUDE_ERRORS,
+    CLAUDE_QUEUE_WAIT,
+    CLAUDE_REQUEST_DURATION,
+    CLAUDE_TIME_TO_FIRST_TOKEN,
+    CLAUDE_TOKENS,
+)
+from app.services.governor import ConcurrencyGovernor
 
 logger = get_logger(__name__)
 
+# Latest Sonnet 3.5 model (2024-10-22)
+CLAUDE_MODEL = "claude-3-5-sonnet-20241022"
+
+# Default nurse persona system prompt
+DEFAULT_SYSTEM_PROMPT = """You are a compassionate AI companion designed to support elderly individuals.
+You have a warm, patient, and caring personality similar to a skilled nurse. You:
+- Listen actively and show genuine interest in their well-being
+- Use clear, simple language while being respectful
+- Remember details from past conversations
+- Gently inquire about their health and daily activities
+- Provide emotional support and encouragement
+- Never give medical diagnoses but encourage seeking professional help when needed
+- Are observant of mood changes or health concerns
+
+Always maintain a friendly, supportive tone and prioritize the user's comfort and well-being."""
+
+# System prompt for folding old turns into the running conversation summary
+SUMMARY_SYSTEM_PROMPT = """You maintain a running summary of a conversation between an elderly person and their AI companion.
+Update the current summary with the new conversation turns. Keep every fact that matters for
+future conversations: names, family and friends, health mentions, medications, mood, routines,
+preferences and plans. Drop small talk. Write compact plain prose of at most 250 words and
+return only the updated summary."""
+
+SUMMARIZER_QUEUE_KEY = "conversation-summarizer"
+
 
 class ClaudeService:
     """Service for interacting with Claude API."""
 
     def __init__(self):
-        """Initialize Claude client."""
+        """Initialize Claude client and the concurrency governor in front of it."""
+        self.governor = ConcurrencyGovernor(
+            max_concurrency=settings.CLAUDE_MAX_CONCURRENCY,
+            max_queue_size=settings.CLAUDE_MAX_QUEUE_SIZE,
+            queue_timeout=settings.CLAUDE_QUEUE_TIMEOUT_SECONDS,
+        )
+
         if not settings.ANTHROPIC_API_KEY:
             logger.warning("ANTHROPIC_API_KEY not set - Claude API will not work")
             self.client = None
         else:
-            self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+            # Async client over a pooled, keep-alive HTTP connection pool
+            self.client = anthropic.AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                base_url=settings.ANTHROPIC_BASE_URL or None,
+                timeout=settings.CLAUDE_TIMEOUT_SECONDS,
+                max_retries=settings.CLAUDE_MAX_RETRIES,
+                http_client=anthropic.DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.CLAUDE_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.CLAUDE_MAX_CONNECTIONS,
+                    ),
+                ),
+            )
+
+        # Prompt caching counters (tokens)
+        self.input_tokens_total = 0
+        self.cache_read_tokens_total = 0
+        self.cache_write_tokens_total = 0
+
+    async def close(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        if self.client:
+            await self.client.close()
 
     async def generate_response(
         self,
@@ -26,7 +89,9 @@ class ClaudeService:
         conversation_history: Optional[List[Dict[str, str]]] = None,
         system_prompt: Optional[str] = None,
         max_tokens: int = 1024,
-    ) -> tuple[str, int]:
+        user_id: Optional[Hashable] = None,
+        conversation_summary: Optional[str] = None,
+    ) -> tuple[str, int, Dict[str, int]]:
         """
         Generate AI response using Claude.
 
@@ -35,92 +100,270 @@ class ClaudeService:
             conversation_history: List of previous messages [{"role": "user/assistant", "content": "..."}]
             system_prompt: System prompt for persona
             max_tokens: Maximum tokens in response
+            user_id: Key used for fair queueing in the concurrency governor
+            conversation_summary: Running summary of turns older than the history
+
+        Raises:
+            GovernorOverloaded: If the request was shed because Claude is saturated
 
         Returns:
-            Tuple of (response_text, tokens_used)
+            Tuple of (response_text, tokens_used, usage) where usage breaks the tokens
+            down into input, output, cache-read and cache-write counts
         """
         if not self.client:
             raise ValueError("Claude API key not configured")
 
-        # Default nurse persona system prompt
-        if not system_prompt:
-            system_prompt = """You are a compassionate AI companion designed to support elderly individuals.
-You have a warm, patient, and caring personality similar to a skilled nurse. You:
-- Listen actively and show genuine interest in their well-being
-- Use clear, simple language while being respectful
-- Remember details from past conversations
-- Gently inquire about their health and daily activities
-- Provide emotional support and encouragement
-- Never give medical diagnoses but encourage seeking professional help when needed
-- Are observant of mood changes or health concerns
-
-Always maintain a friendly, supportive tone and prioritize the user's comfort and well-being."""
-
-        # Build messages array
-        messages = []
-
-        # Add conversation history if provided
-        if conversation_history:
-            messages.extend(conversation_history)
-
-        # Add current user message
-        messages.append({
-            "role": "user",
-            "content": user_message,
-        })
+        messages = self._build_messages(user_message, conversation_history)
 
+        queued = time.perf_counter()
         try:
             # Call Claude API
-            # Updated to use latest Sonnet 3.5 model (2024-10-22)
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",  # Latest Sonnet 3.5
-                max_tokens=max_tokens,
-                system=system_prompt,
-                messages=messages,
-            )
+            async with self.governor.slot(user_id):
+                started = time.perf_counter()
+                CLAUDE_QUEUE_WAIT.labels("generate").observe(started - queued)
+                response = await self.client.messages.create(
+                    model=CLAUDE_MODEL,
+                    max_tokens=max_tokens,
+                    system=self._build_system(system_prompt, conversation_summary),
+                    messages=messages,
+                )
+                CLAUDE_REQUEST_DURATION.labels("generate").observe(time.perf_counter() - started)
 
             # Extract response text
             response_text = response.content[0].text
 
             # Get token usage
-            tokens_used = response.usage.input_tokens + response.usage.output_tokens
+            usage = self._record_usage(response.usage)
+            tokens_used = sum(usage.values())
 
-            logger.info(f"Claude response generated - tokens used: {tokens_used}")
+            logger.info(
+                f"Claude response generated - tokens used: {tokens_used}, "
+                f"cache read: {usage['cache_read_input_tokens']}, "
+                f"cache write: {usage['cache_creation_input_tokens']}"
+            )
 
-            return response_text, tokens_used
+            return response_text, tokens_used, usage
 
         except anthropic.APIError as e:
+            CLAUDE_ERRORS.labels("generate").inc()
             logger.error(f"Claude API error: {str(e)}")
             raise ValueError(f"Failed to generate AI response: {str(e)}")
 
-    def format_conversation_history(
+    async def stream_response(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 1024,
+        user_id: Optional[Hashable] = None,
+        conversation_summary: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an AI response from Claude as it is generated.
+
+        Args:
+            user_message: The user's message
+            conversation_history: List of previous messages [{"role": "user/assistant", "content": "..."}]
+            system_prompt: System prompt for persona
+            max_tokens: Maximum tokens in response
+            user_id: Key used for fair queueing in the concurrency governor
+            conversation_summary: Running summary of turns older than the history
+
+        Yields:
+            {"type": "delta", "text": "..."} for every text delta, followed by a single
+            {"type": "done", "text": "...", "tokens_used": ..., "usage": {...}, "ttft_ms": ...} event
+        """
+        if not self.client:
+            raise ValueError("Claude API key not configured")
+
+        messages = self._build_messages(user_message, conversation_history)
+        started = time.perf_counter()
+        ttft_ms: Optional[float] = None
+
+        try:
+            async with self.governor.slot(user_id):
+                called = time.perf_counter()
+                CLAUDE_QUEUE_WAIT.labels("stream").observe(called - started)
+                async with self.client.messages.stream(
+                    model=CLAUDE_MODEL,
+                    max_tokens=max_tokens,
+                    system=self._build_system(system_prompt, conversation_summary),
+                    messages=messages,
+                ) as stream:
+                    async for text in stream.text_stream:
+                        if ttft_ms is None:
+                            ttft_ms = (time.perf_counter() - started) * 1000
+                            CLAUDE_TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - called)
+                        yield {"type": "delta", "text": text}
+
+                    response = await stream.get_final_message()
+                CLAUDE_REQUEST_DURATION.labels("stream").observe(time.perf_counter() - called)
+
+        except anthropic.APIError as e:
+            CLAUDE_ERRORS.labels("stream").inc()
+            logger.error(f"Claude API streaming error: {str(e)}")
+            raise ValueError(f"Failed to generate AI response: {str(e)}")
+
+        response_text = "".join(
+            block.text for block in response.content if block.type == "text"
+        )
+        usage = self._record_usage(response.usage)
+        tokens_used = sum(usage.values())
+        total_ms = (time.perf_counter() - started) * 1000
+
+        logger.info(
+            f"Claude response streamed - tokens used: {tokens_used}, "
+            f"ttft: {ttft_ms or total_ms:.0f}ms, total: {total_ms:.0f}ms"
+        )
+
+        yield {
+            "type": "done",
+            "text": response_text,
+            "tokens_used": tokens_used,
+            "usage": usage,
+            "ttft_ms": round(ttft_ms if ttft_ms is not None else total_ms, 1),
+            "total_ms": round(total_ms, 1),
+        }
+
+    async def summarize_conversation(
         self,
-        messages: List[tuple[str, str]],  # [(sender, content), ...]
-        max_messages: int = 10,
-    ) -> List[Dict[str, str]]:
+        previous_summary: Optional[str],
+        transcript: str,
+        max_tokens: int = 512,
+    ) -> str:
         """
-        Format conversation history for Claude API.
+        Fold new conversation turns into a running summary.
 
         Args:
-            messages: List of (sender, content) tuples
-            max_messages: Maximum number of recent messages to include
+            previous_summary: Current summary, or None for the first fold
+            transcript: The new turns, one "Speaker: text" line per message
+            max_tokens: Maximum tokens in the updated summary
 
         Returns:
-            Formatted messages for Claude API
+            The updated summary text
+        """
+        if not self.client:
+            raise ValueError("Claude API key not configured")
+
+        prompt = (
+            f"Current summary:\n{previous_summary or '(none yet)'}\n\n"
+            f"New conversation turns:\n{transcript}"
+        )
+
+        try:
+            # Background work queues behind a single shared key so it cannot crowd out users
+            queued = time.perf_counter()
+            async with self.governor.slot(SUMMARIZER_QUEUE_KEY):
+                started = time.perf_counter()
+                CLAUDE_QUEUE_WAIT.labels("summarize").observe(started - queued)
+                response = await self.client.messages.create(
+                    model=CLAUDE_MODEL,
+                    max_tokens=max_tokens,
+                    system=SUMMARY_SYSTEM_PROMPT,
+                    messages=[{"role": "user", "content": prompt}],
+                )
+                CLAUDE_REQUEST_DURATION.labels("summarize").observe(time.perf_counter() - started)
+
+            self._record_usage(response.usage)
+            return response.content[0].text.strip()
+
+        except anthropic.APIError as e:
+            CLAUDE_ERRORS.labels("summarize").inc()
+            logger.error(f"Claude API summarization error: {str(e)}")
+            raise ValueError(f"Failed to summarize conversation: {str(e)}")
+
+    def prompt_cache_stats(self) -> Dict[str, Any]:
+        """Cumulative prompt-cache token counts and hit ratio since startup."""
+        prompt_tokens = (
+            self.input_tokens_total + self.cache_read_tokens_total + self.cache_write_tokens_total
+        )
+        return {
+            "enabled": settings.CLAUDE_PROMPT_CACHING_ENABLED,
+            "input_tokens": self.input_tokens_total,
+            "cache_read_input_tokens": self.cache_read_tokens_total,
+            "cache_creation_input_tokens": self.cache_write_tokens_total,
+            "hit_ratio": self.cache_read_tokens_total / prompt_tokens if prompt_tokens else 0.0,
+        }
+
+    def _record_usage(self, usage: anthropic.types.Usage) -> Dict[str, int]:
+        """Break down token usage and add it to the prompt-cache counters."""
+        breakdown = {
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_read_input_tokens": usage.cache_read_input_tokens or 0,
+            "cache_creation_input_tokens": usage.cache_creation_input_tokens or 0,
+        }
+
+        self.input_tokens_total += breakdown["input_tokens"]
+        self.cache_read_tokens_total += breakdown["cache_read_input_tokens"]
+        self.cache_write_tokens_total += breakdown["cache_creation_input_tokens"]
+
+        for kind, tokens in breakdown.items():
+            CLAUDE_TOKENS.labels(kind.removesuffix("_tokens")).inc(tokens)
+
+        return breakdown
+
+    def _build_system(
+        self,
+        system_prompt: Optional[str] = None,
+        conversation_summary: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Build the system blocks, marking the persona as a cacheable prefix."""
+        persona: Dict[str, Any] = {"type": "text", "text": system_prompt or DEFAULT_SYSTEM_PROMPT}
+        if settings.CLAUDE_PROMPT_CACHING_ENABLED:
+            persona["cache_control"] = {"type": "ephemeral"}
+
+        blocks = [persona]
+
+        # The summary changes every few turns, so it goes after the persona breakpoint
+        if conversation_summary:
+            blocks.append({
+                "type": "text",
+                "text": f"Summary of your earlier conversation with this person:\n{conversation_summary}",
+            })
+
+        return blocks
+
+    def _build_messages(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Build the messages array: conversation history followed by the new user message.
+
+        With prompt caching enabled, the last history message carries a cache
+        breakpoint, so the persona plus all earlier turns are read from cache on
+        the next request. Claude only caches prefixes above a minimum size
+        (1024 tokens for Sonnet), so short sessions are simply billed as usual.
         """
-        formatted = []
+        messages = []
 
-        # Take only recent messages
-        recent_messages = messages[-max_messages:] if len(messages) > max_messages else messages
+        # Add conversation history if provided
+        if conversation_history:
+            messages.extend(dict(message) for message in conversation_history)
 
-        for sender, content in recent_messages:
-            role = "user" if sender == "user" else "assistant"
-            formatted.append({
-                "role": role,
-                "content": content,
+        # Add current user message, folding it into an unanswered user turn so
+        # roles keep alternating
+        if messages and messages[-1]["role"] == "user":
+            messages[-1]["content"] += "\n\n" + user_message
+        else:
+            messages.append({
+                "role": "user",
+                "content": user_message,
             })
 
-        return formatted
+        if settings.CLAUDE_PROMPT_CACHING_ENABLED and len(messages) > 1:
+            stable_prefix_end = messages[-2]
+            stable_prefix_end["content"] = [
+                {
+                    "type": "text",
+                    "text": stable_prefix_end["content"],
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+
+        return messages
 
 
 # Global Claude service instance
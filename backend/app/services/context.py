@@ -0,0 +1,205 @@
+"""Token-budgeted conversation context builder."""
+
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.conversation import ChatMessage
+
+# Rough average for English text with Claude's tokenizer
+CHARS_PER_TOKEN = 4
+
+# Role markers and separators the API adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the input tokens a message costs without calling the API."""
+    return MESSAGE_OVERHEAD_TOKENS + math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class ContextTurn:
+    """A single stored message in a context window."""
+
+    id: UUID
+    sender: str  # 'user' or 'ai'
+    content: str
+    created_at: datetime
+    tokens: int
+
+
+    @classmethod
+    def from_message(cls, message: ChatMessage) -> "ContextTurn":
+        """Build a turn from a stored chat message."""
+        return cls(
+            id=message.id,
+            sender=message.sender,
+            content=message.content,
+            created_at=message.created_at,
+            tokens=estimate_tokens(message.content),
+        )
+
+
+@dataclass
+class ContextWindow:
+    """The most recent turns of a session that fit in the token budget, oldest first."""
+
+    turns: List[ContextTurn] = field(default_factory=list)
+    truncated: bool = False  # Older messages exist that did not fit
+
+    @property
+    def tokens(self) -> int:
+        return sum(turn.tokens for turn in self.turns)
+
+    @property
+    def start(self) -> Optional[Tuple[datetime, UUID]]:
+        """Keyset cursor of the oldest turn in the window."""
+        if not self.turns:
+            return None
+        return self.turns[0].created_at, self.turns[0].id
+
+    def append(self, turns: List[ContextTurn], token_budget: Optional[int] = None) -> int:
+        """
+        Add new turns at the tail, evicting the oldest ones that no longer fit.
+
+        Returns:
+            Number of turns evicted from the head of the window
+        """
+        budget = token_budget if token_budget is not None else settings.CONTEXT_TOKEN_BUDGET
+
+        self.turns.extend(turns)
+
+        used = self.tokens
+        evicted = 0
+        while self.turns and (
+            used > budget or len(self.turns) > settings.CONTEXT_MAX_MESSAGES
+        ):
+            used -= self.turns.pop(0).tokens
+            evicted += 1
+            self.truncated = True
+
+        return evicted
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for the cache."""
+        return {
+            "truncated": self.truncated,
+            "turns": [
+                {
+                    "id": str(turn.id),
+                    "sender": turn.sender,
+                    "content": turn.content,
+                    "created_at": turn.created_at.isoformat(),
+                    "tokens": turn.tokens,
+                }
+                for turn in self.turns
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ContextWindow":
+        """Deserialize a cached window."""
+        return cls(
+            truncated=data["truncated"],
+            turns=[
+                ContextTurn(
+                    id=UUID(turn["id"]),
+                    sender=turn["sender"],
+                    content=turn["content"],
+                    created_at=datetime.fromisoformat(turn["created_at"]),
+                    tokens=turn["tokens"],
+                )
+                for turn in data["turns"]
+            ],
+        )
+
+    def to_messages(self) -> List[Dict[str, str]]:
+        """
+        Format the window for the Claude API.
+
+        Claude expects the conversation to open with a user turn and roles to
+        alternate, so leading assistant turns are dropped and consecutive turns
+        from the same side are merged.
+        """
+        formatted: List[Dict[str, str]] = []
+
+        for turn in self.turns:
+            role = "user" if turn.sender == "user" else "assistant"
+
+            if not formatted and role == "assistant":
+                continue
+
+            if formatted and formatted[-1]["role"] == role:
+                formatted[-1]["content"] += "\n\n" + turn.content
+            else:
+                formatted.append({"role": role, "content": turn.content})
+
+        return formatted
+
+
+async def build_context_window(
+    db: AsyncSession,
+    session_id: UUID,
+    token_budget: Optional[int] = None,
+) -> ContextWindow:
+    """
+    Collect the newest messages of a session that fit in `token_budget`.
+
+    Scans backwards from the newest message in keyset-paginated batches on
+    (created_at, id) and stops as soon as the budget or CONTEXT_MAX_MESSAGES is
+    reached, so both prompt size and rows read stay bounded however long the
+    session grows.
+    """
+    budget = token_budget if token_budget is not None else settings.CONTEXT_TOKEN_BUDGET
+    batch_size = settings.CONTEXT_SCAN_BATCH_SIZE
+
+    newest_first: List[ContextTurn] = []
+    used = 0
+    cursor: Optional[Tuple[datetime, UUID]] = None
+
+    while True:
+        query = (
+            select(
+                ChatMessage.id,
+                ChatMessage.sender,
+                ChatMessage.content,
+                ChatMessage.created_at,
+            )
+            .where(ChatMessage.session_id == session_id)
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+            .limit(batch_size)
+        )
+        if cursor is not None:
+            query = query.where(
+                tuple_(ChatMessage.created_at, ChatMessage.id) < tuple_(*cursor)
+            )
+
+        rows = (await db.execute(query)).all()
+
+        for row in rows:
+            tokens = estimate_tokens(row.content)
+            if used + tokens > budget or len(newest_first) >= settings.CONTEXT_MAX_MESSAGES:
+                return ContextWindow(turns=newest_first[::-1], truncated=True)
+
+            newest_first.append(
+                ContextTurn(
+                    id=row.id,
+                    sender=row.sender,
+                    content=row.content,
+                    created_at=row.created_at,
+                    tokens=tokens,
+                )
+            )
+            used += tokens
+
+        if len(rows) < batch_size:
+            return ContextWindow(turns=newest_first[::-1], truncated=False)
+
+        cursor = (rows[-1].created_at, rows[-1].id)
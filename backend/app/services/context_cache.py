@@ -0,0 +1,232 @@
+"""Two-tier cache of per-session conversation context."""
+
+import asyncio
+import json
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import CACHE_REQUESTS
+from app.db.redis import get_redis, run_subscriber
+from app.services.context import ContextWindow
+
+logger = get_logger(__name__)
+
+# A hash of the serialized context ("data") and its write count ("version")
+KEY_PREFIX = "seva:ctx:v2:"
+INVALIDATION_CHANNEL = "seva:ctx:invalidate"
+
+
+@dataclass
+class CachedContext:
+    """Cached prompt context of a session, together with its owner."""
+
+    user_id: UUID
+    window: ContextWindow
+    summary: Optional[str] = None  # Running summary of turns older than the window
+    version: int = 0  # Writes to the Redis tier this entry builds on; 0 if not read from the cache
+
+    def copy(self) -> "CachedContext":
+        """A copy whose window can be appended to without touching this one."""
+        return replace(
+            self, window=ContextWindow(turns=list(self.window.turns), truncated=self.window.truncated)
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "user_id": str(self.user_id),
+                "window": self.window.to_dict(),
+                "summary": self.summary,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str, version: int = 0) -> "CachedContext":
+        data = json.loads(raw)
+        return cls(
+            user_id=UUID(data["user_id"]),
+            window=ContextWindow.from_dict(data["window"]),
+            summary=data.get("summary"),
+            version=version,
+        )
+
+
+class SessionContextCache:
+    """
+    Conversation context cache: an in-process LRU in front of Redis.
+
+    Entries hold the already-packed context window of a session so steady chat
+    turns never read history from Postgres. Writes go to both tiers and are
+    announced on a pub/sub channel so other workers drop their local copy.
+    Redis failures degrade to misses; the database stays the source of truth.
+
+    Each Redis entry carries a version that every write bumps. A write only
+    lands if the entry is still at the version the caller read, checked with
+    WATCH/MULTI; otherwise another worker changed the session meanwhile and
+    the entry is dropped instead, so the next turn rebuilds it from the
+    database rather than losing the other worker's turn. Entries are handed
+    out and stored as copies, so callers may change them freely.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, enabled: bool = True):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._local: "OrderedDict[UUID, CachedContext]" = OrderedDict()
+        self._origin = uuid.uuid4().hex  # Ignore our own invalidation messages
+        self._subscriber: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.conflicts = 0
+        self.redis_errors = 0
+
+    async def start(self) -> None:
+        """Start listening for invalidations from other workers."""
+        if self.enabled and self._subscriber is None:
+            self._subscriber = asyncio.create_task(
+                run_subscriber(INVALIDATION_CHANNEL, self._on_invalidation)
+            )
+
+    async def stop(self) -> None:
+        """Stop the invalidation listener."""
+        if self._subscriber is not None:
+            self._subscriber.cancel()
+            try:
+                await self._subscriber
+            except asyncio.CancelledError:
+                pass
+            self._subscriber = None
+
+    async def get(self, session_id: UUID) -> Optional[CachedContext]:
+        """Get the cached context of a session, checking the local tier first."""
+        if not self.enabled:
+            return None
+
+        entry = self._local.get(session_id)
+        if entry is not None:
+            self._local.move_to_end(session_id)
+            self.local_hits += 1
+            CACHE_REQUESTS.labels("context", "local_hit").inc()
+            return entry.copy()
+
+        try:
+            version, raw = await get_redis().hmget(KEY_PREFIX + str(session_id), "version", "data")
+        except (redis.RedisError, OSError) as e:
+            self._redis_failed("get", e)
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            CACHE_REQUESTS.labels("context", "miss").inc()
+            return None
+
+        entry = CachedContext.from_json(raw, version=int(version))
+        self._store_local(session_id, entry.copy())
+        self.redis_hits += 1
+        CACHE_REQUESTS.labels("context", "redis_hit").inc()
+        return entry
+
+    async def set(self, session_id: UUID, entry: CachedContext) -> None:
+        """
+        Store the context of a session in both tiers, if nobody else did since it was read.
+
+        `entry.version` is the version it was read at (0 when built from the
+        database). On success it becomes the stored version; on a conflict,
+        or if Redis fails, the session is dropped from the cache instead.
+        """
+        if not self.enabled:
+            return
+
+        key = KEY_PREFIX + str(session_id)
+        try:
+            async with get_redis().pipeline(transaction=True) as pipe:
+                await pipe.watch(key)
+                stored = await pipe.hget(key, "version")
+                if int(stored or 0) != entry.version:
+                    raise redis.WatchError(f"stored version {stored}, read {entry.version}")
+
+                pipe.multi()
+                pipe.hset(key, mapping={"version": entry.version + 1, "data": entry.to_json()})
+                pipe.expire(key, self.ttl_seconds)
+                pipe.publish(INVALIDATION_CHANNEL, self._message(session_id))
+                await pipe.execute()
+        except redis.WatchError:
+            self.conflicts += 1
+            logger.info(f"Context of session {session_id} changed concurrently, dropping it")
+            await self.invalidate(session_id)
+            return
+        except (redis.RedisError, OSError) as e:
+            # Without the version check the local copy may be stale
+            self._redis_failed("set", e)
+            self._local.pop(session_id, None)
+            return
+
+        entry.version += 1
+        self._store_local(session_id, entry.copy())
+
+    async def invalidate(self, session_id: UUID) -> None:
+        """Drop a session from both tiers and from other workers' local tier."""
+        if not self.enabled:
+            return
+
+        self._local.pop(session_id, None)
+
+        try:
+            client = get_redis()
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.delete(KEY_PREFIX + str(session_id))
+                pipe.publish(INVALIDATION_CHANNEL, self._message(session_id))
+                await pipe.execute()
+        except (redis.RedisError, OSError) as e:
+            self._redis_failed("invalidate", e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for both tiers."""
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_entries": len(self._local),
+            "max_entries": self.max_entries,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "conflicts": self.conflicts,
+            "redis_errors": self.redis_errors,
+            "hit_ratio": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0,
+        }
+
+    def _store_local(self, session_id: UUID, entry: CachedContext) -> None:
+        self._local[session_id] = entry
+        self._local.move_to_end(session_id)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def _message(self, session_id: UUID) -> str:
+        return f"{self._origin}:{session_id}"
+
+    def _on_invalidation(self, message: str) -> None:
+        origin, _, session_id = message.partition(":")
+        if origin != self._origin:
+            self._local.pop(UUID(session_id), None)
+
+    def _redis_failed(self, operation: str, error: Exception) -> None:
+        self.redis_errors += 1
+        logger.warning(f"Context cache Redis {operation} failed: {str(error)}")
+
+
+# Global context cache instance
+context_cache = SessionContextCache(
+    max_entries=settings.CONTEXT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CONTEXT_CACHE_TTL_SECONDS,
+    enabled=settings.CONTEXT_CACHE_ENABLED,
+)
@@ -0,0 +1,87 @@
+"""Write path for chat turns."""
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.conversation import ChatMessage, ConversationSession
+
+
+async def persist_turn(
+    db: AsyncSession,
+    session_id: UUID,
+    user_id: UUID,
+    user_content: str,
+    ai_content: str,
+    tokens_used: int,
+    received_at: datetime,
+    ai_metadata: Optional[Dict[str, Any]] = None,
+    new_session_title: Optional[str] = None,
+) -> Tuple[ChatMessage, ChatMessage]:
+    """
+    Store a completed turn and commit.
+
+    Both messages go out in one multi-row `INSERT ... RETURNING`, so the
+    returned objects are fully loaded and need no refresh. Together with the
+    commit that is two round trips per turn, plus one INSERT when
+    `new_session_title` asks for the session to be created first. The
+    session's message_count is maintained by the database trigger.
+
+    Args:
+        db: Database session
+        session_id: Session the turn belongs to
+        user_id: Owner of the session
+        user_content: Text the user sent
+        ai_content: Generated reply
+        tokens_used: Tokens consumed by the reply
+        received_at: When the user message arrived
+        ai_metadata: Extra metadata stored on the reply (usage, timings)
+        new_session_title: Create the session with this title before the messages
+
+    Returns:
+        Tuple of (user_message, ai_message)
+    """
+    if new_session_title is not None:
+        await db.execute(
+            insert(ConversationSession).values(
+                id=session_id,
+                user_id=user_id,
+                title=new_session_title,
+                started_at=received_at,
+                is_active=True,
+            )
+        )
+
+    user_message_id, ai_message_id = uuid.uuid4(), uuid.uuid4()
+    rows = [
+        {
+            "id": user_message_id,
+            "session_id": session_id,
+            "user_id": user_id,
+            "content": user_content,
+            "sender": "user",
+            "tokens_used": None,
+            "created_at": received_at,
+            "metadata_": {},
+        },
+        {
+            "id": ai_message_id,
+            "session_id": session_id,
+            "user_id": user_id,
+            "content": ai_content,
+            "sender": "ai",
+            "tokens_used": tokens_used,
+            "created_at": datetime.utcnow(),
+            "metadata_": ai_metadata or {},
+        },
+    ]
+
+    result = await db.scalars(insert(ChatMessage).values(rows).returning(ChatMessage))
+    messages = {message.id: message for message in result.all()}
+    await db.commit()
+
+    return messages[user_message_id], messages[ai_message_id]
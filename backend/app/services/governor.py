@@ -0,0 +1,156 @@
+"""Concurrency governor with per-user fair queueing."""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Hashable
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class GovernorOverloaded(Exception):
+    """Raised when a request is shed instead of being admitted."""
+
+    def __init__(self, reason: str, retry_after: int = 1):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyGovernor:
+    """
+    Bound the number of concurrent calls to an upstream service.
+
+    Callers that cannot be admitted immediately wait in a per-key FIFO queue.
+    Freed slots are handed out round-robin across keys, so one key (user) with
+    many pending calls cannot starve the others. When the total queue is full,
+    or a caller waits longer than `queue_timeout`, `GovernorOverloaded` is raised.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue_size: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+
+        self._in_flight = 0
+        self._queued = 0
+        self._queues: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+
+        # Metrics
+        self._admitted_total = 0
+        self._rejected_total = 0
+        self._timed_out_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable) -> AsyncIterator[None]:
+        """Hold a concurrency slot for the duration of the block."""
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def is_saturated(self) -> bool:
+        """Whether a new caller would be rejected right now."""
+        return self._queued >= self.max_queue_size
+
+    async def acquire(self, key: Hashable) -> None:
+        """Wait for a slot, queueing fairly behind other keys if necessary."""
+        started = time.perf_counter()
+
+        if self._in_flight < self.max_concurrency and not self._queued:
+            self._in_flight += 1
+            self._record_admission(0.0)
+            return
+
+        if self._queued >= self.max_queue_size:
+            self._rejected_total += 1
+            logger.warning(f"Governor queue full ({self._queued}) - shedding request")
+            raise GovernorOverloaded("queue full", retry_after=self._retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(waiter)
+        self._queued += 1
+
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just as we gave up; pass it on
+                self.release()
+            else:
+                self._discard(key, waiter)
+
+            if isinstance(exc, asyncio.TimeoutError):
+                self._timed_out_total += 1
+                logger.warning(f"Governor wait exceeded {self.queue_timeout}s - shedding request")
+                raise GovernorOverloaded("queue timeout", retry_after=self._retry_after())
+            raise
+
+        self._record_admission(time.perf_counter() - started)
+
+    def release(self) -> None:
+        """Release a slot, handing it directly to the next waiter in round-robin order."""
+        while self._queues:
+            key, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self._queued -= 1
+
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+
+            if not waiter.done():
+                # Slot ownership moves to the waiter; in-flight count is unchanged
+                waiter.set_result(None)
+                return
+
+        self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth and wait-time metrics."""
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self._queued,
+            "max_queue_size": self.max_queue_size,
+            "queued_keys": len(self._queues),
+            "admitted_total": self._admitted_total,
+            "rejected_total": self._rejected_total,
+            "timed_out_total": self._timed_out_total,
+            "wait_seconds_avg": (
+                self._wait_seconds_total / self._admitted_total if self._admitted_total else 0.0
+            ),
+            "wait_seconds_max": self._wait_seconds_max,
+        }
+
+    def _discard(self, key: Hashable, waiter: asyncio.Future) -> None:
+        """Remove an abandoned waiter from its queue (if release() has not already)."""
+        queue = self._queues.get(key)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            return
+        self._queued -= 1
+        if not queue:
+            del self._queues[key]
+
+    def _record_admission(self, waited: float) -> None:
+        self._admitted_total += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+
+    def _retry_after(self) -> int:
+        """Rough Retry-After hint: average wait scaled by how far over capacity we are."""
+        avg_wait = self._wait_seconds_total / self._admitted_total if self._admitted_total else 1.0
+        backlog = max(self._queued / max(self.max_concurrency, 1), 1.0)
+        return max(1, int(avg_wait * backlog + 0.5))
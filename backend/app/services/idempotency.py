@@ -0,0 +1,228 @@
+"""Idempotency-Key handling: in-flight deduplication and replay of completed responses."""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.redis import get_redis
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "seva:idem:"
+
+
+class IdempotencyKeyReused(Exception):
+    """Raised when a key is replayed with a different request body."""
+
+
+class IdempotencyInProgress(Exception):
+    """Raised when the original request is still running on another worker."""
+
+
+def request_fingerprint(body: str) -> str:
+    """Digest of a request body, used to detect a key reused for a different request."""
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Runs each idempotent request at most once per key.
+
+    Concurrent duplicates on the same worker attach to the in-flight future of
+    the original request. Completed responses are kept for `ttl_seconds` in a
+    local LRU and in Redis, and replayed without running the request again.
+    A short-lived "pending" marker in Redis lets other workers answer duplicates
+    of a request that is still running with a conflict. Its expiry is pushed
+    out every third of `pending_ttl_seconds` while the request runs, however
+    long Claude takes, and only lapses if the worker dies. Failed requests are
+    not stored, so the client can retry them.
+    """
+
+    def __init__(self, ttl_seconds: int, pending_ttl_seconds: int, max_local_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.pending_ttl_seconds = pending_ttl_seconds
+        self.max_local_entries = max_local_entries
+
+        self._in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._completed: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+
+        # Metrics
+        self.executed = 0
+        self.joined_in_flight = 0
+        self.replayed = 0
+        self.conflicts = 0
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        produce: Callable[[], Awaitable[str]],
+    ) -> Tuple[str, bool]:
+        """
+        Run `produce` once for `key`, or return the response of an earlier run.
+
+        Returns:
+            Tuple of (serialized_response, replayed)
+
+        Raises:
+            IdempotencyKeyReused: If the key was used for a different request body
+            IdempotencyInProgress: If the original request is running on another worker
+        """
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self._check_fingerprint(fingerprint, in_flight[0])
+            self.joined_in_flight += 1
+            return await asyncio.shield(in_flight[1]), True
+
+        stored = self._get_local(key)
+        if stored is not None:
+            self._check_fingerprint(fingerprint, stored["fingerprint"])
+            self.replayed += 1
+            return stored["response"], True
+
+        # Register before the first await so local duplicates always join this run
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (fingerprint, future)
+
+        try:
+            stored = await self._get_redis(key)
+            if stored is not None:
+                self._check_fingerprint(fingerprint, stored["fingerprint"])
+                if stored["state"] == "pending":
+                    raise IdempotencyInProgress()
+                response, replayed = stored["response"], True
+
+            elif not await self._claim(key, fingerprint):
+                # Another worker claimed the key between our read and write
+                raise IdempotencyInProgress()
+
+            else:
+                try:
+                    response, replayed = await self._produce_claimed(key, produce), False
+                except BaseException:
+                    await self._release(key)
+                    raise
+
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if isinstance(e, IdempotencyInProgress):
+                self.conflicts += 1
+            future.set_exception(e)
+            future.exception()  # Mark retrieved in case nobody joined
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+        future.set_result(response)
+        if replayed:
+            self.replayed += 1
+        else:
+            self.executed += 1
+            await self._store(key, fingerprint, response)
+        return response, replayed
+
+    def stats(self) -> Dict[str, Any]:
+        """Deduplication counters."""
+        return {
+            "in_flight": len(self._in_flight),
+            "local_entries": len(self._completed),
+            "executed": self.executed,
+            "joined_in_flight": self.joined_in_flight,
+            "replayed": self.replayed,
+            "conflicts": self.conflicts,
+        }
+
+    def _check_fingerprint(self, fingerprint: str, expected: str) -> None:
+        if fingerprint != expected:
+            raise IdempotencyKeyReused()
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._completed.get(key)
+        if entry is None:
+            return None
+
+        expires_at, fingerprint, response = entry
+        if expires_at < time.monotonic():
+            del self._completed[key]
+            return None
+
+        return {"state": "done", "fingerprint": fingerprint, "response": response}
+
+    async def _get_redis(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await get_redis().get(KEY_PREFIX + key)
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Idempotency Redis get failed: {str(e)}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def _claim(self, key: str, fingerprint: str) -> bool:
+        """Mark the key as pending in Redis; False if another worker already holds it."""
+        try:
+            claimed = await get_redis().set(
+                KEY_PREFIX + key,
+                json.dumps({"state": "pending", "fingerprint": fingerprint}),
+                ex=self.pending_ttl_seconds,
+                nx=True,
+            )
+        except (redis.RedisError, OSError) as e:
+            # Without Redis we can still deduplicate within this worker
+            logger.warning(f"Idempotency Redis claim failed: {str(e)}")
+            return True
+        return bool(claimed)
+
+    async def _produce_claimed(self, key: str, produce: Callable[[], Awaitable[str]]) -> str:
+        """Run `produce`, refreshing the pending marker until it returns."""
+        refresh = asyncio.create_task(self._refresh_claim(key))
+        try:
+            return await produce()
+        finally:
+            # Wait for it, so a late EXPIRE cannot shorten the stored response's TTL
+            refresh.cancel()
+            await asyncio.gather(refresh, return_exceptions=True)
+
+    async def _refresh_claim(self, key: str) -> None:
+        while True:
+            await asyncio.sleep(self.pending_ttl_seconds / 3)
+            try:
+                await get_redis().expire(KEY_PREFIX + key, self.pending_ttl_seconds)
+            except (redis.RedisError, OSError) as e:
+                logger.warning(f"Idempotency Redis refresh failed: {str(e)}")
+
+    async def _release(self, key: str) -> None:
+        try:
+            await get_redis().delete(KEY_PREFIX + key)
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Idempotency Redis release failed: {str(e)}")
+
+    async def _store(self, key: str, fingerprint: str, response: str) -> None:
+        self._completed[key] = (time.monotonic() + self.ttl_seconds, fingerprint, response)
+        self._completed.move_to_end(key)
+        while len(self._completed) > self.max_local_entries:
+            self._completed.popitem(last=False)
+
+        try:
+            await get_redis().set(
+                KEY_PREFIX + key,
+                json.dumps({"state": "done", "fingerprint": fingerprint, "response": response}),
+                ex=self.ttl_seconds,
+            )
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Idempotency Redis store failed: {str(e)}")
+
+
+# Global idempotency store instance
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    pending_ttl_seconds=settings.IDEMPOTENCY_PENDING_TTL_SECONDS,
+    max_local_entries=settings.IDEMPOTENCY_MAX_LOCAL_ENTRIES,
+)
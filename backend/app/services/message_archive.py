@@ -0,0 +1,383 @@
+"""Partition maintenance and cold archive of chat messages."""
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.partitions import (
+    PARTITIONED_TABLE,
+    add_months,
+    ensure_partitions,
+    list_detached_partitions,
+    list_partitions,
+    month_start,
+    parse_partition_name,
+    partition_name,
+)
+from app.db.session import engine
+
+logger = get_logger(__name__)
+
+# Transaction-level advisory lock taken by the worker doing maintenance
+MAINTENANCE_LOCK_ID = 7_219_001
+
+ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("session_id", pa.string()),
+        ("user_id", pa.string()),
+        ("content", pa.string()),
+        ("sender", pa.string()),
+        ("sentiment_score", pa.decimal128(3, 2)),
+        ("sentiment_label", pa.string()),
+        ("health_signals", pa.string()),  # JSON text
+        ("tokens_used", pa.int32()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("metadata", pa.string()),  # JSON text
+    ]
+)
+
+_SELECT_PARTITION = """
+    SELECT id::text AS id, session_id::text AS session_id, user_id::text AS user_id,
+           content, sender, sentiment_score, sentiment_label,
+           health_signals::text AS health_signals, tokens_used, created_at,
+           metadata::text AS metadata
+    FROM {partition}
+    ORDER BY created_at, id
+"""
+
+
+class ArchiveError(Exception):
+    """An archive file is missing, or does not hold every row of its partition."""
+
+
+@dataclass(frozen=True)
+class ArchiveFile:
+    """One archived month of chat messages."""
+
+    month: date
+    path: Path
+    rows: int
+    size_bytes: int
+
+
+class MessageArchiver:
+    """
+    Keep chat_messages partitioned by month and move old months to Parquet.
+
+    Every `interval_seconds` one worker, whichever gets the advisory lock,
+    creates the partitions for the current month and the next `ahead_months`.
+    When archiving is enabled it then:
+
+    - drops the partitions detached by an earlier run, once their archive
+      file has been read back in full and holds as many rows as the table;
+    - archives each partition older than `archive_after_months`. The rows are
+      streamed through a server-side cursor into a zstd-compressed Parquet
+      file, one row group per `batch_rows`. The file and its directory are
+      fsynced, then the partition is detached, but not dropped yet.
+
+    `archive_dir` must be an absolute path on durable storage that every
+    worker mounts (a persistent volume, not the container's disk). The
+    archive is then the only copy of those rows, and exports read it from
+    whichever worker serves them. Archived months stay readable through
+    `read_archive`.
+    """
+
+    def __init__(
+        self,
+        archive_dir: Optional[str],
+        ahead_months: int,
+        archive_after_months: int,
+        interval_seconds: int,
+        batch_rows: int,
+        archive_enabled: bool = True,
+    ):
+        if archive_enabled and not (archive_dir and os.path.isabs(archive_dir)):
+            raise ValueError("Archiving chat messages needs an absolute archive directory")
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+        self.ahead_months = ahead_months
+        self.archive_after_months = archive_after_months
+        self.interval_seconds = interval_seconds
+        self.batch_rows = batch_rows
+        self.archive_enabled = archive_enabled
+
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.runs = 0
+        self.errors = 0
+        self.partitions_created = 0
+        self.partitions_archived = 0
+        self.partitions_dropped = 0
+        self.rows_archived = 0
+        self.last_run_at: Optional[datetime] = None
+
+    async def start(self) -> None:
+        """Start periodic maintenance, with a first run right away."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def stop(self) -> None:
+        """Stop periodic maintenance."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_once(self) -> None:
+        """Create upcoming partitions, then archive the expired ones."""
+        current = month_start(datetime.utcnow())
+
+        async with engine.begin() as conn:
+            if not await self._try_lock(conn):
+                return
+            created = await ensure_partitions(conn, current, add_months(current, self.ahead_months))
+        if created:
+            self.partitions_created += len(created)
+            logger.info(f"Created chat message partitions: {', '.join(created)}")
+
+        if self.archive_enabled:
+            cutoff = add_months(current, -self.archive_after_months)
+            async with engine.connect() as conn:
+                detached = await list_detached_partitions(conn)
+                partitions = await list_partitions(conn)
+            for name, month in detached:
+                await self.drop_archived_partition(name, month)
+            for name, month in partitions:
+                if month < cutoff:
+                    await self.archive_partition(name, month)
+
+        self.runs += 1
+        self.last_run_at = datetime.utcnow()
+
+    async def archive_partition(self, name: str, month: date) -> int:
+        """
+        Write one partition to Parquet, then detach it.
+
+        The detached table is kept until `drop_archived_partition` has checked
+        the file again, on a later run.
+
+        Returns:
+            Number of rows archived
+
+        Raises:
+            ArchiveError: If the written file is missing rows; the partition is kept
+        """
+        path = self.archive_path(month)
+        partial = path.with_name(path.name + ".partial")
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        async with engine.begin() as conn:
+            if not await self._try_lock(conn):
+                return 0
+
+            rows = 0
+            writer = await asyncio.to_thread(
+                pq.ParquetWriter, partial, ARCHIVE_SCHEMA, compression="zstd"
+            )
+            try:
+                result = await conn.stream(text(_SELECT_PARTITION.format(partition=name)))
+                async for chunk in result.mappings().partitions(self.batch_rows):
+                    batch = pa.RecordBatch.from_pylist([dict(row) for row in chunk], schema=ARCHIVE_SCHEMA)
+                    await asyncio.to_thread(writer.write_batch, batch)
+                    rows += len(chunk)
+                await asyncio.to_thread(writer.close)
+
+                written = (await asyncio.to_thread(pq.read_metadata, partial)).num_rows
+                if written != rows:
+                    raise ArchiveError(f"{partial} holds {written} of {rows} rows of {name}")
+            except BaseException:
+                writer.close()
+                partial.unlink(missing_ok=True)
+                raise
+
+            # On disk before it replaces anything, and the rename on disk before the detach
+            await asyncio.to_thread(_fsync, partial)
+            os.replace(partial, path)
+            await asyncio.to_thread(_fsync, path.parent)
+            await conn.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}"))
+
+        self.partitions_archived += 1
+        self.rows_archived += rows
+        logger.info(f"Archived {rows} chat messages of {month:%Y-%m} to {path}")
+        return rows
+
+    async def drop_archived_partition(self, name: str, month: date) -> bool:
+        """
+        Drop a partition detached by `archive_partition`, once its archive is verified.
+
+        Every row group of the file is read back, and the row count must match
+        the table's.
+
+        Returns:
+            Whether the table was dropped
+
+        Raises:
+            ArchiveError: If the file is missing or does not match; the table is kept
+        """
+        path = self.archive_path(month)
+
+        async with engine.begin() as conn:
+            if not await self._try_lock(conn):
+                return False
+
+            expected = (await conn.execute(text(f"SELECT count(*) FROM {name}"))).scalar()
+            if not path.exists():
+                raise ArchiveError(f"{name} is detached but {path} is missing")
+            archived = await asyncio.to_thread(_count_archived_rows, path)
+            if archived != expected:
+                raise ArchiveError(f"{path} holds {archived} of {expected} rows of {name}")
+
+            await conn.execute(text(f"DROP TABLE {name}"))
+
+        self.partitions_dropped += 1
+        logger.info(f"Dropped {name} after verifying its {archived} archived chat messages")
+        return True
+
+    def archive_path(self, month: date) -> Path:
+        """
+        Parquet file of an archived month.
+
+        Raises:
+            FileNotFoundError: If no archive directory is configured
+        """
+        if self.archive_dir is None:
+            raise FileNotFoundError("No chat message archive directory is configured")
+        return self.archive_dir / f"{partition_name(month)}.parquet"
+
+    def has_archive(self, month: date) -> bool:
+        """Whether a month has been archived."""
+        return self.archive_dir is not None and self.archive_path(month).exists()
+
+    async def list_archives(self) -> List[ArchiveFile]:
+        """Archived months, oldest first."""
+        return await asyncio.to_thread(self._list_archives)
+
+    async def read_archive(
+        self,
+        month: date,
+        user_id: Optional[UUID] = None,
+        session_id: Optional[UUID] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the messages of an archived month, oldest first.
+
+        Raises:
+            FileNotFoundError: If the month has not been archived
+        """
+        path = self.archive_path(month)
+        if not path.exists():
+            raise FileNotFoundError(path)
+
+        condition = None
+        for column, value in (("user_id", user_id), ("session_id", session_id)):
+            if value is not None:
+                term = ds.field(column) == str(value)
+                condition = term if condition is None else condition & term
+
+        # Row groups are read lazily, a batch at a time, off the event loop
+        batches = iter(ds.dataset(path, format="parquet").to_batches(filter=condition))
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                return
+            for row in batch.to_pylist():
+                yield _decode_row(row)
+
+    def stats(self) -> Dict[str, Any]:
+        """Maintenance counters."""
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "partitions_created": self.partitions_created,
+            "partitions_archived": self.partitions_archived,
+            "partitions_dropped": self.partitions_dropped,
+            "rows_archived": self.rows_archived,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+        }
+
+    def _list_archives(self) -> List[ArchiveFile]:
+        archives: List[ArchiveFile] = []
+        if self.archive_dir is None:
+            return archives
+        for path in sorted(self.archive_dir.glob(f"{PARTITIONED_TABLE}_p*.parquet")):
+            month = parse_partition_name(path.stem)
+            if month is None:
+                continue
+            archives.append(
+                ArchiveFile(
+                    month=month,
+                    path=path,
+                    rows=pq.read_metadata(path).num_rows,
+                    size_bytes=path.stat().st_size,
+                )
+            )
+        return archives
+
+    async def _try_lock(self, conn: AsyncConnection) -> bool:
+        result = await conn.execute(
+            text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": MAINTENANCE_LOCK_ID}
+        )
+        return bool(result.scalar())
+
+    async def _run_periodically(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except (OSError, SQLAlchemyError, pa.ArrowException, ArchiveError) as e:
+                self.errors += 1
+                logger.warning(f"Chat message partition maintenance failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+
+def _fsync(path: Path) -> None:
+    """Flush a file, or a directory's entries, to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _count_archived_rows(path: Path) -> int:
+    """Rows in an archive file, reading every row group rather than trusting the footer."""
+    return pq.read_table(path, columns=["id"]).num_rows
+
+
+def _decode_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-ready message from an archived row."""
+    return {
+        **row,
+        "sentiment_score": float(row["sentiment_score"]) if row["sentiment_score"] is not None else None,
+        "health_signals": json.loads(row["health_signals"]) if row["health_signals"] else [],
+        "created_at": row["created_at"].isoformat(),
+        "metadata": json.loads(row["metadata"]) if row["metadata"] else {},
+    }
+
+
+# Global archiver instance
+message_archiver = MessageArchiver(
+    archive_dir=settings.MESSAGE_ARCHIVE_DIR,
+    ahead_months=settings.MESSAGE_PARTITIONS_AHEAD_MONTHS,
+    archive_after_months=settings.MESSAGE_ARCHIVE_AFTER_MONTHS,
+    interval_seconds=settings.MESSAGE_ARCHIVE_INTERVAL_SECONDS,
+    batch_rows=settings.MESSAGE_ARCHIVE_BATCH_ROWS,
+    archive_enabled=settings.MESSAGE_ARCHIVE_ENABLED,
+)
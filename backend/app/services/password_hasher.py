@@ -0,0 +1,126 @@
+"""Password hashing off the event loop."""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.security import get_password_hash, verify_and_update_password
+from app.services.governor import ConcurrencyGovernor
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """
+    Run bcrypt on a small dedicated thread pool.
+
+    A bcrypt call costs a few hundred milliseconds of CPU. bcrypt releases the
+    GIL while hashing, so a thread pool keeps the event loop free. Admission
+    goes through a ConcurrencyGovernor sized to the pool. Callers wait in a
+    bounded, per-key fair queue, and when a login storm overflows that queue
+    they are shed with `GovernorOverloaded` instead of piling up behind the
+    pool.
+
+    Bulk imports hash on a separate process pool, created on first use, so a
+    batch of hundreds of passwords neither waits behind nor starves sign-ins.
+    """
+
+    def __init__(
+        self, workers: int, max_queue_size: int, queue_timeout: float, bulk_processes: int
+    ):
+        self.workers = workers
+        self.bulk_processes = bulk_processes
+        self.governor = ConcurrencyGovernor(
+            max_concurrency=workers,
+            max_queue_size=max_queue_size,
+            queue_timeout=queue_timeout,
+        )
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._bulk_executor: Optional[ProcessPoolExecutor] = None
+        self._bulk_lock = asyncio.Lock()
+
+        # Metrics
+        self.bulk_hashed = 0
+
+    async def hash(self, password: str, key: Hashable) -> str:
+        """Hash a new password."""
+        return await self._run(key, get_password_hash, password)
+
+    async def verify(self, password: str, hashed: str, key: Hashable) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password against its stored hash.
+
+        Returns:
+            Tuple of (valid, new_hash) where new_hash is set when the stored hash
+            should be replaced, e.g. after BCRYPT_ROUNDS was raised
+        """
+        return await self._run(key, verify_and_update_password, password, hashed)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hash a batch of new passwords on the bulk process pool, keeping order."""
+        if not passwords:
+            return []
+
+        # One bulk batch at a time; concurrent imports queue here
+        async with self._bulk_lock:
+            if self._bulk_executor is None:
+                # Spawn, not fork: the parent has an event loop and threads running
+                self._bulk_executor = ProcessPoolExecutor(
+                    max_workers=self.bulk_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+
+            loop = asyncio.get_running_loop()
+            hashed = await asyncio.gather(
+                *(
+                    loop.run_in_executor(self._bulk_executor, get_password_hash, password)
+                    for password in passwords
+                )
+            )
+
+        self.bulk_hashed += len(hashed)
+        return list(hashed)
+
+    def close(self) -> None:
+        """Stop the worker threads and processes, dropping queued work."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._bulk_executor is not None:
+            self._bulk_executor.shutdown(wait=False, cancel_futures=True)
+            self._bulk_executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size and admission metrics."""
+        return {
+            "workers": self.workers,
+            "bulk_processes": self.bulk_processes,
+            "bulk_hashed": self.bulk_hashed,
+            **self.governor.stats(),
+        }
+
+    async def _run(self, key: Hashable, fn: Callable[..., T], *args: Any) -> T:
+        await self.governor.acquire(key)
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self.governor.release()
+            raise
+
+        # Hold the slot until the thread is really done, even if the caller goes away
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.governor.release))
+        return await asyncio.wrap_future(future)
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue_size=settings.PASSWORD_HASH_MAX_QUEUE_SIZE,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+    bulk_processes=settings.PASSWORD_HASH_BULK_PROCESSES,
+)
@@ -0,0 +1,230 @@
+"""Short-lived cache of authenticated principals."""
+
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+from uuid import UUID
+
+import redis.asyncio as redis
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import CACHE_REQUESTS
+from app.db.redis import get_redis, run_subscriber
+from app.models.user import User
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "seva:principal:"
+INVALIDATION_CHANNEL = "seva:principal:invalidate"
+
+# Changing any of these must invalidate the cached principal
+PRINCIPAL_FIELDS = ("email", "role", "is_active")
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The slice of a user that authentication and authorization need."""
+
+    id: UUID
+    email: str
+    role: str
+    is_active: bool
+
+    def to_json(self) -> str:
+        return json.dumps({**asdict(self), "id": str(self.id)})
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Principal":
+        data = json.loads(raw)
+        return cls(**{**data, "id": UUID(data["id"])})
+
+
+class PrincipalCache:
+    """
+    Principal cache: an in-process TTL map in front of Redis.
+
+    Saves the user lookup on every authenticated request. Entries live for
+    `ttl_seconds` in both tiers. Commits that change a user's email, role or
+    is_active, or delete the user, drop the entry everywhere and announce it on
+    a pub/sub channel, so deactivation takes effect on all workers at once;
+    the TTL bounds staleness for changes made outside the ORM.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, enabled: bool = True):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._local: "OrderedDict[UUID, Tuple[float, Principal]]" = OrderedDict()
+        self._origin = uuid.uuid4().hex  # Ignore our own invalidation messages
+        self._subscriber: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Metrics
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.redis_errors = 0
+
+    async def start(self) -> None:
+        """Start listening for invalidations from other workers."""
+        if self.enabled and self._subscriber is None:
+            self._subscriber = asyncio.create_task(
+                run_subscriber(INVALIDATION_CHANNEL, self._on_invalidation)
+            )
+
+    async def stop(self) -> None:
+        """Stop the invalidation listener."""
+        if self._subscriber is not None:
+            self._subscriber.cancel()
+            try:
+                await self._subscriber
+            except asyncio.CancelledError:
+                pass
+            self._subscriber = None
+
+    async def get(self, user_id: UUID) -> Optional[Principal]:
+        """Get a cached principal, checking the local tier first."""
+        if not self.enabled:
+            return None
+
+        entry = self._local.get(user_id)
+        if entry is not None:
+            expires_at, principal = entry
+            if expires_at > time.monotonic():
+                self.local_hits += 1
+                CACHE_REQUESTS.labels("principal", "local_hit").inc()
+                return principal
+            del self._local[user_id]
+
+        try:
+            raw = await get_redis().get(KEY_PREFIX + str(user_id))
+        except (redis.RedisError, OSError) as e:
+            self._redis_failed("get", e)
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            CACHE_REQUESTS.labels("principal", "miss").inc()
+            return None
+
+        principal = Principal.from_json(raw)
+        self._store_local(principal)
+        self.redis_hits += 1
+        CACHE_REQUESTS.labels("principal", "redis_hit").inc()
+        return principal
+
+    async def set(self, principal: Principal) -> None:
+        """Store a principal in both tiers."""
+        if not self.enabled:
+            return
+
+        self._store_local(principal)
+
+        try:
+            await get_redis().set(
+                KEY_PREFIX + str(principal.id), principal.to_json(), ex=self.ttl_seconds
+            )
+        except (redis.RedisError, OSError) as e:
+            self._redis_failed("set", e)
+
+    async def invalidate(self, user_id: UUID) -> None:
+        """Drop a principal from both tiers and from other workers' local tier."""
+        if not self.enabled:
+            return
+
+        self._local.pop(user_id, None)
+        self.invalidations += 1
+
+        try:
+            client = get_redis()
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.delete(KEY_PREFIX + str(user_id))
+                pipe.publish(INVALIDATION_CHANNEL, f"{self._origin}:{user_id}")
+                await pipe.execute()
+        except (redis.RedisError, OSError) as e:
+            self._redis_failed("invalidate", e)
+
+    def invalidate_soon(self, user_id: UUID) -> None:
+        """Drop the local entry now and invalidate everywhere else in the background."""
+        self._local.pop(user_id, None)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Committed from a script; other workers rely on the TTL
+
+        task = loop.create_task(self.invalidate(user_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for both tiers."""
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_entries": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "redis_errors": self.redis_errors,
+            "hit_ratio": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0,
+        }
+
+    def _store_local(self, principal: Principal) -> None:
+        self._local[principal.id] = (time.monotonic() + self.ttl_seconds, principal)
+        self._local.move_to_end(principal.id)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def _on_invalidation(self, message: str) -> None:
+        origin, _, user_id = message.partition(":")
+        if origin != self._origin:
+            self._local.pop(UUID(user_id), None)
+
+    def _redis_failed(self, operation: str, error: Exception) -> None:
+        self.redis_errors += 1
+        logger.warning(f"Principal cache Redis {operation} failed: {str(error)}")
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    enabled=settings.PRINCIPAL_CACHE_ENABLED,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_principal_changes(session: Session, flush_context: Any) -> None:
+    """Remember users whose cached principal a flush made stale."""
+    changed = session.info.setdefault("stale_principals", set())
+
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in PRINCIPAL_FIELDS):
+                changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_principals(session: Session) -> None:
+    """Invalidate once the change is visible to other readers."""
+    for user_id in session.info.pop("stale_principals", ()):
+        principal_cache.invalidate_soon(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_principal_changes(session: Session) -> None:
+    session.info.pop("stale_principals", None)
@@ -0,0 +1,299 @@
+"""Sampling profiler of requests, to see where slow requests spend their time."""
+
+import asyncio
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import CodeType, FrameType
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# A sampled stack, outermost call first; a string marks what a suspended request awaits
+Stack = Tuple[Union[CodeType, str], ...]
+
+REASON_SAMPLED = "sampled"
+REASON_SLOW = "slow"
+
+# Longest first, so frames are labelled relative to the deepest import root (e.g. site-packages)
+_PATH_PREFIXES = sorted(
+    {os.path.join(os.path.abspath(path), "") for path in sys.path if path},
+    key=len,
+    reverse=True,
+)
+
+
+def _label(frame: Union[CodeType, str]) -> str:
+    if isinstance(frame, str):
+        return frame
+
+    filename = frame.co_filename
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    # ';' separates frames in the folded format
+    return f"{frame.co_qualname} ({filename}:{frame.co_firstlineno})".replace(";", ",")
+
+
+@dataclass
+class _ActiveRequest:
+    task: asyncio.Task
+    frame: FrameType  # Stacks start at this frame (the middleware's)
+    keep: bool  # Picked by the sample rate, kept whatever its duration
+    started: float = field(default_factory=time.perf_counter)
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    samples: Counter = field(default_factory=Counter)  # Stack -> seconds
+
+
+@dataclass(frozen=True)
+class RequestProfile:
+    """Stack samples of one request, weighted by the wall time each stands for."""
+
+    id: int
+    method: str
+    path: str
+    status_code: int
+    reason: str
+    started_at: datetime
+    duration_ms: float
+    interval_ms: float
+    samples: Dict[Stack, float]  # Stack -> seconds
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "reason": self.reason,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 1),
+            "interval_ms": self.interval_ms,
+            "sampled_ms": round(sum(self.samples.values()) * 1000, 1),
+        }
+
+    def folded(self) -> str:
+        """
+        The samples in the folded stack format ("frame;frame;frame ms" per
+        line) read by flamegraph.pl, speedscope and most flame graph viewers.
+        """
+        lines = sorted(
+            f"{';'.join(_label(frame) for frame in stack)} {max(1, round(seconds * 1000))}"
+            for stack, seconds in self.samples.items()
+        )
+        return "\n".join(lines) + "\n"
+
+
+class RequestProfiler:
+    """
+    Wall-clock sampling profiler of requests.
+
+    While requests are being profiled, a thread wakes every `interval_ms`
+    and records one stack per request: the event loop thread's stack if the
+    request is running on it, otherwise the chain of coroutines the request
+    is suspended in, down to what it awaits (a Claude call, a query, a pool
+    checkout). Each stack is weighted by the time since the previous sample,
+    which is longer than the interval when the event loop holds the GIL.
+    Request code is never traced, so the overhead is the sampling thread's,
+    and none at all while nothing is profiled.
+
+    A fraction (`sample_rate`) of requests is profiled and kept. When
+    `slow_ms` is set, every request is profiled and kept if it takes longer.
+    The most recent `max_profiles` profiles are kept in memory.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float,
+        slow_ms: float,
+        interval_ms: float,
+        max_profiles: int,
+        enabled: bool = True,
+    ):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.interval_ms = interval_ms
+        self.enabled = enabled
+
+        self._profiles: Deque[RequestProfile] = deque(maxlen=max_profiles)
+        self._ids = itertools.count(1)
+        self._active: Dict[int, _ActiveRequest] = {}
+        self._lock = threading.Lock()  # Guards _active and its samples
+        self._wake = threading.Event()  # Set while requests are being profiled
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+
+        # Metrics
+        self.profiled = 0
+        self.kept = 0
+        self.samples = 0
+        self.sampling_seconds = 0.0
+
+    async def start(self) -> None:
+        """Start the sampling thread (on the event loop, which it samples)."""
+        if self.enabled and self._thread is None:
+            self._loop_thread_id = threading.get_ident()
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+            self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop the sampling thread."""
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    def begin(self) -> Optional[_ActiveRequest]:
+        """
+        Start profiling the current request, if it is picked; stacks start at
+        the caller's frame. Pass the result to `end` once the request is done.
+        """
+        if self._thread is None:
+            return None
+        keep = random.random() < self.sample_rate
+        if not keep and not self.slow_ms:
+            return None
+
+        request = _ActiveRequest(task=asyncio.current_task(), frame=sys._getframe(1), keep=keep)
+        with self._lock:
+            self._active[id(request)] = request
+            self._wake.set()
+        self.profiled += 1
+        return request
+
+    def end(self, request: _ActiveRequest, method: str, path: str, status_code: int) -> None:
+        """Stop profiling a request, and keep its profile if it was picked or slow."""
+        duration_ms = (time.perf_counter() - request.started) * 1000
+        with self._lock:
+            del self._active[id(request)]
+            if not self._active and not self._stopping:
+                self._wake.clear()
+
+        if request.keep:
+            reason = REASON_SAMPLED
+        elif self.slow_ms and duration_ms >= self.slow_ms:
+            reason = REASON_SLOW
+        else:
+            return
+
+        self._profiles.append(
+            RequestProfile(
+                id=next(self._ids),
+                method=method,
+                path=path,
+                status_code=status_code,
+                reason=reason,
+                started_at=request.started_at,
+                duration_ms=duration_ms,
+                interval_ms=self.interval_ms,
+                samples=dict(request.samples),
+            )
+        )
+        self.kept += 1
+
+    def profiles(self) -> List[RequestProfile]:
+        """Kept profiles, most recent first."""
+        return list(reversed(self._profiles))
+
+    def get_profile(self, profile_id: int) -> Optional[RequestProfile]:
+        """A kept profile by id."""
+        for profile in self._profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Profiler counters, including the time spent sampling."""
+        return {
+            "enabled": self._thread is not None,
+            "sample_rate": self.sample_rate,
+            "slow_ms": self.slow_ms,
+            "active": len(self._active),
+            "profiled": self.profiled,
+            "kept": self.kept,
+            "stored": len(self._profiles),
+            "samples": self.samples,
+            "sampling_ms": round(self.sampling_seconds * 1000, 1),
+        }
+
+    def _run(self) -> None:
+        interval = self.interval_ms / 1000
+        last_sample: Optional[float] = None
+        while True:
+            if not self._wake.is_set():
+                last_sample = None  # The next sample starts a new series
+                self._wake.wait()
+            if self._stopping:
+                return
+
+            started = time.perf_counter()
+            # The first sample of a series stands for one interval
+            weight = started - last_sample if last_sample is not None else interval
+            last_sample = started
+            try:
+                self._sample(weight)
+            except Exception as e:
+                logger.error(f"Profiler sampling failed: {str(e)}")
+            self.sampling_seconds += time.perf_counter() - started
+            time.sleep(interval)
+
+    def _sample(self, weight: float) -> None:
+        # The event loop thread's stack, outermost frame first
+        loop_stack: List[FrameType] = []
+        frame = sys._current_frames().get(self._loop_thread_id)
+        while frame is not None:
+            loop_stack.append(frame)
+            frame = frame.f_back
+        loop_stack.reverse()
+
+        with self._lock:
+            for request in self._active.values():
+                request.samples[self._stack(request, loop_stack)] += weight
+            self.samples += len(self._active)
+
+    @staticmethod
+    def _stack(request: _ActiveRequest, loop_stack: List[FrameType]) -> Stack:
+        # Running on the event loop (including blocking it)
+        for i, frame in enumerate(loop_stack):
+            if frame is request.frame:
+                return tuple(frame.f_code for frame in loop_stack[i:])
+
+        # Suspended: follow the coroutines it awaits, from its task down
+        stack: List[Union[CodeType, str]] = []
+        awaitable: Any = request.task.get_coro()
+        while awaitable is not None:
+            frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+            if frame is None:
+                # A future (I/O, a task, a thread pool) or an async generator step
+                if stack:
+                    kind = type(awaitable).__name__
+                    stack.append(f"<await {'Future' if kind == 'FutureIter' else kind}>")
+                break
+            if stack or frame is request.frame:
+                stack.append(frame.f_code)
+            awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+
+        return tuple(stack) or ("<unknown>",)
+
+
+# Global request profiler instance
+request_profiler = RequestProfiler(
+    sample_rate=settings.PROFILING_SAMPLE_RATE,
+    slow_ms=settings.PROFILING_SLOW_MS,
+    interval_ms=settings.PROFILING_INTERVAL_MS,
+    max_profiles=settings.PROFILING_MAX_PROFILES,
+    enabled=settings.PROFILING_ENABLED,
+)
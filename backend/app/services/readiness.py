@@ -0,0 +1,207 @@
+"""Readiness probe of the backend's dependencies."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.redis import get_redis
+from app.db.session import engine, replica_engine
+
+logger = get_logger(__name__)
+
+STATUS_OK = "ok"
+STATUS_SLOW = "slow"
+STATUS_TIMEOUT = "timeout"
+STATUS_UNAVAILABLE = "unavailable"
+
+
+@dataclass(frozen=True)
+class Dependency:
+    """A dependency checked by the probe."""
+
+    name: str
+    check: Callable[[], Awaitable[None]]
+    required: bool  # A failed required dependency makes the pod not ready
+
+
+@dataclass(frozen=True)
+class DependencyStatus:
+    """Outcome of one dependency check."""
+
+    status: str
+    latency_ms: float
+    required: bool
+
+
+@dataclass(frozen=True)
+class ReadinessReport:
+    """Outcome of a probe run."""
+
+    ready: bool
+    checked_at: datetime
+    dependencies: Dict[str, DependencyStatus] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "not ready",
+            "checked_at": self.checked_at.isoformat(),
+            "dependencies": {
+                name: {
+                    "status": dependency.status,
+                    "latency_ms": round(dependency.latency_ms, 1),
+                    "required": dependency.required,
+                }
+                for name, dependency in self.dependencies.items()
+            },
+        }
+
+
+class ReadinessProbe:
+    """
+    Checks the dependencies at the same time, each within `timeout_seconds`.
+
+    A report is reused for `cache_seconds`, and callers arriving while a run
+    is in progress wait for that run, so however often the load balancer
+    probes, each dependency sees at most one check per interval. A database
+    whose pool is exhausted times out like one that is down. A required
+    dependency slower than `slow_ms` also makes the pod not ready, so it is
+    drained before requests start failing. Optional dependencies (the app
+    degrades without them) are reported but never fail the probe.
+    """
+
+    def __init__(
+        self,
+        dependencies: List[Dependency],
+        timeout_seconds: float,
+        cache_seconds: float,
+        slow_ms: float,
+    ):
+        self.dependencies = dependencies
+        self.timeout_seconds = timeout_seconds
+        self.cache_seconds = cache_seconds
+        self.slow_ms = slow_ms
+
+        self._report: Optional[ReadinessReport] = None
+        self._checked_at = 0.0  # monotonic
+        self._running: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.runs = 0
+        self.cached = 0
+        self.not_ready = 0
+
+    async def check(self) -> ReadinessReport:
+        """The current report, from the cache when it is fresh enough."""
+        if self._report is not None and time.monotonic() - self._checked_at < self.cache_seconds:
+            self.cached += 1
+            return self._report
+
+        if self._running is None:
+            self._running = asyncio.create_task(self._run())
+            self._running.add_done_callback(self._finish_run)
+        else:
+            self.cached += 1
+        # A caller that gives up (e.g. a probe timeout) must not cancel the shared run
+        return await asyncio.shield(self._running)
+
+    def stats(self) -> Dict[str, Any]:
+        """Probe counters and the last report."""
+        return {
+            "runs": self.runs,
+            "cached": self.cached,
+            "not_ready": self.not_ready,
+            "last_report": self._report.to_dict() if self._report is not None else None,
+        }
+
+    async def _run(self) -> ReadinessReport:
+        statuses = await asyncio.gather(*(self._check_one(dep) for dep in self.dependencies))
+        report = ReadinessReport(
+            ready=all(
+                status.status == STATUS_OK for status in statuses if status.required
+            ),
+            checked_at=datetime.utcnow(),
+            dependencies={
+                dep.name: status
+                for dep, status in zip(self.dependencies, statuses, strict=True)
+            },
+        )
+
+        self.runs += 1
+        if not report.ready:
+            self.not_ready += 1
+        self._report = report
+        self._checked_at = time.monotonic()
+        return report
+
+    def _finish_run(self, task: asyncio.Task) -> None:
+        self._running = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Readiness probe failed: {str(task.exception())}")
+
+    async def _check_one(self, dependency: Dependency) -> DependencyStatus:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(dependency.check(), timeout=self.timeout_seconds)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            status = STATUS_SLOW if self.slow_ms and elapsed_ms > self.slow_ms else STATUS_OK
+        except asyncio.TimeoutError:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            status = STATUS_TIMEOUT
+            logger.warning(f"Readiness check of {dependency.name} timed out")
+        except Exception as e:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            status = STATUS_UNAVAILABLE
+            logger.warning(f"Readiness check of {dependency.name} failed: {str(e)}")
+
+        return DependencyStatus(status=status, latency_ms=elapsed_ms, required=dependency.required)
+
+
+def _check_database(db_engine: AsyncEngine) -> Callable[[], Awaitable[None]]:
+    async def check() -> None:
+        # Goes through the pool, so an exhausted pool shows up as a timeout
+        async with db_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    return check
+
+
+async def _check_redis() -> None:
+    await get_redis().ping()
+
+
+async def _check_weaviate() -> None:
+    headers = {"Authorization": f"Bearer {settings.WEAVIATE_API_KEY}"} if settings.WEAVIATE_API_KEY else {}
+    async with httpx.AsyncClient(timeout=settings.READINESS_TIMEOUT_SECONDS) as client:
+        response = await client.get(f"{settings.WEAVIATE_URL}/v1/.well-known/ready", headers=headers)
+        response.raise_for_status()
+
+
+def _dependencies() -> List[Dependency]:
+    dependencies = [Dependency("database", _check_database(engine), required=True)]
+    if replica_engine is not None:
+        # Read-only endpoints fail without it (app.api.deps.get_read_db)
+        dependencies.append(Dependency("database_replica", _check_database(replica_engine), required=True))
+    dependencies += [
+        # Caches, rate limits and revocation degrade to local state without Redis
+        Dependency("redis", _check_redis, required=False),
+        # Not used by any endpoint yet
+        Dependency("weaviate", _check_weaviate, required=False),
+    ]
+    return dependencies
+
+
+# Global readiness probe instance
+readiness_probe = ReadinessProbe(
+    dependencies=_dependencies(),
+    timeout_seconds=settings.READINESS_TIMEOUT_SECONDS,
+    cache_seconds=settings.READINESS_CACHE_SECONDS,
+    slow_ms=settings.READINESS_SLOW_MS,
+)
@@ -0,0 +1,171 @@
+"""Rolling summarization of conversation turns that fall out of the context window."""
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import Integer, func, select, tuple_, type_coerce, update
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import AsyncSessionLocal
+from app.models.conversation import ChatMessage, ConversationSession
+from app.services.claude import claude_service
+from app.services.context import ContextWindow
+from app.services.context_cache import context_cache
+
+logger = get_logger(__name__)
+
+# Upper bound on sessions tracked for pending evictions
+MAX_TRACKED_SESSIONS = 10000
+
+
+def summary_text(metadata: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Extract the running summary text from a session's metadata."""
+    return ((metadata or {}).get("summary") or {}).get("text")
+
+
+class ConversationSummarizer:
+    """
+    Folds turns older than the context window into a running summary.
+
+    The summary lives on `ConversationSession.metadata["summary"]` together with
+    a keyset cursor of the last folded message. Every SUMMARY_FOLD_EVERY_TURNS
+    messages pushed out of the window trigger one background fold: the current
+    summary plus the next batch of unsummarized turns goes to Claude and the
+    result replaces the summary. The summary is never rebuilt from scratch, so
+    prompt size stays constant however long a session runs.
+    """
+
+    def __init__(self, fold_every: int, fold_max_messages: int, enabled: bool = True):
+        self.enabled = enabled
+        self.fold_every = fold_every
+        self.fold_max_messages = fold_max_messages
+
+        self._evicted: "OrderedDict[UUID, int]" = OrderedDict()
+        self._running: Set[UUID] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Metrics
+        self.folds_total = 0
+        self.fold_errors_total = 0
+
+    def track(self, session_id: UUID, window: ContextWindow, evicted: int) -> None:
+        """Record turns pushed out of a session's window and schedule a fold when due."""
+        if not self.enabled or not window.truncated or window.start is None:
+            return
+
+        # A session seen for the first time may already have a backlog to fold
+        pending = self._evicted.pop(session_id, self.fold_every) + evicted
+        if pending < self.fold_every or session_id in self._running:
+            self._remember(session_id, pending)
+            return
+
+        self._remember(session_id, 0)
+        self._running.add(session_id)
+        task = asyncio.create_task(self._fold(session_id, window.start))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> Dict[str, Any]:
+        """Fold counters."""
+        return {
+            "enabled": self.enabled,
+            "folds_total": self.folds_total,
+            "fold_errors_total": self.fold_errors_total,
+            "running": len(self._running),
+        }
+
+    def _remember(self, session_id: UUID, pending: int) -> None:
+        self._evicted[session_id] = pending
+        while len(self._evicted) > MAX_TRACKED_SESSIONS:
+            self._evicted.popitem(last=False)
+
+    async def _fold(self, session_id: UUID, window_start: Tuple[datetime, UUID]) -> None:
+        try:
+            await self._fold_once(session_id, window_start)
+        except Exception as e:
+            self.fold_errors_total += 1
+            logger.error(f"Summary fold failed for session {session_id}: {str(e)}")
+        finally:
+            self._running.discard(session_id)
+
+    async def _fold_once(self, session_id: UUID, window_start: Tuple[datetime, UUID]) -> None:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(ConversationSession.metadata_).where(ConversationSession.id == session_id)
+            )
+            previous = ((result.scalar_one_or_none() or {}).get("summary")) or {}
+
+            query = (
+                select(ChatMessage.id, ChatMessage.sender, ChatMessage.content, ChatMessage.created_at)
+                .where(
+                    ChatMessage.session_id == session_id,
+                    tuple_(ChatMessage.created_at, ChatMessage.id) < tuple_(*window_start),
+                )
+                .order_by(ChatMessage.created_at, ChatMessage.id)
+                .limit(self.fold_max_messages)
+            )
+            if previous.get("through"):
+                through_at, through_id = previous["through"]
+                query = query.where(
+                    tuple_(ChatMessage.created_at, ChatMessage.id)
+                    > tuple_(datetime.fromisoformat(through_at), UUID(through_id))
+                )
+
+            rows = (await db.execute(query)).all()
+            if len(rows) < self.fold_every:
+                return
+
+            transcript = "\n".join(
+                f"{'Resident' if row.sender == 'user' else 'Companion'}: {row.content}"
+                for row in rows
+            )
+            text = await claude_service.summarize_conversation(
+                previous.get("text"),
+                transcript,
+                max_tokens=settings.SUMMARY_MAX_TOKENS,
+            )
+
+            folds = previous.get("folds", 0)
+            summary = {
+                "text": text,
+                "through": [rows[-1].created_at.isoformat(), str(rows[-1].id)],
+                "folded_messages": previous.get("folded_messages", 0) + len(rows),
+                "folds": folds + 1,
+                "updated_at": datetime.utcnow().isoformat(),
+            }
+
+            # Only apply on top of the summary we read, in case another worker folded meanwhile
+            current_folds = func.coalesce(
+                ConversationSession.metadata_[("summary", "folds")].astext.cast(Integer), 0
+            )
+            result = await db.execute(
+                update(ConversationSession)
+                .where(ConversationSession.id == session_id, current_folds == folds)
+                .values(
+                    metadata_=func.coalesce(ConversationSession.metadata_, type_coerce({}, JSONB))
+                    .op("||")(type_coerce({"summary": summary}, JSONB))
+                )
+            )
+            await db.commit()
+
+        if result.rowcount:
+            self.folds_total += 1
+            logger.info(f"Folded {len(rows)} messages into summary of session {session_id}")
+
+            cached = await context_cache.get(session_id)
+            if cached is not None:
+                cached.summary = text
+                await context_cache.set(session_id, cached)
+
+
+# Global summarizer instance
+conversation_summarizer = ConversationSummarizer(
+    fold_every=settings.SUMMARY_FOLD_EVERY_TURNS,
+    fold_max_messages=settings.SUMMARY_FOLD_MAX_MESSAGES,
+    enabled=settings.SUMMARY_ENABLED,
+)
@@ -0,0 +1,232 @@
+"""Revocation of issued JWTs by their `jti` claim."""
+
+import asyncio
+import hashlib
+import math
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.security import decode_token
+from app.db.redis import get_redis, run_subscriber
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "seva:revoked:"
+INDEX_KEY = "seva:revoked"  # Sorted set of revoked jtis scored by token expiry
+REVOCATION_CHANNEL = "seva:revoked:new"
+
+
+class RevocationUnavailable(Exception):
+    """Raised when a use-once claim on a token cannot be checked because Redis is down."""
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, item: str) -> None:
+        for index in self._indexes(item):
+            self._bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(item))
+
+    def _indexes(self, item: str) -> List[int]:
+        # Double hashing: k indexes from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+
+class TokenRevocationList:
+    """
+    Revoked token ids, stored in Redis and mirrored in a local bloom filter.
+
+    Each revoked jti is a Redis key that expires together with the token, and
+    also sits in a sorted set used to rebuild the filter. Workers add new
+    revocations to their filter from a pub/sub channel and rebuild it every
+    REVOCATION_RESYNC_SECONDS, which also drops expired tokens. A token whose
+    jti is not in the filter is certainly not revoked, so the common case costs
+    a few hashes. Only filter hits are confirmed in Redis.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, resync_seconds: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.resync_seconds = resync_seconds
+
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._rebuild_buffer: Optional[Set[str]] = None  # Revocations seen while rebuilding
+        self._tasks: List[asyncio.Task] = []
+
+        # Metrics
+        self.checks = 0
+        self.bloom_hits = 0
+        self.confirmed = 0
+        self.false_positives = 0
+        self.redis_errors = 0
+
+    async def start(self) -> None:
+        """Load the current revocations and keep the filter in sync."""
+        if self._tasks:
+            return
+        await self.resync()
+        self._tasks = [
+            asyncio.create_task(run_subscriber(REVOCATION_CHANNEL, self._remember)),
+            asyncio.create_task(self._resync_periodically()),
+        ]
+
+    async def stop(self) -> None:
+        """Stop syncing."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def revoke(self, jti: str, expires_at: float, claim: bool = False) -> bool:
+        """
+        Revoke a token until it expires.
+
+        Args:
+            jti: Token id
+            expires_at: Token expiry (epoch seconds)
+            claim: The caller relies on the result as a "use once" claim, so
+                fail closed when Redis cannot confirm it
+
+        Returns:
+            False if the token was already revoked, so callers can treat
+            revocation as an atomic "use once" claim
+
+        Raises:
+            RevocationUnavailable: If `claim` is set and Redis is unavailable,
+                unless this worker already knows the token as revoked
+        """
+        already_revoked = jti in self._bloom
+
+        ttl = math.ceil(expires_at - time.time())
+        if ttl <= 0:
+            self._remember(jti)
+            return True
+
+        try:
+            async with get_redis().pipeline(transaction=True) as pipe:
+                pipe.set(KEY_PREFIX + jti, 1, ex=ttl, nx=True)
+                pipe.zadd(INDEX_KEY, {jti: expires_at})
+                pipe.zremrangebyscore(INDEX_KEY, "-inf", time.time())
+                pipe.publish(REVOCATION_CHANNEL, jti)
+                newly_revoked, *_ = await pipe.execute()
+        except (redis.RedisError, OSError) as e:
+            self._redis_failed("revoke", e)
+            if already_revoked:
+                return False  # Possibly a bloom false positive, but is_revoked fails closed too
+            if claim:
+                # Not claimed, so the client can retry with the same token
+                raise RevocationUnavailable() from e
+            # Still revoked on this worker; others rely on the token's expiry
+            self._remember(jti)
+            return True
+
+        self._remember(jti)
+        return bool(newly_revoked)
+
+    async def revoke_token(self, token: str, claim: bool = False) -> bool:
+        """Revoke a token given in its encoded form; see `revoke`."""
+        payload = decode_token(token)
+        if not payload.get("jti"):
+            return True
+        return await self.revoke(payload["jti"], payload["exp"], claim=claim)
+
+    async def is_revoked(self, jti: Optional[str]) -> bool:
+        """Whether a token id has been revoked."""
+        if not jti:
+            return False  # Issued before tokens carried a jti
+
+        self.checks += 1
+        if jti not in self._bloom:
+            return False
+
+        self.bloom_hits += 1
+        try:
+            revoked = bool(await get_redis().exists(KEY_PREFIX + jti))
+        except (redis.RedisError, OSError) as e:
+            # Cannot tell a false positive from a real revocation: fail closed
+            self._redis_failed("check", e)
+            return True
+
+        if revoked:
+            self.confirmed += 1
+        else:
+            self.false_positives += 1
+        return revoked
+
+    async def is_token_revoked(self, token: str) -> bool:
+        """Whether an encoded (already verified) token has been revoked."""
+        return await self.is_revoked(decode_token(token).get("jti"))
+
+    async def resync(self) -> None:
+        """Rebuild the filter from the revocations still in force."""
+        self._rebuild_buffer = set()
+        try:
+            client = get_redis()
+            await client.zremrangebyscore(INDEX_KEY, "-inf", time.time())
+            jtis = await client.zrange(INDEX_KEY, 0, -1)
+        except (redis.RedisError, OSError) as e:
+            self._redis_failed("resync", e)
+            self._rebuild_buffer = None
+            return
+
+        bloom = BloomFilter(max(self.capacity, len(jtis)), self.error_rate)
+        for jti in [*jtis, *self._rebuild_buffer]:
+            bloom.add(jti)
+
+        self._bloom = bloom
+        self._rebuild_buffer = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Filter size and lookup counters."""
+        return {
+            "bloom_entries": self._bloom.count,
+            "bloom_bits": self._bloom.size,
+            "checks": self.checks,
+            "bloom_hits": self.bloom_hits,
+            "confirmed_revoked": self.confirmed,
+            "false_positives": self.false_positives,
+            "redis_errors": self.redis_errors,
+        }
+
+    def _remember(self, jti: str) -> None:
+        self._bloom.add(jti)
+        if self._rebuild_buffer is not None:
+            self._rebuild_buffer.add(jti)
+
+    async def _resync_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.resync_seconds)
+            await self.resync()
+
+    def _redis_failed(self, operation: str, error: Exception) -> None:
+        self.redis_errors += 1
+        logger.warning(f"Token revocation Redis {operation} failed: {str(error)}")
+
+
+# Global revocation list instance
+token_revocation = TokenRevocationList(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+    resync_seconds=settings.REVOCATION_RESYNC_SECONDS,
+)
@@ -0,0 +1,230 @@
+"""Bulk creation of users from CSV or NDJSON files."""
+
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.user import User, UserProfile
+from app.schemas.user import UserImportReport, UserImportResult, UserImportRow
+from app.services.password_hasher import password_hasher
+
+logger = get_logger(__name__)
+
+# Content types accepted by the import endpoint, by file format
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+PROFILE_FIELDS = (
+    "date_of_birth",
+    "phone_number",
+    "address",
+    "emergency_contact_name",
+    "emergency_contact_phone",
+    "medical_conditions",
+    "medications",
+    "allergies",
+    "preferences",
+)
+
+
+class ImportFileError(ValueError):
+    """The import file as a whole cannot be processed."""
+
+
+async def import_users(db: AsyncSession, content: bytes, file_format: str) -> UserImportReport:
+    """
+    Create users and their profiles from an import file and commit.
+
+    Rows are validated up front. Emails already taken are found with one
+    set-based query, whose transaction ends before the remaining passwords
+    are hashed on the bulk process pool, so no pooled connection idles in a
+    transaction meanwhile. Users and profiles then go out as multi-row
+    INSERTs of USER_IMPORT_BATCH_SIZE rows, all in one transaction. The user INSERT
+    skips emails registered concurrently (ON CONFLICT DO NOTHING); those rows
+    are reported as conflicts. Bad rows never fail the whole import.
+
+    Args:
+        db: Database session
+        content: Raw file body
+        file_format: "csv" (header row required) or "ndjson"
+
+    Returns:
+        Report with one result per row, in file order
+
+    Raises:
+        ImportFileError: If the file cannot be decoded, is empty or has more
+            than USER_IMPORT_MAX_ROWS rows
+    """
+    results: Dict[int, UserImportResult] = {}
+    accepted: List[Tuple[int, UserImportRow]] = []
+    seen_emails = set()
+
+    for row, record, errors in _read_records(content, file_format):
+        if not errors:
+            try:
+                user = UserImportRow.model_validate(record)
+            except ValidationError as e:
+                errors = [
+                    f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+                    for err in e.errors()
+                ]
+
+        email = record.get("email") if isinstance(record, dict) else None
+        if not isinstance(email, str):
+            email = None  # e.g. a number in an NDJSON row; reported without it
+        if errors:
+            results[row] = UserImportResult(row=row, email=email, status="invalid", errors=errors)
+        elif user.email in seen_emails:
+            results[row] = UserImportResult(
+                row=row, email=user.email, status="duplicate", errors=["Email repeated in file"]
+            )
+        else:
+            seen_emails.add(user.email)
+            accepted.append((row, user))
+
+    # One query for every email that is already registered
+    if accepted:
+        taken = set(
+            (
+                await db.execute(
+                    select(User.email).where(User.email.in_([user.email for _, user in accepted]))
+                )
+            ).scalars()
+        )
+        for row, user in accepted:
+            if user.email in taken:
+                results[row] = UserImportResult(
+                    row=row, email=user.email, status="conflict", errors=["Email already registered"]
+                )
+        accepted = [(row, user) for row, user in accepted if user.email not in taken]
+        # Don't hold a connection in an idle transaction while the passwords hash
+        await db.rollback()
+
+    hashes = await password_hasher.hash_many([user.password for _, user in accepted])
+
+    now = datetime.utcnow()
+    batch_size = max(1, settings.USER_IMPORT_BATCH_SIZE)
+    for start in range(0, len(accepted), batch_size):
+        batch = accepted[start:start + batch_size]
+        user_rows = [
+            {
+                "id": uuid.uuid4(),
+                "email": user.email,
+                "password_hash": password_hash,
+                "full_name": user.full_name,
+                "role": "user",
+                "is_active": True,
+                "is_verified": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for (_, user), password_hash in zip(
+                batch, hashes[start:start + batch_size], strict=True
+            )
+        ]
+
+        inserted = await db.execute(
+            pg_insert(User)
+            .values(user_rows)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.id, User.email)
+        )
+        created = {email: user_id for user_id, email in inserted}
+
+        profile_rows = []
+        for row, user in batch:
+            if user.email not in created:
+                results[row] = UserImportResult(
+                    row=row, email=user.email, status="conflict", errors=["Email already registered"]
+                )
+                continue
+
+            results[row] = UserImportResult(
+                row=row, email=user.email, status="created", user_id=created[user.email]
+            )
+            profile_rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": created[user.email],
+                    **{name: getattr(user, name) for name in PROFILE_FIELDS},
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+
+        if profile_rows:
+            await db.execute(insert(UserProfile).values(profile_rows))
+
+    await db.commit()
+
+    report = [results[row] for row in sorted(results)]
+    created_count = sum(1 for result in report if result.status == "created")
+    logger.info(f"Bulk import created {created_count} of {len(report)} users")
+
+    return UserImportReport(
+        total=len(report),
+        created=created_count,
+        failed=len(report) - created_count,
+        results=report,
+    )
+
+
+def _read_records(content: bytes, file_format: str) -> Iterator[Tuple[int, Any, List[str]]]:
+    """Yield (row number, record, parse errors) for each row of the file."""
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ImportFileError("Import file must be UTF-8 encoded")
+
+    if file_format == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames or "email" not in reader.fieldnames:
+            raise ImportFileError("CSV import needs a header row with an email column")
+        records = [(row, _csv_record(record)) for row, record in enumerate(reader, start=1)]
+    else:
+        records = [
+            (row, line) for row, line in enumerate(text.splitlines(), start=1) if line.strip()
+        ]
+
+    if not records:
+        raise ImportFileError("Import file has no rows")
+    if len(records) > settings.USER_IMPORT_MAX_ROWS:
+        raise ImportFileError(
+            f"Import file has {len(records)} rows, the limit is {settings.USER_IMPORT_MAX_ROWS}"
+        )
+
+    for row, record in records:
+        if file_format == "csv":
+            yield row, record, []
+            continue
+        try:
+            parsed = json.loads(record)
+        except ValueError as e:
+            yield row, None, [f"row: invalid JSON ({e})"]
+        else:
+            yield row, parsed, []
+
+
+def _csv_record(record: Dict[Optional[str], Any]) -> Dict[str, Any]:
+    """Drop empty cells and decode the JSON preferences column."""
+    cleaned = {key: value for key, value in record.items() if key and value not in (None, "")}
+    if "preferences" in cleaned:
+        try:
+            cleaned["preferences"] = json.loads(cleaned["preferences"])
+        except ValueError:
+            pass  # Left as text, so validation reports it
+    return cleaned
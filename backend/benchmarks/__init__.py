@@ -0,0 +1 @@
+"""Load tests of the backend; see benchmarks/run.py."""
@@ -0,0 +1,243 @@
+"""
+Local stand-in for the Anthropic Messages API.
+
+Answers POST /v1/messages, streamed or not, in the wire format of the real
+API, with configurable latency, output token rate and injected errors, so
+the backend can be load-tested without calling (or paying for) Claude.
+Point the backend at it with ANTHROPIC_BASE_URL.
+
+    python -m benchmarks.fake_anthropic --port 8090 --latency-ms 800 --tokens-per-second 60
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+# Error type the real API reports with each status
+ERROR_TYPES = {
+    400: "invalid_request_error",
+    429: "rate_limit_error",
+    500: "api_error",
+    529: "overloaded_error",
+}
+
+# Text deltas are sent every this many tokens, like the real API's chunking
+TOKENS_PER_DELTA = 4
+
+_WORDS = (
+    "that sounds lovely and I am glad you told me about it how are you feeling this "
+    "morning did you sleep well remember to drink some water and take your medication"
+).split()
+
+
+@dataclass
+class FakeClaudeConfig:
+    """How the stand-in behaves; every reply follows the same recipe."""
+
+    latency_ms: float = 800.0  # Before the first token (time to first token when streaming)
+    latency_jitter_ms: float = 200.0  # Uniform +/- jitter on latency_ms
+    tokens_per_second: float = 60.0  # Output generation rate; 0 means instant
+    output_tokens: int = 120  # Per reply, capped by the request's max_tokens
+    error_rate: float = 0.0  # Fraction of requests answered with error_status
+    error_status: int = 529
+
+
+class FakeClaude:
+    """The stand-in's state: its configuration and what it has served."""
+
+    def __init__(self, config: FakeClaudeConfig):
+        self.config = config
+        self._cached_prefixes: set = set()
+
+        self.requests = 0
+        self.streams = 0
+        self.errors = 0
+        self.output_tokens = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "config": asdict(self.config),
+            "requests": self.requests,
+            "streams": self.streams,
+            "errors": self.errors,
+            "output_tokens": self.output_tokens,
+        }
+
+    async def messages(self, request: Request) -> Response:
+        body = await request.json()
+        self.requests += 1
+
+        if random.random() < self.config.error_rate:
+            self.errors += 1
+            # Delay errors too, or a failing upstream would look faster than a healthy one
+            await asyncio.sleep(self._latency())
+            return _error(self.config.error_status)
+
+        usage = self._input_usage(body)
+        output_tokens = max(1, min(self.config.output_tokens, int(body.get("max_tokens", 1024))))
+        self.output_tokens += output_tokens
+        text = _text(output_tokens)
+
+        if body.get("stream"):
+            self.streams += 1
+            return StreamingResponse(
+                self._stream(body, usage, text),
+                media_type="text/event-stream",
+                headers={"request-id": f"req_{uuid.uuid4().hex}"},
+            )
+
+        await asyncio.sleep(self._latency() + self._generation_seconds(output_tokens))
+        message = _message(body, usage, output_tokens)
+        message["content"] = [{"type": "text", "text": " ".join(text)}]
+        message["stop_reason"] = "end_turn"
+        return JSONResponse(message, headers={"request-id": f"req_{uuid.uuid4().hex}"})
+
+    async def _stream(
+        self, body: Dict[str, Any], usage: Dict[str, int], text: list
+    ) -> AsyncIterator[str]:
+        await asyncio.sleep(self._latency())
+        yield _event("message_start", {"message": _message(body, usage, 1)})
+        yield _event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+
+        for start in range(0, len(text), TOKENS_PER_DELTA):
+            chunk = text[start:start + TOKENS_PER_DELTA]
+            await asyncio.sleep(self._generation_seconds(len(chunk)))
+            delta = (" " if start else "") + " ".join(chunk)
+            yield _event(
+                "content_block_delta",
+                {"index": 0, "delta": {"type": "text_delta", "text": delta}},
+            )
+
+        yield _event("content_block_stop", {"index": 0})
+        yield _event(
+            "message_delta",
+            {
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": len(text)},
+            },
+        )
+        yield _event("message_stop", {})
+
+    def _latency(self) -> float:
+        jitter = random.uniform(-self.config.latency_jitter_ms, self.config.latency_jitter_ms)
+        return max(0.0, self.config.latency_ms + jitter) / 1000
+
+    def _generation_seconds(self, tokens: int) -> float:
+        return tokens / self.config.tokens_per_second if self.config.tokens_per_second > 0 else 0.0
+
+    def _input_usage(self, body: Dict[str, Any]) -> Dict[str, int]:
+        """Input tokens (4 characters each), split the way prompt caching would."""
+        system = body.get("system") or ""
+        blocks = [{"text": system}] if isinstance(system, str) else system
+        cached_tokens = 0
+        # Everything up to the last cache breakpoint of the system prompt is a cacheable prefix
+        prefix = ""
+        for block in blocks:
+            prefix += block.get("text", "")
+            if block.get("cache_control"):
+                cached_tokens = len(prefix) // 4
+
+        messages_chars = len(json.dumps(body.get("messages", [])))
+        input_tokens = (len(prefix) + messages_chars) // 4 - cached_tokens
+
+        usage = {"input_tokens": max(1, input_tokens), "cache_read_input_tokens": 0, "cache_creation_input_tokens": 0}
+        if cached_tokens:
+            if prefix in self._cached_prefixes:
+                usage["cache_read_input_tokens"] = cached_tokens
+            else:
+                self._cached_prefixes.add(prefix)
+                usage["cache_creation_input_tokens"] = cached_tokens
+        return usage
+
+
+def _text(tokens: int) -> list:
+    """`tokens` words, one token each."""
+    return [_WORDS[i % len(_WORDS)] for i in range(tokens)]
+
+
+def _message(body: Dict[str, Any], usage: Dict[str, int], output_tokens: int) -> Dict[str, Any]:
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "claude"),
+        "content": [],
+        "stop_reason": None,
+        "stop_sequence": None,
+        "usage": {**usage, "output_tokens": output_tokens},
+    }
+
+
+def _event(name: str, data: Dict[str, Any]) -> str:
+    return f"event: {name}\ndata: {json.dumps({'type': name, **data})}\n\n"
+
+
+def _error(status_code: int) -> JSONResponse:
+    error_type = ERROR_TYPES.get(status_code, "api_error")
+    return JSONResponse(
+        {"type": "error", "error": {"type": error_type, "message": f"Injected {error_type}"}},
+        status_code=status_code,
+    )
+
+
+def create_app(config: Optional[FakeClaudeConfig] = None) -> Starlette:
+    """The stand-in as an ASGI app; its FakeClaude is `app.state.fake_claude`."""
+    fake = FakeClaude(config or FakeClaudeConfig())
+
+    async def stats(request: Request) -> Response:
+        return JSONResponse(fake.stats())
+
+    app = Starlette(
+        routes=[
+            Route("/v1/messages", fake.messages, methods=["POST"]),
+            Route("/stats", stats, methods=["GET"]),
+        ]
+    )
+    app.state.fake_claude = fake
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser, prefix: str = "") -> None:
+    """Add the FakeClaudeConfig options to `parser`, named --<prefix><option>."""
+    defaults = FakeClaudeConfig()
+    parser.add_argument(f"--{prefix}latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument(f"--{prefix}latency-jitter-ms", type=float, default=defaults.latency_jitter_ms)
+    parser.add_argument(f"--{prefix}tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument(f"--{prefix}output-tokens", type=int, default=defaults.output_tokens)
+    parser.add_argument(f"--{prefix}error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument(
+        f"--{prefix}error-status", type=int, default=defaults.error_status, choices=sorted(ERROR_TYPES)
+    )
+
+
+def config_from_arguments(args: argparse.Namespace, prefix: str = "") -> FakeClaudeConfig:
+    """The FakeClaudeConfig given by options added with `add_arguments`."""
+    prefix = prefix.replace("-", "_")
+    return FakeClaudeConfig(
+        **{name: getattr(args, prefix + name) for name in FakeClaudeConfig.__dataclass_fields__}
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(config_from_arguments(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
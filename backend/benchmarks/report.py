@@ -0,0 +1,120 @@
+"""Load-test results: latency percentiles, throughput and comparison with a baseline."""
+
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class EndpointSamples:
+    """Latencies (ms) of the successful calls of one operation, and its failures."""
+
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: Dict[str, int] = field(default_factory=dict)  # Status code (or exception name) -> count
+
+    def record(self, latency_ms: float, error: Optional[str] = None) -> None:
+        if error is None:
+            self.latencies_ms.append(latency_ms)
+        else:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """The q-th percentile (0-100) of ascending values, interpolated between ranks."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(samples: Dict[str, EndpointSamples], duration_seconds: float) -> Dict[str, Any]:
+    """Per-operation and overall throughput, error rate and latency percentiles."""
+    endpoints = {}
+    for name, endpoint in sorted(samples.items()):
+        latencies = sorted(endpoint.latencies_ms)
+        failed = sum(endpoint.errors.values())
+        calls = len(latencies) + failed
+        endpoints[name] = {
+            "requests": calls,
+            "throughput_rps": round(calls / duration_seconds, 2),
+            "error_rate": round(failed / calls, 4) if calls else 0.0,
+            "errors": dict(sorted(endpoint.errors.items())),
+            **{f"p{q}_ms": round(percentile(latencies, q), 1) for q in PERCENTILES},
+            "mean_ms": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+            "max_ms": round(latencies[-1], 1) if latencies else 0.0,
+        }
+
+    requests = sum(endpoint["requests"] for endpoint in endpoints.values())
+    return {
+        "duration_seconds": round(duration_seconds, 1),
+        "requests": requests,
+        "throughput_rps": round(requests / duration_seconds, 2),
+        "endpoints": endpoints,
+    }
+
+
+def compare(
+    result: Dict[str, Any],
+    baseline: Dict[str, Any],
+    latency_tolerance: float = 0.2,
+    throughput_tolerance: float = 0.2,
+    error_rate_tolerance: float = 0.01,
+) -> List[str]:
+    """
+    Regressions of `result` against `baseline`, as readable lines (none when it holds up).
+
+    An operation regresses when its p95 or p99 is more than `latency_tolerance`
+    above the baseline's, its throughput more than `throughput_tolerance`
+    below, or its error rate more than `error_rate_tolerance` higher.
+    """
+    regressions = []
+    for name, base in baseline["endpoints"].items():
+        current = result["endpoints"].get(name)
+        if current is None:
+            regressions.append(f"{name}: not exercised (baseline had {base['requests']} requests)")
+            continue
+
+        for key in ("p95_ms", "p99_ms"):
+            if current[key] > base[key] * (1 + latency_tolerance):
+                regressions.append(f"{name}: {key} {current[key]} ms vs {base[key]} ms")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - throughput_tolerance):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']}/s vs {base['throughput_rps']}/s"
+            )
+        if current["error_rate"] > base["error_rate"] + error_rate_tolerance:
+            regressions.append(
+                f"{name}: error rate {current['error_rate']:.2%} vs {base['error_rate']:.2%}"
+            )
+    return regressions
+
+
+def format_table(result: Dict[str, Any]) -> str:
+    """The per-operation numbers as a fixed-width table."""
+    header = f"{'operation':<16}{'requests':>10}{'req/s':>9}{'errors':>9}"
+    header += "".join(f"{f'p{q} ms':>10}" for q in PERCENTILES) + f"{'max ms':>10}"
+    lines = [header]
+    for name, endpoint in result["endpoints"].items():
+        line = f"{name:<16}{endpoint['requests']:>10}{endpoint['throughput_rps']:>9.1f}"
+        line += f"{endpoint['error_rate']:>9.1%}"
+        line += "".join(f"{endpoint[f'p{q}_ms']:>10.1f}" for q in PERCENTILES)
+        lines.append(line + f"{endpoint['max_ms']:>10.1f}")
+    lines.append(f"{'total':<16}{result['requests']:>10}{result['throughput_rps']:>9.1f}")
+    return "\n".join(lines)
+
+
+def load(path: Path) -> Optional[Dict[str, Any]]:
+    """A saved result or baseline, or None if there is none."""
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save(result: Dict[str, Any], path: Path) -> None:
+    """Write a result (or baseline) as indented JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2) + "\n")
@@ -0,0 +1,210 @@
+"""
+Load test of the backend against the local Postgres and a stand-in for Claude.
+
+Starts the Claude stand-in (benchmarks.fake_anthropic) and the app under
+uvicorn, registers one account per virtual user, drives the scenario's mix
+of requests and reports throughput and p50/p95/p99 latency per operation.
+The result is written to benchmarks/results/ and compared with the
+scenario's baseline in benchmarks/baselines/, if one was recorded on this
+machine with --save-baseline; the exit status is 1 when an operation
+regressed.
+
+The database is the one configured in .env (DATABASE_URL), migrated with
+`alembic upgrade head`; the accounts created are deleted afterwards.
+
+    python -m benchmarks.run --scenario chat --users 20 --duration 60
+    python -m benchmarks.run --scenario chat --save-baseline
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks import fake_anthropic, report
+from benchmarks.workload import SCENARIOS, Workload, WorkloadConfig, create_users
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+BASELINES_DIR = BACKEND_DIR / "benchmarks" / "baselines"
+
+# Settings of the app under test, on top of .env
+APP_ENVIRONMENT = {
+    "ANTHROPIC_API_KEY": "load-test",
+    "DEBUG": "False",
+    "LOG_LEVEL": "WARNING",
+    # Every virtual user comes from the same address, which the limits would throttle
+    "RATE_LIMIT_ENABLED": "False",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start(args: List[str], env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", *args], cwd=BACKEND_DIR, env={**os.environ, **(env or {})}
+    )
+
+
+async def _wait_until_up(process: subprocess.Popen, url: str, timeout_seconds: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout_seconds
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{url} exited with status {process.returncode} while starting")
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout_seconds:.0f}s")
+
+
+def _stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def _delete_users(email_prefix: str) -> None:
+    from sqlalchemy import delete
+
+    from app.db.session import AsyncSessionLocal, engine
+    from app.models.user import User
+
+    async with AsyncSessionLocal() as db:
+        # Sessions, messages and profiles go with them (ON DELETE CASCADE)
+        await db.execute(delete(User).where(User.email.startswith(email_prefix)))
+        await db.commit()
+    await engine.dispose()
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    """Start everything, run the workload and return the result."""
+    config = WorkloadConfig(
+        scenario=args.scenario,
+        users=args.users,
+        duration_seconds=args.duration,
+        warmup_seconds=args.warmup,
+        think_time_ms=args.think_time_ms,
+    )
+    claude_config = fake_anthropic.config_from_arguments(args, prefix="claude-")
+    claude_port, app_port = _free_port(), _free_port()
+    claude_url, app_url = f"http://127.0.0.1:{claude_port}", f"http://127.0.0.1:{app_port}"
+    email_prefix = f"load-test-{uuid.uuid4().hex[:8]}-"
+    registered = False
+    started_at = datetime.utcnow()
+
+    claude = _start(
+        ["benchmarks.fake_anthropic", "--port", str(claude_port)]
+        + [f"--{name.replace('_', '-')}={value}" for name, value in asdict(claude_config).items()]
+    )
+    app = _start(
+        ["uvicorn", "app.main:app", "--port", str(app_port), "--workers", str(args.workers), "--log-level", "warning"],
+        env={**APP_ENVIRONMENT, "ANTHROPIC_BASE_URL": claude_url},
+    )
+    try:
+        await _wait_until_up(claude, f"{claude_url}/stats")
+        await _wait_until_up(app, f"{app_url}/health")
+
+        limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+        async with httpx.AsyncClient(base_url=app_url, limits=limits, timeout=120.0) as client:
+            registered = True
+            emails = await create_users(client, args.users, email_prefix)
+            print(f"Running {args.scenario!r} with {args.users} users for {args.warmup:.0f}s + {args.duration:.0f}s")
+            summary = await Workload(client, config, seed=args.seed).run(emails)
+            claude_stats = (await client.get(f"{claude_url}/stats")).json()
+    finally:
+        _stop(app)
+        _stop(claude)
+        if registered:
+            try:
+                await _delete_users(email_prefix)
+            except Exception as e:
+                print(f"Could not delete the {email_prefix}* accounts: {e}", file=sys.stderr)
+
+    return {
+        "scenario": args.scenario,
+        "started_at": started_at.isoformat(),
+        "git_commit": _git_commit(),
+        "workload": asdict(config),
+        "app_workers": args.workers,
+        "claude": claude_stats,
+        **summary,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="chat")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds first")
+    parser.add_argument("--think-time-ms", type=float, default=500.0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95/p99/throughput change")
+    parser.add_argument("--save-baseline", action="store_true", help="Make this run the scenario's baseline")
+    fake_anthropic.add_arguments(parser, prefix="claude-")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(report.format_table(result))
+
+    result_path = RESULTS_DIR / f"{args.scenario}-{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    report.save(result, result_path)
+    print(f"Result written to {result_path.relative_to(BACKEND_DIR)}")
+
+    baseline_path = BASELINES_DIR / f"{args.scenario}.json"
+    if args.save_baseline:
+        report.save(result, baseline_path)
+        print(f"Baseline written to {baseline_path.relative_to(BACKEND_DIR)}")
+        return 0
+
+    baseline = report.load(baseline_path)
+    if baseline is None:
+        print(f"No baseline for {args.scenario!r}; save one with --save-baseline")
+        return 0
+
+    regressions = report.compare(
+        result, baseline, latency_tolerance=args.tolerance, throughput_tolerance=args.tolerance
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions against the baseline of {baseline['started_at']}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
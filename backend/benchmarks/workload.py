@@ -0,0 +1,160 @@
+"""Virtual users driving a mix of the backend's hot paths."""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.report import EndpointSamples, summarize
+
+# Relative weights of the operations each virtual user picks from
+SCENARIOS: Dict[str, Dict[str, int]] = {
+    # Users in a conversation: mostly sending, looking back at their history now and then
+    "chat": {"send": 4, "list_sessions": 3, "get_session": 2, "login": 1},
+    # Users reading past conversations
+    "browse": {"list_sessions": 5, "get_session": 4, "send": 1},
+    # Everyone signing in at once, e.g. after tokens were revoked
+    "login": {"login": 1},
+}
+
+PASSWORD = "load-test-password"
+
+MESSAGES = [
+    "Good morning! I slept quite well last night.",
+    "My knee has been aching a bit since yesterday.",
+    "My granddaughter is visiting this weekend, I'm so excited.",
+    "I forgot whether I took my blood pressure pills this morning.",
+    "Can you remind me what we talked about last time?",
+    "I went for a short walk in the garden today.",
+    "I'm feeling a little lonely this afternoon.",
+    "What would be a nice, simple recipe for dinner tonight?",
+]
+
+
+@dataclass
+class WorkloadConfig:
+    """Shape of a load-test run."""
+
+    scenario: str = "chat"
+    users: int = 20  # Concurrent virtual users, each with its own account
+    duration_seconds: float = 60.0  # Measured, after the warmup
+    warmup_seconds: float = 5.0  # Requests started before this are not measured
+    think_time_ms: float = 500.0  # Mean pause between a user's requests (exponentially distributed)
+    new_session_ratio: float = 0.2  # Sends that start a new conversation
+
+
+@dataclass
+class VirtualUser:
+    """One account's state while it runs through the scenario."""
+
+    email: str
+    rng: random.Random
+    token: Optional[str] = None
+    session_ids: List[str] = field(default_factory=list)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+async def create_users(client: httpx.AsyncClient, count: int, email_prefix: str) -> List[str]:
+    """Register `count` accounts through the API; returns their emails."""
+    emails = [f"{email_prefix}{i}@example.com" for i in range(count)]
+
+    async def register(email: str) -> None:
+        response = await client.post(
+            "/api/v1/auth/register",
+            json={"email": email, "password": PASSWORD, "full_name": "Load Test"},
+        )
+        response.raise_for_status()
+
+    # A few at a time: registration hashes the password, which is deliberately slow
+    for start in range(0, count, 8):
+        await asyncio.gather(*(register(email) for email in emails[start:start + 8]))
+    return emails
+
+
+class Workload:
+    """Runs virtual users through a scenario against `client` and records each call."""
+
+    def __init__(self, client: httpx.AsyncClient, config: WorkloadConfig, seed: Optional[int] = None):
+        if config.scenario not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {config.scenario!r}, expected one of: {', '.join(SCENARIOS)}")
+        self.client = client
+        self.config = config
+        self.weights = SCENARIOS[config.scenario]
+        self.rng = random.Random(seed)
+        self.samples: Dict[str, EndpointSamples] = {}
+
+        self._measure_from = 0.0
+        self._deadline = 0.0
+
+    async def run(self, emails: List[str]) -> Dict:
+        """Run one virtual user per email for the configured time; returns the summary."""
+        users = [VirtualUser(email, random.Random(self.rng.random())) for email in emails]
+        for user in users:
+            # Unmeasured, so every user starts signed in
+            (await self._login(user)).raise_for_status()
+
+        started = time.perf_counter()
+        self._measure_from = started + self.config.warmup_seconds
+        self._deadline = self._measure_from + self.config.duration_seconds
+        await asyncio.gather(*(self._run_user(user) for user in users))
+        # Up to when the last call returned, as calls still running at the deadline are counted
+        return summarize(self.samples, time.perf_counter() - self._measure_from)
+
+    async def _run_user(self, user: VirtualUser) -> None:
+        operations, weights = zip(*self.weights.items(), strict=True)
+        think_seconds = self.config.think_time_ms / 1000
+
+        while time.perf_counter() < self._deadline:
+            operation = user.rng.choices(operations, weights)[0]
+            if operation == "get_session" and not user.session_ids:
+                operation = "send"  # Nothing to open yet
+
+            await self._call(operation, user)
+            if think_seconds > 0:
+                await asyncio.sleep(min(user.rng.expovariate(1 / think_seconds), think_seconds * 10))
+
+    async def _call(self, operation: str, user: VirtualUser) -> None:
+        started = time.perf_counter()
+        try:
+            response = await getattr(self, f"_{operation}")(user)
+            error = None if response.status_code < 400 else str(response.status_code)
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        if started >= self._measure_from:
+            self.samples.setdefault(operation, EndpointSamples()).record(latency_ms, error)
+
+    async def _login(self, user: VirtualUser) -> httpx.Response:
+        response = await self.client.post(
+            "/api/v1/auth/login", json={"email": user.email, "password": PASSWORD}
+        )
+        if response.status_code == 200:
+            user.token = response.json()["access_token"]
+        return response
+
+    async def _send(self, user: VirtualUser) -> httpx.Response:
+        body = {"message": user.rng.choice(MESSAGES)}
+        if user.session_ids and user.rng.random() >= self.config.new_session_ratio:
+            body["session_id"] = user.rng.choice(user.session_ids)
+
+        response = await self.client.post("/api/v1/chat/send", json=body, headers=user.headers)
+        if response.status_code == 200 and "session_id" not in body:
+            user.session_ids.append(response.json()["session_id"])
+        return response
+
+    async def _list_sessions(self, user: VirtualUser) -> httpx.Response:
+        return await self.client.get(
+            "/api/v1/chat/sessions", params={"page_size": 20}, headers=user.headers
+        )
+
+    async def _get_session(self, user: VirtualUser) -> httpx.Response:
+        session_id = user.rng.choice(user.session_ids)
+        return await self.client.get(f"/api/v1/chat/sessions/{session_id}", headers=user.headers)
+
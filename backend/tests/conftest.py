@@ -1,8 +1,17 @@
 """Pytest configuration and fixtures."""
 
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
 
+from app.db.base import Base
+from app.db.partitions import add_months, ensure_partitions, month_start
+from app.db.session import engine
 from app.main import app
 
 
@@ -21,3 +30,69 @@ def sample_user():
         "password": "testpassword123",
         "full_name": "Test User",
     }
+
+
+@pytest.fixture
+async def database():
+    """Make sure the configured Postgres is reachable and has the schema, or skip."""
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.run_sync(Base.metadata.create_all)
+            current = month_start(datetime.utcnow())
+            await ensure_partitions(conn, add_months(current, -1), add_months(current, 1))
+    except (OSError, SQLAlchemyError) as e:
+        await engine.dispose()
+        pytest.skip(f"Database not available: {e}")
+
+    yield engine
+
+    # Pooled asyncpg connections are bound to this test's event loop
+    await engine.dispose()
+
+
+@dataclass
+class QueryCounter:
+    """Database round trips seen on the application engine."""
+
+    statements: List[str] = field(default_factory=list)
+
+    @property
+    def round_trips(self) -> int:
+        return len(self.statements)
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+
+@pytest.fixture
+def query_counter():
+    """Count every statement, BEGIN, COMMIT and ROLLBACK sent through the engine."""
+    counter = QueryCounter()
+    sync_engine = engine.sync_engine
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    def on_begin(conn):
+        counter.statements.append("BEGIN")
+
+    def on_commit(conn):
+        counter.statements.append("COMMIT")
+
+    def on_rollback(conn):
+        counter.statements.append("ROLLBACK")
+
+    listeners = [
+        ("before_cursor_execute", on_execute),
+        ("begin", on_begin),
+        ("commit", on_commit),
+        ("rollback", on_rollback),
+    ]
+    for name, listener in listeners:
+        event.listen(sync_engine, name, listener)
+
+    yield counter
+
+    for name, listener in listeners:
+        event.remove(sync_engine, name, listener)
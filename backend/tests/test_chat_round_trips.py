@@ -0,0 +1,96 @@
+"""Database round-trip budget of a chat turn."""
+
+import uuid
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.security import create_access_token, get_password_hash
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+from app.services.claude import claude_service
+from app.services.context_cache import context_cache
+
+# BEGIN + INSERT ... RETURNING of both messages + COMMIT, principal and context cached
+WARM_TURN_BUDGET = 3
+# ... plus the principal lookup of a user's first request and the session INSERT
+NEW_SESSION_TURN_BUDGET = WARM_TURN_BUDGET + 2
+# ... plus the ownership check and one batch of the context window scan
+COLD_TURN_BUDGET = WARM_TURN_BUDGET + 2
+
+
+@pytest.fixture
+async def auth_headers(database):
+    """Headers of a throwaway user, removed again after the test."""
+    async with AsyncSessionLocal() as db:
+        user = User(
+            email=f"round-trips-{uuid.uuid4().hex}@example.com",
+            password_hash=get_password_hash("testpassword123"),
+            full_name="Round Trip",
+        )
+        db.add(user)
+        await db.commit()
+
+    yield {"Authorization": f"Bearer {create_access_token(user.id)}"}
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(User).where(User.id == user.id))
+        await db.commit()
+
+
+@pytest.fixture(autouse=True)
+def fake_claude(monkeypatch):
+    """Answer instantly so only database work is measured."""
+
+    async def generate_response(user_message, **kwargs):
+        return "I'm here with you.", 12, {"input_tokens": 8, "output_tokens": 4}
+
+    monkeypatch.setattr(claude_service, "generate_response", generate_response)
+
+
+def _budget_message(counter, budget: int) -> str:
+    return f"{counter.round_trips} round trips (budget {budget}):\n" + "\n".join(counter.statements)
+
+
+async def _send(client, headers, session_id=None) -> dict:
+    body = {"message": "Good morning"}
+    if session_id:
+        body["session_id"] = session_id
+
+    response = await client.post("/api/v1/chat/send", json=body, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_new_session_turn_round_trips(client, auth_headers, query_counter):
+    data = await _send(client, auth_headers)
+
+    assert query_counter.round_trips <= NEW_SESSION_TURN_BUDGET, _budget_message(
+        query_counter, NEW_SESSION_TURN_BUDGET
+    )
+    assert data["user_message"]["sender"] == "user"
+    assert data["ai_message"]["tokens_used"] == 12
+
+
+async def test_warm_turn_round_trips(client, auth_headers, query_counter):
+    session_id = (await _send(client, auth_headers))["session_id"]
+
+    query_counter.reset()
+    data = await _send(client, auth_headers, session_id)
+
+    assert query_counter.round_trips <= WARM_TURN_BUDGET, _budget_message(
+        query_counter, WARM_TURN_BUDGET
+    )
+    assert data["session_id"] == session_id
+
+
+async def test_cold_turn_round_trips(client, auth_headers, query_counter):
+    session_id = (await _send(client, auth_headers))["session_id"]
+    await context_cache.invalidate(uuid.UUID(session_id))
+
+    query_counter.reset()
+    await _send(client, auth_headers, session_id)
+
+    assert query_counter.round_trips <= COLD_TURN_BUDGET, _budget_message(
+        query_counter, COLD_TURN_BUDGET
+    )
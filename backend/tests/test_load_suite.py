@@ -0,0 +1,123 @@
+"""The load-test suite: the Claude stand-in, the report and a short run of the chat mix."""
+
+import time
+import uuid
+
+import anthropic
+import httpx
+import pytest
+from sqlalchemy import delete
+
+from app.db.session import AsyncSessionLocal
+from app.middleware.rate_limit import rate_limiter
+from app.models.user import User
+from app.services.claude import claude_service
+from benchmarks import report
+from benchmarks.fake_anthropic import FakeClaudeConfig, create_app
+from benchmarks.workload import SCENARIOS, Workload, WorkloadConfig, create_users
+
+CACHED_SYSTEM = [{"type": "text", "text": "You are kind. " * 50, "cache_control": {"type": "ephemeral"}}]
+
+
+def _client(app) -> anthropic.AsyncAnthropic:
+    """The real SDK, talking to the stand-in in-process."""
+    return anthropic.AsyncAnthropic(
+        api_key="test",
+        base_url="http://fake-anthropic",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=app)),
+    )
+
+
+async def test_stand_in_replies_like_the_messages_api():
+    config = FakeClaudeConfig(latency_ms=50, latency_jitter_ms=0, tokens_per_second=0, output_tokens=30)
+    client = _client(create_app(config))
+
+    started = time.perf_counter()
+    first = await client.messages.create(
+        model="claude", max_tokens=10, system=CACHED_SYSTEM, messages=[{"role": "user", "content": "Hi"}]
+    )
+    assert time.perf_counter() - started >= 0.05
+    second = await client.messages.create(
+        model="claude", max_tokens=100, system=CACHED_SYSTEM, messages=[{"role": "user", "content": "Hi"}]
+    )
+
+    assert len(first.content[0].text.split()) == 10  # Capped by max_tokens
+    assert first.usage.output_tokens == 10
+    assert first.usage.cache_creation_input_tokens > 0
+    assert second.usage.output_tokens == 30
+    assert second.usage.cache_read_input_tokens == first.usage.cache_creation_input_tokens
+
+
+async def test_stand_in_streams_at_the_token_rate():
+    config = FakeClaudeConfig(latency_ms=50, latency_jitter_ms=0, tokens_per_second=200, output_tokens=40)
+    client = _client(create_app(config))
+
+    started = time.perf_counter()
+    async with client.messages.stream(
+        model="claude", max_tokens=100, messages=[{"role": "user", "content": "Hi"}]
+    ) as stream:
+        deltas = [text async for text in stream.text_stream]
+        message = await stream.get_final_message()
+
+    assert time.perf_counter() - started >= 0.05 + 40 / 200
+    assert len(deltas) == 10  # 4 tokens per delta
+    assert "".join(deltas) == message.content[0].text
+    assert message.usage.output_tokens == 40
+
+
+@pytest.mark.parametrize(
+    "status_code, error",
+    [(529, anthropic.InternalServerError), (429, anthropic.RateLimitError)],
+)
+async def test_stand_in_injects_errors(status_code, error):
+    app = create_app(FakeClaudeConfig(latency_ms=0, error_rate=1.0, error_status=status_code))
+
+    with pytest.raises(error):
+        await _client(app).messages.create(
+            model="claude", max_tokens=10, messages=[{"role": "user", "content": "Hi"}]
+        )
+    assert app.state.fake_claude.errors == 1
+
+
+def test_report_flags_regressions():
+    samples = {"send": report.EndpointSamples(latencies_ms=[float(ms) for ms in range(1, 101)])}
+    samples["send"].record(0.0, error="503")
+    baseline = report.summarize(samples, duration_seconds=10)
+
+    assert baseline["endpoints"]["send"]["p50_ms"] == pytest.approx(50.5)
+    assert baseline["endpoints"]["send"]["p99_ms"] == pytest.approx(99.0)
+    assert baseline["endpoints"]["send"]["error_rate"] == pytest.approx(1 / 101, abs=1e-4)
+    assert report.compare(baseline, baseline) == []
+
+    slower = {"send": report.EndpointSamples(latencies_ms=[ms * 1.5 for ms in range(1, 101)])}
+    regressions = report.compare(report.summarize(slower, duration_seconds=20), baseline)
+    assert [line.split(":")[1].split()[0] for line in regressions] == ["p95_ms", "p99_ms", "throughput"]
+
+
+@pytest.fixture
+async def load_test_users(database):
+    """Email prefix of throwaway accounts, removed again after the test."""
+    prefix = f"load-test-{uuid.uuid4().hex[:8]}-"
+
+    yield prefix
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(User).where(User.email.startswith(prefix)))
+        await db.commit()
+
+
+@pytest.mark.benchmark
+async def test_chat_mix_runs_clean(client, load_test_users, monkeypatch):
+    stand_in = create_app(FakeClaudeConfig(latency_ms=20, latency_jitter_ms=0, tokens_per_second=0))
+    monkeypatch.setattr(claude_service, "client", _client(stand_in))
+    monkeypatch.setattr(rate_limiter, "enabled", False)
+
+    emails = await create_users(client, 3, load_test_users)
+    config = WorkloadConfig(scenario="chat", duration_seconds=2, warmup_seconds=0, think_time_ms=10)
+    result = await Workload(client, config, seed=7).run(emails)
+
+    assert set(result["endpoints"]) == set(SCENARIOS["chat"])
+    for name, endpoint in result["endpoints"].items():
+        assert endpoint["error_rate"] == 0, f"{name}: {endpoint['errors']}"
+    assert stand_in.state.fake_claude.requests >= result["endpoints"]["send"]["requests"]
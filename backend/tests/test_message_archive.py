@@ -0,0 +1,145 @@
+"""Monthly partition names and the Parquet archive of chat messages, without a database."""
+
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.db.partitions import add_months, month_start, parse_partition_name, partition_name
+from app.services.message_archive import ARCHIVE_SCHEMA, MessageArchiver, _count_archived_rows
+
+MONTH = date(2025, 9, 1)
+
+
+@pytest.mark.parametrize(
+    "month, count, expected",
+    [
+        (date(2025, 12, 1), 1, date(2026, 1, 1)),
+        (date(2026, 1, 1), -1, date(2025, 12, 1)),
+        (date(2026, 1, 1), -13, date(2024, 12, 1)),
+        (date(2025, 11, 1), 14, date(2027, 1, 1)),
+        (date(2026, 10, 1), -12, date(2025, 10, 1)),
+        (date(2026, 10, 1), 0, date(2026, 10, 1)),
+    ],
+)
+def test_add_months_crosses_years(month, count, expected):
+    assert add_months(month, count) == expected
+
+
+def test_month_start():
+    assert month_start(datetime(2026, 2, 28, 23, 59)) == date(2026, 2, 1)
+
+
+@pytest.mark.parametrize("month", [date(2025, 1, 1), date(2025, 12, 1), date(2099, 10, 1)])
+def test_partition_names_round_trip(month):
+    name = partition_name(month)
+    assert name == f"chat_messages_p{month.year}_{month.month:02d}"
+    assert parse_partition_name(name) == month
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["chat_messages", "chat_messages_p2025_9", "chat_messages_p2025_09_old", "users_p2025_09", "chat_messages_default"],
+)
+def test_other_tables_are_not_partitions(name):
+    assert parse_partition_name(name) is None
+
+
+def test_archiving_needs_an_absolute_directory():
+    with pytest.raises(ValueError):
+        MessageArchiver("archive/chat_messages", 3, 12, 3600, 1000, archive_enabled=True)
+    with pytest.raises(ValueError):
+        MessageArchiver("", 3, 12, 3600, 1000, archive_enabled=True)
+
+
+async def test_unconfigured_archive_is_empty():
+    archiver = MessageArchiver("", 3, 12, 3600, 1000, archive_enabled=False)
+
+    assert await archiver.list_archives() == []
+    assert not archiver.has_archive(MONTH)
+
+
+def _row(user_id, session_id, minute, **overrides):
+    row = {
+        "id": str(uuid.uuid4()),
+        "session_id": str(session_id),
+        "user_id": str(user_id),
+        "content": f"Message at {minute}",
+        "sender": "user",
+        "sentiment_score": Decimal("0.75"),
+        "sentiment_label": "positive",
+        "health_signals": json.dumps([{"type": "pain", "site": "knee"}]),
+        "tokens_used": 12,
+        "created_at": datetime(2025, 9, 3, 8, minute, tzinfo=timezone.utc),
+        "metadata": json.dumps({"ttft_ms": 412.3}),
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """An archiver with one month on disk: two users, the first with two sessions."""
+    archiver = MessageArchiver(str(tmp_path), 3, 12, 3600, 2, archive_enabled=True)
+    users = [uuid.uuid4(), uuid.uuid4()]
+    sessions = [uuid.uuid4(), uuid.uuid4(), uuid.uuid4()]
+    rows = [
+        _row(users[0], sessions[0], 0),
+        _row(users[0], sessions[1], 1, sentiment_score=None, health_signals=None, metadata=None),
+        _row(users[1], sessions[2], 2, sender="ai", sentiment_score=Decimal("-0.20"), tokens_used=None),
+        _row(users[0], sessions[0], 3),
+    ]
+    # Small row groups, as written by archive_partition with batch_rows=2
+    pq.write_table(
+        pa.Table.from_pylist(rows, schema=ARCHIVE_SCHEMA), archiver.archive_path(MONTH), row_group_size=2
+    )
+    return archiver, users, sessions, rows
+
+
+async def _read(archiver, **filters):
+    return [message async for message in archiver.read_archive(MONTH, **filters)]
+
+
+async def test_archive_round_trip(archive):
+    archiver, users, sessions, rows = archive
+
+    messages = await _read(archiver)
+
+    assert [message["id"] for message in messages] == [row["id"] for row in rows]
+    first, empty, ai = messages[0], messages[1], messages[2]
+    assert first["sentiment_score"] == 0.75
+    assert first["health_signals"] == [{"type": "pain", "site": "knee"}]
+    assert first["metadata"] == {"ttft_ms": 412.3}
+    assert first["created_at"] == "2025-09-03T08:00:00+00:00"
+    assert (empty["sentiment_score"], empty["health_signals"], empty["metadata"]) == (None, [], {})
+    assert (ai["sender"], ai["sentiment_score"], ai["tokens_used"]) == ("ai", -0.2, None)
+    json.dumps(messages)  # Ready for the NDJSON export
+
+
+async def test_archive_filters(archive):
+    archiver, users, sessions, rows = archive
+
+    by_user = await _read(archiver, user_id=users[0])
+    by_session = await _read(archiver, session_id=sessions[0])
+    both = await _read(archiver, user_id=users[1], session_id=sessions[0])
+
+    assert [m["id"] for m in by_user] == [rows[0]["id"], rows[1]["id"], rows[3]["id"]]
+    assert [m["id"] for m in by_session] == [rows[0]["id"], rows[3]["id"]]
+    assert both == []
+
+
+async def test_archive_listing(archive):
+    archiver, users, sessions, rows = archive
+
+    archives = await archiver.list_archives()
+
+    assert [(a.month, a.rows) for a in archives] == [(MONTH, len(rows))]
+    assert archiver.has_archive(MONTH)
+    assert not archiver.has_archive(add_months(MONTH, 1))
+    assert _count_archived_rows(archiver.archive_path(MONTH)) == len(rows)
+    with pytest.raises(FileNotFoundError):
+        [message async for message in archiver.read_archive(add_months(MONTH, 1))]
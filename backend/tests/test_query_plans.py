@@ -0,0 +1,212 @@
+"""EXPLAIN plans of the queries behind each endpoint.
+
+Every SELECT an endpoint sends is captured and explained with sequential scans
+disabled. The planner then picks a sequential scan only when no index can
+serve the query, so a missing or dropped index fails here even on a nearly
+empty test database, where a sequential scan would otherwise win anyway.
+"""
+
+import json
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+import pytest
+from sqlalchemy import delete, event
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.user import User
+from app.services.claude import claude_service
+from app.services.context_cache import context_cache
+
+PASSWORD = "testpassword123"
+
+
+@dataclass
+class CapturedSelects:
+    """SELECT statements sent through the application engine, with their parameters."""
+
+    queries: List[Tuple[str, Sequence[Any]]] = field(default_factory=list)
+
+    def reset(self) -> None:
+        self.queries.clear()
+
+
+@pytest.fixture
+def captured_selects():
+    """Capture every SELECT sent through the engine."""
+    captured = CapturedSelects()
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.queries.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    yield captured
+    event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+
+@pytest.fixture(autouse=True)
+def fake_claude(monkeypatch):
+    """Answer instantly; only the database queries matter here."""
+
+    async def generate_response(user_message, **kwargs):
+        return "I'm here with you.", 12, {"input_tokens": 8, "output_tokens": 4}
+
+    monkeypatch.setattr(claude_service, "generate_response", generate_response)
+
+
+@pytest.fixture
+async def auth_headers(client, database):
+    """Register and log in a throwaway user, removed again after the test."""
+    email = f"query-plans-{uuid.uuid4().hex}@example.com"
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": email, "password": PASSWORD, "full_name": "Query Plans"},
+    )
+    assert response.status_code == 201, response.text
+
+    yield {"Authorization": f"Bearer {await _login(client, email)}"}
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(User).where(User.email == email))
+        await db.commit()
+
+
+async def _login(client, email: str) -> str:
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()["access_token"]
+
+
+async def _send(client, headers, session_id=None) -> str:
+    body = {"message": "Good morning"}
+    if session_id:
+        body["session_id"] = session_id
+
+    response = await client.post("/api/v1/chat/send", json=body, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["session_id"]
+
+
+def _seq_scans(node: Dict[str, Any]) -> Iterator[str]:
+    """Relations read by a sequential scan anywhere in a plan tree."""
+    if node.get("Node Type") == "Seq Scan":
+        yield node.get("Relation Name", "?")
+    for child in node.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+async def assert_no_seq_scans(captured: CapturedSelects) -> None:
+    """Explain every captured SELECT and fail on any sequential scan."""
+    assert captured.queries, "No SELECT was captured"
+    statements = list(captured.queries)
+
+    failures = []
+    # The transaction is rolled back on close, taking the SET LOCAL with it
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            tables = sorted(set(_seq_scans(plan[0]["Plan"])))
+            if tables:
+                failures.append(
+                    f"Sequential scan of {', '.join(tables)}:\n{statement}\n"
+                    f"{json.dumps(plan[0]['Plan'], indent=2)}"
+                )
+
+    assert not failures, "\n\n".join(failures)
+
+
+async def test_auth_queries_use_indexes(client, database, captured_selects):
+    email = f"query-plans-{uuid.uuid4().hex}@example.com"
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": email, "password": PASSWORD, "full_name": "Query Plans"},
+    )
+    assert response.status_code == 201, response.text
+
+    try:
+        token = await _login(client, email)
+        response = await client.get(
+            "/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200, response.text
+
+        await assert_no_seq_scans(captured_selects)
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(User).where(User.email == email))
+            await db.commit()
+
+
+async def test_chat_send_queries_use_indexes(client, auth_headers, captured_selects):
+    session_id = await _send(client, auth_headers)
+    # A cold cache makes the next turn check ownership and scan the context window
+    await context_cache.invalidate(uuid.UUID(session_id))
+    await _send(client, auth_headers, session_id)
+
+    await assert_no_seq_scans(captured_selects)
+
+
+async def test_session_list_queries_use_indexes(client, auth_headers, captured_selects):
+    await _send(client, auth_headers)
+    await _send(client, auth_headers)
+
+    captured_selects.reset()
+    response = await client.get("/api/v1/chat/sessions?page_size=1", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    cursor = response.json()["next_cursor"]
+    assert cursor
+
+    response = await client.get(
+        "/api/v1/chat/sessions", params={"page_size": 1, "cursor": cursor}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+
+    await assert_no_seq_scans(captured_selects)
+
+
+async def test_session_messages_queries_use_indexes(client, auth_headers, captured_selects):
+    session_id = await _send(client, auth_headers)
+    await _send(client, auth_headers, session_id)
+
+    captured_selects.reset()
+    response = await client.get(
+        f"/api/v1/chat/sessions/{session_id}?page_size=1", headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+    older = response.json()["older_cursor"]
+    latest = response.json()["newer_cursor"]
+    assert older and latest
+
+    response = await client.get(
+        f"/api/v1/chat/sessions/{session_id}",
+        params={"page_size": 1, "before": older},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+    newer = response.json()["newer_cursor"]
+
+    response = await client.get(
+        f"/api/v1/chat/sessions/{session_id}",
+        params={"page_size": 1, "after": newer},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+
+    response = await client.get(
+        f"/api/v1/chat/sessions/{session_id}",
+        params={"page_size": 1, "after": latest},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["messages"] == []
+    assert response.json()["newer_cursor"] == latest
+
+    response = await client.delete(f"/api/v1/chat/sessions/{session_id}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    await assert_no_seq_scans(captured_selects)
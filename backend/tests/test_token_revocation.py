@@ -0,0 +1,44 @@
+"""Token revocation while Redis is unavailable."""
+
+import time
+import uuid
+
+import pytest
+import redis.asyncio as redis
+
+from app.core.security import create_refresh_token
+from app.services import token_revocation as revocation
+from app.services.token_revocation import RevocationUnavailable, TokenRevocationList
+
+
+@pytest.fixture
+def redis_down(monkeypatch):
+    """Point the revocation list at a port nothing listens on."""
+    client = redis.Redis.from_url("redis://127.0.0.1:1/0", socket_connect_timeout=1)
+    monkeypatch.setattr(revocation, "get_redis", lambda: client)
+    return client
+
+
+async def test_claims_fail_closed_without_redis(redis_down):
+    revocations = TokenRevocationList(capacity=1000, error_rate=0.01, resync_seconds=60)
+    expires_at = time.time() + 3600
+
+    with pytest.raises(RevocationUnavailable):
+        await revocations.revoke(uuid.uuid4().hex, expires_at, claim=True)
+
+    # Logout stays best effort, but a second use of the same jti is refused here
+    jti = uuid.uuid4().hex
+    assert await revocations.revoke(jti, expires_at) is True
+    assert await revocations.revoke(jti, expires_at, claim=True) is False
+    assert await revocations.is_revoked(jti) is True
+    assert revocations.redis_errors == 4
+
+
+async def test_refresh_is_unavailable_without_redis(client, redis_down):
+    refresh_token = create_refresh_token(uuid.uuid4())
+
+    # A retry after the 503 is not mistaken for a second use of the token
+    for _ in range(2):
+        response = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+        assert response.status_code == 503, response.text
+        assert response.headers["Retry-After"]
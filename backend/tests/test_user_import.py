@@ -0,0 +1,69 @@
+"""Bulk user import: bad rows are reported per row, never failing the import."""
+
+import json
+import uuid
+
+from sqlalchemy import delete
+
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+from app.services.user_import import import_users
+
+
+class NoQueriesSession:
+    """Session of an import in which every row is invalid: only the final commit."""
+
+    def __init__(self):
+        self.committed = False
+
+    async def execute(self, statement):
+        raise AssertionError(f"Unexpected query: {statement}")
+
+    async def rollback(self):
+        pass
+
+    async def commit(self):
+        self.committed = True
+
+
+def _ndjson(*records) -> bytes:
+    return "\n".join(json.dumps(record) for record in records).encode()
+
+
+async def test_malformed_rows_are_reported_as_invalid():
+    db = NoQueriesSession()
+    content = _ndjson(
+        {"email": 123, "password": "testpassword123", "full_name": "Number"},
+        [1, 2],
+        "x",
+        {"email": ["a@example.com"], "password": "testpassword123", "full_name": "List"},
+    ) + b"\n{not json"
+
+    report = await import_users(db, content, "ndjson")
+
+    assert (report.total, report.created, report.failed) == (5, 0, 5)
+    assert [result.row for result in report.results] == [1, 2, 3, 4, 5]
+    assert all(result.status == "invalid" and result.errors for result in report.results)
+    assert all(result.email is None for result in report.results)
+    assert db.committed
+
+
+async def test_import_creates_valid_rows_next_to_invalid_ones(database):
+    email = f"import-{uuid.uuid4().hex}@example.com"
+    content = _ndjson(
+        {"email": email, "password": "testpassword123", "full_name": "Imported"},
+        {"email": 123, "password": "testpassword123", "full_name": "Number"},
+    )
+
+    try:
+        async with AsyncSessionLocal() as db:
+            report = await import_users(db, content, "ndjson")
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(User).where(User.email == email))
+            await db.commit()
+
+    assert [(result.status, result.email) for result in report.results] == [
+        ("created", email),
+        ("invalid", None),
+    ]
@@ -25,9 +25,7 @@ CREATE TABLE users (
     last_login_at TIMESTAMP WITH TIME ZONE
 );
 
-CREATE INDEX idx_users_email ON users(email);
-CREATE INDEX idx_users_role ON users(role);
-CREATE INDEX idx_users_is_active ON users(is_active);
+-- Lookups by email are served by the index of the UNIQUE constraint
 
 -- User profiles
 CREATE TABLE user_profiles (
@@ -41,14 +39,12 @@ CREATE TABLE user_profiles (
     medical_conditions TEXT,
     medications TEXT,
     allergies TEXT,
-    preferences JSONB DEFAULT '{}',
+    preferences JSONB NOT NULL DEFAULT '{}',
     created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     UNIQUE(user_id)
 );
 
-CREATE INDEX idx_user_profiles_user_id ON user_profiles(user_id);
-
 -- Devices
 CREATE TABLE devices (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -78,36 +74,50 @@ CREATE TABLE conversation_sessions (
     ended_at TIMESTAMP WITH TIME ZONE,
     message_count INTEGER NOT NULL DEFAULT 0,
     is_active BOOLEAN NOT NULL DEFAULT TRUE,
-    metadata JSONB DEFAULT '{}'
+    metadata JSONB NOT NULL DEFAULT '{}'
 );
 
-CREATE INDEX idx_sessions_user_id ON conversation_sessions(user_id);
-CREATE INDEX idx_sessions_started_at ON conversation_sessions(started_at DESC);
-CREATE INDEX idx_sessions_is_active ON conversation_sessions(is_active);
+-- A user's sessions, newest first (scanned backwards), and their count
+CREATE INDEX idx_sessions_user_started_at ON conversation_sessions(user_id, started_at, id);
 
--- Chat messages
+-- Chat messages, partitioned by month on created_at. The backend creates
+-- partitions ahead of time and archives old ones to Parquet
+-- (app/services/message_archive.py); the first few are created below.
 CREATE TABLE chat_messages (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     session_id UUID NOT NULL REFERENCES conversation_sessions(id) ON DELETE CASCADE,
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     content TEXT NOT NULL,
     sender VARCHAR(10) NOT NULL CHECK (sender IN ('user', 'ai')),
     sentiment_score DECIMAL(3, 2),
     sentiment_label VARCHAR(20),
-    health_signals JSONB DEFAULT '[]',
+    health_signals JSONB NOT NULL DEFAULT '[]',
     tokens_used INTEGER,
     created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
-    metadata JSONB DEFAULT '{}'
-);
-
-CREATE INDEX idx_messages_session_id ON chat_messages(session_id);
+    metadata JSONB NOT NULL DEFAULT '{}',
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Partitions for the current month and the next three
+DO $$
+DECLARE
+    part_month DATE := date_trunc('month', NOW() AT TIME ZONE 'UTC')::date;
+BEGIN
+    FOR i IN 0..3 LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF chat_messages FOR VALUES FROM (%L) TO (%L)',
+            'chat_messages_p' || to_char(part_month, 'YYYY_MM'),
+            part_month::text || ' 00:00:00+00',
+            (part_month + INTERVAL '1 month')::date::text || ' 00:00:00+00'
+        );
+        part_month := (part_month + INTERVAL '1 month')::date;
+    END LOOP;
+END $$;
+
+-- A session's messages in (created_at, id) order: context window, summaries, pagination
+CREATE INDEX idx_messages_session_keyset ON chat_messages(session_id, created_at, id);
+-- ON DELETE CASCADE from users
 CREATE INDEX idx_messages_user_id ON chat_messages(user_id);
-CREATE INDEX idx_messages_created_at ON chat_messages(created_at DESC);
-CREATE INDEX idx_messages_sender ON chat_messages(sender);
-CREATE INDEX idx_messages_sentiment ON chat_messages(sentiment_score);
-
--- Full-text search index on message content
-CREATE INDEX idx_messages_content_search ON chat_messages USING gin(to_tsvector('english', content));
 
 -- ============================================================================
 -- HEALTH MONITORING
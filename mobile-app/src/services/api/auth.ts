@@ -73,8 +73,9 @@ class AuthService {
    */
   async logout(): Promise<void> {
     try {
-      // Call logout endpoint
-      await apiClient.post('/auth/logout');
+      // Call logout endpoint, revoking the refresh token as well
+      const refreshToken = await AsyncStorage.getItem(STORAGE_KEYS.REFRESH_TOKEN);
+      await apiClient.post('/auth/logout', { refresh_token: refreshToken });
     } catch (error) {
       console.error('Logout error:', error);
     } finally {
@@ -29,8 +29,21 @@ export interface ConversationSession {
   metadata: Record<string, any>;
 }
 
+export interface ConversationSessionSummary extends ConversationSession {
+  last_message_preview: string | null;
+  last_message_at: string | null;
+}
+
 export interface ConversationSessionWithMessages extends ConversationSession {
   messages: ChatMessage[];
+  older_cursor: string | null;
+  newer_cursor: string | null;
+}
+
+export interface MessageWindowParams {
+  before?: string;
+  after?: string;
+  page_size?: number;
 }
 
 export interface ChatResponse {
@@ -40,10 +53,11 @@ export interface ChatResponse {
 }
 
 export interface SessionListResponse {
-  sessions: ConversationSession[];
+  sessions: ConversationSessionSummary[];
   total: number;
-  page: number;
+  page: number | null;
   page_size: number;
+  next_cursor: string | null;
 }
 
 export interface SendMessageData {
@@ -71,11 +85,15 @@ class ChatService {
   }
 
   /**
-   * Get a specific session with messages
+   * Get a specific session with a window of its messages (latest by default)
    */
-  async getSession(sessionId: string): Promise<ConversationSessionWithMessages> {
+  async getSession(
+    sessionId: string,
+    params: MessageWindowParams = {}
+  ): Promise<ConversationSessionWithMessages> {
     const response = await apiClient.get<ConversationSessionWithMessages>(
-      `/chat/sessions/${sessionId}`
+      `/chat/sessions/${sessionId}`,
+      { params }
     );
     return response.data;
   }